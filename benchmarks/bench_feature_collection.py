@@ -0,0 +1,85 @@
+"""
+Сравнение сборки FeatureCollection через FeatureMapper (WKB -> shapely ->
+pydantic -> JSON) и генерации GeoJSON в PostGIS (ST_AsGeoJSON).
+
+Запуск (нужна БД из .env):
+    python -m benchmarks.bench_feature_collection --seed 10000 --repeat 5
+
+Синтетические объекты добавляются в той же транзакции, что и замеры,
+и откатываются по завершении, поэтому данные в БД не меняются.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from benchmarks.datasets import make_features
+from src.connectors.database_init import async_session_maker_null_pool
+from src.formats.geojson import iter_feature_collection
+from src.managers.db_manager import DBManager
+
+
+async def mapper_path(db: DBManager) -> bytes:
+    collection = await db.feature.get_feature_collection()
+    return collection.model_dump_json().encode()
+
+
+async def sql_path(db: DBManager) -> bytes:
+    chunks = iter_feature_collection(
+        [row.feature for row in rows]
+        async for rows in db.feature.stream_features()
+    )
+    return b"".join([chunk async for chunk in chunks])
+
+
+async def measure(
+    path, db: DBManager, repeat: int
+) -> tuple[list[float], bytes]:
+    timings = []
+    body = b""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = await path(db)
+        timings.append(time.perf_counter() - start)
+    return timings, body
+
+
+async def main(seed: int, vertices: int, repeat: int) -> None:
+    async with DBManager(
+        session_factories=async_session_maker_null_pool
+    ) as db:
+        for feature in make_features(seed, vertices):
+            await db.feature.add(feature)
+        await db.flush()
+
+        results = {}
+        for name, path in (("mapper", mapper_path), ("sql", sql_path)):
+            timings, body = await measure(path, db, repeat)
+            results[name] = (timings, body)
+            print(
+                f"{name:>6}: "
+                f"median {statistics.median(timings) * 1000:9.1f} ms"
+                f"  min {min(timings) * 1000:9.1f} ms"
+                f"  size {len(body) / 1024:9.1f} KiB"
+            )
+
+        mapper_body, sql_body = (
+            {
+                feature["properties"]["id"]: feature
+                for feature in json.loads(results[name][1])["features"]
+            }
+            for name in ("mapper", "sql")
+        )
+        print("Результаты совпадают:", mapper_body == sql_body)
+        # Откат в DBManager.__aexit__ удаляет синтетические объекты
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seed", type=int, default=10_000)
+    parser.add_argument("--vertices", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.seed, args.vertices, args.repeat))
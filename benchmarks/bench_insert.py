@@ -0,0 +1,102 @@
+"""
+Сравнение путей записи: прежний ORM путь (FeatureMapper.to_entity ->
+shapely -> WKBElement -> session.add + flush) и Core INSERT ... RETURNING
+с геометрией в GeoJSON (FeatureRepository.add / add_many).
+
+Запуск (нужна БД из .env):
+    python -m benchmarks.bench_insert --count 2000 --vertices 50
+
+Для каждого пути выводится задержка одной вставки (медиана и p95) и
+процессорное время Python на объект. Счетчики типов и журнал изменений
+пишутся во всех путях одинаково. Все вставки выполняются в одной
+транзакции и откатываются, данные в БД не меняются.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.datasets import make_features
+from src.connectors.database_init import async_session_maker_null_pool
+from src.managers.db_manager import DBManager
+from src.mappers.features import FeatureMapper
+from src.schemas.feature import FeatureRequest
+
+
+async def orm_add(db: DBManager, feature_data: FeatureRequest) -> int:
+    # Прежняя реализация FeatureRepository.add
+    feature = FeatureMapper.to_entity(feature_data)
+    db.session.add(feature)
+    await db.session.flush()
+    await db.feature.type_counts.add([feature_data.geometry.type.upper()])
+    await db.feature.changes.add(
+        "insert", [(feature.id, *feature_data.geometry.bounds)]
+    )
+    return feature.id
+
+
+async def core_add(db: DBManager, feature_data: FeatureRequest) -> int:
+    return await db.feature.add(feature_data)
+
+
+async def measure_single(
+    name: str, add, db: DBManager, features: list[FeatureRequest]
+) -> None:
+    latencies = []
+    cpu_start = time.process_time()
+    for feature in features:
+        start = time.perf_counter()
+        await add(db, feature)
+        latencies.append(time.perf_counter() - start)
+    cpu = time.process_time() - cpu_start
+    # Объекты ORM остаются в identity map сессии до конца транзакции
+    identity_map = len(db.session.identity_map)
+    db.session.expunge_all()
+    print(
+        f"{name:>10}: "
+        f"median {statistics.median(latencies) * 1e3:7.3f} ms"
+        f"  p95 {statistics.quantiles(latencies, n=20)[-1] * 1e3:7.3f} ms"
+        f"  cpu {cpu / len(features) * 1e6:8.1f} us/obj"
+        f"  identity map {identity_map}"
+    )
+
+
+async def measure_batch(
+    db: DBManager, features: list[FeatureRequest], batch_size: int
+) -> None:
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    for offset in range(0, len(features), batch_size):
+        await db.feature.add_many(features[offset : offset + batch_size])
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+    print(
+        f"{'core x' + str(batch_size):>10}: "
+        f"mean   {elapsed / len(features) * 1e3:7.3f} ms"
+        f"  cpu {cpu / len(features) * 1e6:8.1f} us/obj"
+    )
+
+
+async def main(count: int, vertices: int, batch_size: int) -> None:
+    features = make_features(count, vertices)
+    async with DBManager(
+        session_factories=async_session_maker_null_pool
+    ) as db:
+        # Прогрев: подготовленные выражения и соединение
+        await orm_add(db, features[0])
+        await core_add(db, features[0])
+
+        await measure_single("orm", orm_add, db, features)
+        await measure_single("core", core_add, db, features)
+        await measure_batch(db, features, batch_size)
+        # Откат в DBManager.__aexit__ удаляет синтетические объекты
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--vertices", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.count, args.vertices, args.batch_size))
@@ -0,0 +1,163 @@
+"""
+Замер серверной обвязки MODE=PROD без БД: uvicorn с циклом событий
+asyncio и разбором HTTP на h11 против uvloop и httptools, с keep-alive и
+с новым соединением на каждый запрос. Запрос идет в маршрут, который не
+обращается к БД (/plugins/plugins.xml), поэтому в результат входят
+только цикл событий, разбор HTTP, middleware и установка соединений.
+
+Запуск (БД не нужна, uvloop и httptools из requirements.txt):
+    python -m benchmarks.bench_server --workers 1 --concurrency 32 \\
+        --requests 5000 --output server.json
+
+Клиент работает на той же машине, что и сервер: на машине с одним
+ядром он отнимает процессорное время у сервера, и больше одного
+воркера там не даст прироста.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.load import RunState, git_revision, run_scenario
+from benchmarks.scale_workers import STARTUP_TIMEOUT, stop_server
+
+PATH = "/plugins/plugins.xml"
+STACKS = {
+    "asyncio/h11": ("asyncio", "h11"),
+    "uvloop/httptools": ("uvloop", "httptools"),
+}
+
+
+def start_server(stack: str, workers: int, port: int) -> subprocess.Popen:
+    loop, http = STACKS[stack]
+    command = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "src.main:app",
+        "--host=127.0.0.1",
+        f"--port={port}",
+        f"--workers={workers}",
+        f"--loop={loop}",
+        f"--http={http}",
+        "--no-access-log",
+        "--log-level=error",
+    ]
+    # Без проверок БД и синхронизации кэша в фоне: замер только сервера
+    env = os.environ | {
+        "TILE_CACHE_SYNC_INTERVAL": "0",
+        "DB_POOL_PREWARM": "0",
+    }
+    return subprocess.Popen(command, env=env)
+
+
+def wait_ready(url: str, server: subprocess.Popen) -> None:
+    """
+    Ждет, пока сервер ответит на PATH
+    :param url: адрес сервера
+    :param server: процесс сервера
+    """
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("Сервер завершился при запуске")
+        try:
+            if httpx.get(f"{url}{PATH}", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("Сервер не ответил за отведенное время")
+
+
+async def measure_client(
+    url: str, keepalive: bool, args: argparse.Namespace
+) -> dict:
+    limits = httpx.Limits(
+        max_connections=args.concurrency,
+        max_keepalive_connections=args.concurrency if keepalive else 0,
+    )
+    async with httpx.AsyncClient(
+        base_url=url, timeout=120, limits=limits
+    ) as client:
+        state = RunState(rnd=random.Random(0))
+
+        async def scenario(
+            client: httpx.AsyncClient, state: RunState
+        ) -> httpx.Response:
+            return await client.get(PATH)
+
+        await run_scenario(
+            client, scenario, state, args.warmup, args.concurrency
+        )
+        return await run_scenario(
+            client, scenario, state, args.requests, args.concurrency
+        )
+
+
+def measure(stack: str, workers: int, args: argparse.Namespace) -> dict:
+    url = f"http://127.0.0.1:{args.port}"
+    server = start_server(stack, workers, args.port)
+    try:
+        wait_ready(url, server)
+        return {
+            "keepalive": asyncio.run(measure_client(url, True, args)),
+            "close": asyncio.run(measure_client(url, False, args)),
+        }
+    finally:
+        stop_server(server)
+
+
+def main(args: argparse.Namespace) -> None:
+    results: dict[str, dict] = {}
+    print(
+        f"{'стек':>18} {'воркеров':>9} {'соединение':>11} "
+        f"{'rps':>8} {'p50':>8} {'p99':>8}"
+    )
+    for stack in args.stacks:
+        for workers in args.workers:
+            runs = measure(stack, workers, args)
+            results[f"{stack} x{workers}"] = runs
+            for connection, summary in runs.items():
+                print(
+                    f"{stack:>18} {workers:>9} {connection:>11} "
+                    f"{summary['throughput_rps']:8.0f} "
+                    f"{summary.get('p50_ms', 0):6.1f}ms "
+                    f"{summary.get('p99_ms', 0):6.1f}ms"
+                )
+    report = {
+        "meta": {
+            "git": git_revision(),
+            "cpu_count": os.cpu_count(),
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "path": PATH,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f"Результаты записаны в {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument(
+        "--stacks", nargs="+", choices=STACKS, default=list(STACKS)
+    )
+    parser.add_argument("--workers", type=int, nargs="+", default=[1])
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--output", default="server.json")
+    main(parser.parse_args())
@@ -0,0 +1,109 @@
+import math
+import random
+
+from collections.abc import Iterator
+
+from src.schemas.feature import FeatureRequest
+
+# Окрестности Краснодара, как в example_*.json
+CENTER = (38.976, 45.035)
+SPREAD = 0.5
+
+
+def _point(rnd: random.Random) -> list[float]:
+    return [
+        round(CENTER[0] + rnd.uniform(-SPREAD, SPREAD), 6),
+        round(CENTER[1] + rnd.uniform(-SPREAD, SPREAD), 6),
+    ]
+
+
+def _line(rnd: random.Random, vertices: int) -> list[list[float]]:
+    x, y = _point(rnd)
+    coordinates = []
+    for _ in range(vertices):
+        x += rnd.uniform(-0.001, 0.001)
+        y += rnd.uniform(-0.001, 0.001)
+        coordinates.append([round(x, 6), round(y, 6)])
+    return coordinates
+
+
+def _polygon(rnd: random.Random, vertices: int) -> list[list[list[float]]]:
+    x, y = _point(rnd)
+    radius = rnd.uniform(0.0005, 0.005)
+    ring = [
+        [
+            round(x + radius * math.cos(2 * math.pi * i / vertices), 6),
+            round(y + radius * math.sin(2 * math.pi * i / vertices), 6),
+        ]
+        for i in range(vertices)
+    ]
+    ring.append(ring[0])
+    return [ring]
+
+
+def realistic_vertices(rnd: random.Random, kind: str) -> int:
+    """
+    Количество вершин с логнормальным распределением, как у оцифрованных
+    данных: в основном десятки вершин, изредка тысячи
+    :param rnd: генератор случайных чисел
+    :param kind: LineString или Polygon
+    :return: int
+    """
+    median = 20 if kind == "LineString" else 40
+    return min(5000, max(4, round(rnd.lognormvariate(math.log(median), 1))))
+
+
+def make_feature(
+    rnd: random.Random, index: int, vertices: int | None = 50
+) -> FeatureRequest:
+    """
+    Синтетический объект: точки, линии и полигоны в пропорции 3:1:1
+    :param rnd: генератор случайных чисел
+    :param index: порядковый номер объекта
+    :param vertices: количество вершин линий и полигонов, None -
+        случайное по realistic_vertices
+    :return: FeatureRequest
+    """
+    kind = rnd.choice(("Point", "Point", "Point", "LineString", "Polygon"))
+    if vertices is None and kind != "Point":
+        vertices = realistic_vertices(rnd, kind)
+    if kind == "Point":
+        coordinates = _point(rnd)
+    elif kind == "LineString":
+        coordinates = _line(rnd, max(2, vertices or 0))
+    else:
+        coordinates = _polygon(rnd, max(3, vertices or 0))
+    return FeatureRequest.model_validate({
+        "geometry": {"type": kind, "coordinates": coordinates},
+        "properties": {"name": f"Synthetic {index}", "type": kind},
+    })
+
+
+def make_features(
+    count: int, vertices: int | None = 50, seed: int = 0
+) -> list[FeatureRequest]:
+    """
+    Воспроизводимый набор синтетических объектов
+    :param count: количество объектов
+    :param vertices: количество вершин линий и полигонов
+    :param seed: зерно генератора
+    :return: list[FeatureRequest]
+    """
+    rnd = random.Random(seed)
+    return [make_feature(rnd, index, vertices) for index in range(count)]
+
+
+def iter_features(
+    count: int, vertices: int | None = None, seed: int = 0
+) -> Iterator[FeatureRequest]:
+    """
+    То же, что make_features, но без списка в памяти: для наполнения БД
+    миллионом объектов
+    :param count: количество объектов
+    :param vertices: количество вершин линий и полигонов
+    :param seed: зерно генератора
+    :return: Iterator[FeatureRequest]
+    """
+    rnd = random.Random(seed)
+    for index in range(count):
+        yield make_feature(rnd, index, vertices)
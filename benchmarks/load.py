@@ -0,0 +1,369 @@
+"""
+Нагрузочные замеры API: пропускная способность и задержки p50/p99 для
+создания, пакетной загрузки, списка, списка с фильтром, поиска
+ближайших, удаления и статистики. Результаты пишутся в JSON для
+сравнения между коммитами.
+
+Подготовка данных:
+    python -m benchmarks.seed --size 100k --truncate
+
+Замер внутри процесса (ASGITransport, без сети и сервера):
+    python -m benchmarks.load run --output asgi.json
+
+Замер по HTTP запущенного сервера с параллельными запросами:
+    python -m benchmarks.load run --url http://localhost:8000 \\
+        --concurrency 32 --output http.json
+
+Сравнение двух прогонов (код возврата 1 при регрессии p99 или
+пропускной способности больше --threshold):
+    python -m benchmarks.load compare base.json http.json
+
+Объекты, созданные в create и bulk, удаляются сценарием delete и
+остатком в конце прогона: размер набора данных не меняется.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+import httpx
+
+from benchmarks.datasets import CENTER, SPREAD, make_feature
+
+# Сторона окна фильтра bbox, градусы
+BBOX_SIZE = 0.05
+DELETE_CHUNK_SIZE = 1000
+
+
+@dataclass
+class RunState:
+    rnd: random.Random
+    min_id: int = 0
+    max_id: int = 0
+    bulk_size: int = 1000
+    # id объектов, созданных прогоном, для сценария delete
+    created: list[int] = field(default_factory=list)
+
+
+Scenario = Callable[[httpx.AsyncClient, RunState], Awaitable[httpx.Response]]
+
+
+async def create(client: httpx.AsyncClient, state: RunState) -> httpx.Response:
+    feature = make_feature(state.rnd, len(state.created), vertices=None)
+    response = await client.post(
+        "/features", content=feature.model_dump_json()
+    )
+    if response.status_code == 201:
+        state.created.append(response.json()["id"])
+    return response
+
+
+async def bulk(client: httpx.AsyncClient, state: RunState) -> httpx.Response:
+    body = "".join(
+        make_feature(state.rnd, index, vertices=None).model_dump_json() + "\n"
+        for index in range(state.bulk_size)
+    )
+    response = await client.post(
+        "/features/bulk",
+        content=body.encode(),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    if response.status_code == 200:
+        state.created += [
+            feature_id
+            for feature_id in response.json()["ids"]
+            if feature_id is not None
+        ]
+    return response
+
+
+async def list_page(
+    client: httpx.AsyncClient, state: RunState
+) -> httpx.Response:
+    after_id = state.rnd.randint(state.min_id - 1, state.max_id)
+    return await client.get(
+        "/features", params={"limit": 100, "after_id": after_id}
+    )
+
+
+async def filtered(
+    client: httpx.AsyncClient, state: RunState
+) -> httpx.Response:
+    x = CENTER[0] + state.rnd.uniform(-SPREAD, SPREAD - BBOX_SIZE)
+    y = CENTER[1] + state.rnd.uniform(-SPREAD, SPREAD - BBOX_SIZE)
+    return await client.get(
+        "/features",
+        params={
+            "bbox": f"{x},{y},{x + BBOX_SIZE},{y + BBOX_SIZE}",
+            "limit": 1000,
+        },
+    )
+
+
+async def nearest(
+    client: httpx.AsyncClient, state: RunState
+) -> httpx.Response:
+    return await client.get(
+        "/features/nearest",
+        params={
+            "lon": CENTER[0] + state.rnd.uniform(-SPREAD, SPREAD),
+            "lat": CENTER[1] + state.rnd.uniform(-SPREAD, SPREAD),
+            "k": 20,
+            "distance": "true",
+        },
+    )
+
+
+async def delete(client: httpx.AsyncClient, state: RunState) -> httpx.Response:
+    return await client.delete(f"/features/{state.created.pop()}")
+
+
+async def stats(client: httpx.AsyncClient, state: RunState) -> httpx.Response:
+    return await client.get("/stats")
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "stats": stats,
+    "list": list_page,
+    "filtered": filtered,
+    "nearest": nearest,
+    "create": create,
+    "bulk": bulk,
+    "delete": delete,
+}
+
+
+def percentile(values: list[float], percent: int) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[percent - 1]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    state: RunState,
+    requests: int,
+    concurrency: int,
+) -> dict:
+    """
+    Выполняет requests запросов сценария в concurrency параллельных
+    потоках
+    :return: dict - сводка замеров
+    """
+    counter = iter(range(requests))
+    latencies: list[float] = []
+    errors = 0
+    response_bytes = 0
+
+    async def worker() -> None:
+        nonlocal errors, response_bytes
+        for _ in counter:
+            start = time.perf_counter()
+            try:
+                response = await scenario(client, state)
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+            response_bytes += len(response.content)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    summary = {
+        "requests": requests,
+        "errors": errors,
+        "seconds": elapsed,
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "response_bytes": response_bytes,
+    }
+    if latencies:
+        summary.update(
+            p50_ms=percentile(latencies, 50) * 1000,
+            p99_ms=percentile(latencies, 99) * 1000,
+            mean_ms=statistics.fmean(latencies) * 1000,
+            max_ms=max(latencies) * 1000,
+        )
+    return summary
+
+
+def make_client(url: str | None, concurrency: int) -> httpx.AsyncClient:
+    if url:
+        return httpx.AsyncClient(
+            base_url=url,
+            timeout=120,
+            limits=httpx.Limits(
+                max_connections=concurrency,
+                max_keepalive_connections=concurrency,
+            ),
+        )
+    # Приложение импортируется только для замера внутри процесса
+    from src.main import app
+
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://bench",
+        timeout=120,
+    )
+
+
+async def dataset_info(client: httpx.AsyncClient, state: RunState) -> dict:
+    counts = (await client.get("/stats")).raise_for_status().json()
+    for order in ("asc", "desc"):
+        response = await client.get(
+            "/features", params={"limit": 1, "order": order}
+        )
+        features = response.raise_for_status().json()["features"]
+        feature_id = features[0]["properties"]["id"] if features else 0
+        if order == "asc":
+            state.min_id = feature_id
+        else:
+            state.max_id = feature_id
+    return {"features": sum(counts.values()), "types": counts}
+
+
+def git_revision() -> dict:
+    def git(*args: str) -> str | None:
+        try:
+            return subprocess.run(
+                ["git", *args], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    status = git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "dirty": bool(status) if status is not None else None,
+    }
+
+
+async def run(args: argparse.Namespace) -> None:
+    state = RunState(rnd=random.Random(args.seed), bulk_size=args.bulk_size)
+    async with make_client(args.url, args.concurrency) as client:
+        dataset = await dataset_info(client, state)
+        results = {}
+        for name in args.scenarios:
+            scenario = SCENARIOS[name]
+            requests = args.bulk_requests if name == "bulk" else args.requests
+            if name == "delete":
+                requests = min(requests, len(state.created))
+            if not requests:
+                continue
+            warmup = min(args.warmup, requests)
+            if name != "delete":
+                await run_scenario(client, scenario, state, warmup, 1)
+            summary = await run_scenario(
+                client, scenario, state, requests, args.concurrency
+            )
+            if name == "bulk":
+                summary["objects_per_second"] = (
+                    summary["throughput_rps"] * args.bulk_size
+                )
+            results[name] = summary
+            print(
+                f"{name:>9}: {summary['throughput_rps']:9.1f} rps"
+                f"  p50 {summary.get('p50_ms', 0):8.2f} ms"
+                f"  p99 {summary.get('p99_ms', 0):8.2f} ms"
+                f"  errors {summary['errors']}"
+            )
+        # Остаток созданных объектов удаляется без замеров
+        while state.created:
+            chunk = state.created[-DELETE_CHUNK_SIZE:]
+            del state.created[-DELETE_CHUNK_SIZE:]
+            await client.post("/features/delete", json={"ids": chunk})
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git": git_revision(),
+            "transport": "http" if args.url else "asgi",
+            "url": args.url,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "dataset": dataset,
+        },
+        "scenarios": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f"Результаты записаны в {args.output}")
+
+
+def compare(args: argparse.Namespace) -> int:
+    with open(args.base, encoding="utf-8") as file:
+        base = json.load(file)["scenarios"]
+    with open(args.new, encoding="utf-8") as file:
+        new = json.load(file)["scenarios"]
+    regressions = 0
+    for name in base.keys() & new.keys():
+        line = [f"{name:>9}:"]
+        for metric, higher_is_better in (
+            ("throughput_rps", True),
+            ("p50_ms", False),
+            ("p99_ms", False),
+        ):
+            old_value = base[name].get(metric)
+            new_value = new[name].get(metric)
+            if not old_value or new_value is None:
+                continue
+            change = new_value / old_value - 1
+            worse = -change if higher_is_better else change
+            mark = ""
+            if metric != "p50_ms" and worse > args.threshold:
+                regressions += 1
+                mark = " !"
+            line.append(f"{metric} {change:+7.1%}{mark}")
+        print("  ".join(line))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Выполнить замеры")
+    run_parser.add_argument(
+        "--url", help="Адрес сервера; без него - ASGITransport в процессе"
+    )
+    run_parser.add_argument("--concurrency", type=int, default=8)
+    run_parser.add_argument("--requests", type=int, default=500)
+    run_parser.add_argument("--bulk-requests", type=int, default=10)
+    run_parser.add_argument("--bulk-size", type=int, default=1000)
+    run_parser.add_argument("--warmup", type=int, default=10)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=SCENARIOS,
+        default=list(SCENARIOS),
+    )
+    run_parser.add_argument("--output", default="benchmark.json")
+
+    compare_parser = commands.add_parser("compare", help="Сравнить прогоны")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+
+    args = parser.parse_args()
+    if args.command == "run":
+        asyncio.run(run(args))
+    else:
+        sys.exit(compare(args))
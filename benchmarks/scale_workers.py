@@ -0,0 +1,157 @@
+"""
+Масштабирование по числу воркеров: для каждого значения WORKERS
+запускается python -m src.server в MODE=PROD, и по HTTP выполняются
+сценарии benchmarks.load. Сводка пропускной способности и p99 по
+сценариям печатается таблицей и пишется в JSON.
+
+Подготовка данных:
+    python -m benchmarks.seed --size 100k --truncate
+
+Замер для 1, 2 и 4 воркеров:
+    python -m benchmarks.scale_workers --workers 1 2 4 \\
+        --concurrency 64 --output scale.json
+
+Чтобы суммарное число соединений с БД не росло вместе с воркерами,
+задайте DB_MAX_CONNECTIONS: пул делится между воркерами поровну.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.load import SCENARIOS, git_revision
+from benchmarks.load import run as run_load
+
+STARTUP_TIMEOUT = 60
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    env = os.environ | {
+        "MODE": "PROD",
+        "WORKERS": str(workers),
+        "SERVER_HOST": "127.0.0.1",
+        "SERVER_PORT": str(port),
+    }
+    return subprocess.Popen([sys.executable, "-m", "src.server"], env=env)
+
+
+def wait_ready(url: str, server: subprocess.Popen) -> None:
+    """
+    Ждет, пока сервер ответит на /health/db
+    :param url: адрес сервера
+    :param server: процесс сервера
+    """
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("Сервер завершился при запуске")
+        try:
+            if httpx.get(f"{url}/health/db", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("Сервер не ответил за отведенное время")
+
+
+def stop_server(server: subprocess.Popen) -> None:
+    server.terminate()
+    try:
+        server.wait(timeout=STARTUP_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+def measure(workers: int, args: argparse.Namespace) -> dict:
+    url = f"http://127.0.0.1:{args.port}"
+    server = start_server(workers, args.port)
+    try:
+        wait_ready(url, server)
+        with tempfile.TemporaryDirectory() as directory:
+            load_args = argparse.Namespace(
+                url=url,
+                concurrency=args.concurrency,
+                requests=args.requests,
+                bulk_requests=args.bulk_requests,
+                bulk_size=args.bulk_size,
+                warmup=args.warmup,
+                seed=args.seed,
+                scenarios=args.scenarios,
+                output=os.path.join(directory, "load.json"),
+            )
+            asyncio.run(run_load(load_args))
+            with open(load_args.output, encoding="utf-8") as file:
+                return json.load(file)
+    finally:
+        stop_server(server)
+
+
+def print_table(results: dict[int, dict], scenarios: list[str]) -> None:
+    base = results[min(results)]["scenarios"]
+    print(f"\n{'workers':>9}" + "".join(f"{name:>22}" for name in scenarios))
+    for workers, report in results.items():
+        cells = []
+        for name in scenarios:
+            summary = report["scenarios"].get(name)
+            if not summary or not base.get(name):
+                cells.append(f"{'-':>22}")
+                continue
+            speedup = summary["throughput_rps"] / base[name]["throughput_rps"]
+            cells.append(
+                f"{summary['throughput_rps']:8.0f} rps x{speedup:4.1f}"
+                f" {summary.get('p99_ms', 0):5.0f}ms"
+            )
+        print(f"{workers:>9}" + "".join(cells))
+
+
+def main(args: argparse.Namespace) -> None:
+    results = {}
+    for workers in args.workers:
+        print(f"\nWORKERS={workers}")
+        results[workers] = measure(workers, args)
+    print_table(results, args.scenarios)
+    report = {
+        "meta": {
+            "git": git_revision(),
+            "cpu_count": os.cpu_count(),
+            "concurrency": args.concurrency,
+            "db_max_connections": os.environ.get("DB_MAX_CONNECTIONS"),
+        },
+        "workers": {
+            str(workers): report["scenarios"]
+            for workers, report in results.items()
+        },
+    }
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f"Результаты записаны в {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--bulk-requests", type=int, default=10)
+    parser.add_argument("--bulk-size", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=SCENARIOS,
+        default=["stats", "list", "filtered", "create"],
+    )
+    parser.add_argument("--output", default="scale.json")
+    main(parser.parse_args())
@@ -0,0 +1,86 @@
+"""
+Наполнение БД синтетическими объектами для нагрузочных замеров
+(benchmarks.load): точки, линии и полигоны в пропорции 3:1:1 с
+логнормальным числом вершин.
+
+Запуск (нужна БД из .env, лучше отдельная от рабочей):
+    python -m benchmarks.seed --size 100k
+    python -m benchmarks.seed --size 1m --truncate
+
+Набор воспроизводим: при одном --seed объекты совпадают. --truncate
+очищает features, журнал изменений и счетчики статистики перед
+наполнением, иначе объекты добавляются к существующим.
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from benchmarks.datasets import iter_features
+from src.connectors.database_init import async_session_maker_null_pool
+from src.managers.db_manager import DBManager
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+
+async def seed(
+    count: int, seed_value: int, batch_size: int, truncate: bool
+) -> None:
+    async with DBManager(
+        session_factories=async_session_maker_null_pool
+    ) as db:
+        if truncate:
+            await db.session.execute(
+                text(
+                    "TRUNCATE features, feature_changes, feature_type_counts "
+                    "RESTART IDENTITY"
+                )
+            )
+            await db.commit()
+        start = time.perf_counter()
+        batch = []
+        added = 0
+        for feature in iter_features(count, seed=seed_value):
+            batch.append(feature)
+            if len(batch) == batch_size:
+                await db.feature.add_many(batch)
+                await db.commit()
+                added += len(batch)
+                batch = []
+                print(f"{added}/{count}", end="\r", flush=True)
+        if batch:
+            await db.feature.add_many(batch)
+            await db.commit()
+            added += len(batch)
+        # Планировщику нужна свежая статистика по новым данным
+        await db.session.execute(text("ANALYZE features"))
+        await db.commit()
+        elapsed = time.perf_counter() - start
+        print(
+            f"Добавлено {added} объектов за {elapsed:.1f} с "
+            f"({added / elapsed:.0f} объектов/с)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--size", choices=SIZES, default="1k")
+    parser.add_argument(
+        "--count", type=int, help="Количество объектов вместо --size"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--truncate", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(
+        seed(
+            args.count or SIZES[args.size],
+            args.seed,
+            args.batch_size,
+            args.truncate,
+        )
+    )
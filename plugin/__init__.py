@@ -5,20 +5,35 @@ SyncPlugin — плагин QGIS для синхронизации вектор
 изменений (добавление и удаление объектов) обратно на сервер.
 
 Версия QGIS: >= 3.40
-TODO: Сделать настройку url для разных аpi
+Адрес API и число одновременных запросов задаются в настройках QGIS:
+sync_plugin/api_url и sync_plugin/concurrency.
 """
 import os
-import requests
-from typing import Optional, Any, Dict, List
+from typing import Optional, Any, Dict, List, Tuple
 
 from qgis.PyQt.QtGui import QIcon
 from qgis.PyQt.QtWidgets import QAction
 from qgis.PyQt.QtCore import QVariant
 from qgis.core import (
     QgsProject, QgsVectorLayer, QgsFeature, QgsGeometry,
-    QgsPointXY, QgsField, QgsMessageLog, Qgis, QgsWkbTypes
+    QgsPointXY, QgsField, QgsMessageLog, Qgis, QgsWkbTypes,
+    QgsApplication, QgsSettings
 )
 
+from .network import ApiClient, ApiTask
+
+# Настройки плагина (QgsSettings) и значения по умолчанию
+API_URL_SETTING = "sync_plugin/api_url"
+CONCURRENCY_SETTING = "sync_plugin/concurrency"
+DEFAULT_API_URL = "http://localhost"
+DEFAULT_CONCURRENCY = 4
+# Пользовательские свойства слоя с состоянием инкрементальной синхронизации
+CURSOR_PROPERTY = "sync_plugin/cursor"
+# Соответствие QGIS-ID → API-ID хранится по свойству на объект:
+# sync_plugin/ids/<QGIS-ID> = <API-ID>
+IDS_PROPERTY = "sync_plugin/ids"
+
+
 def classFactory(iface: Any) -> 'SyncPlugin':
     """
     Фабричная функция для создания экземпляра плагина QGIS.
@@ -46,7 +61,17 @@ class SyncPlugin:
         self.line_layer: Optional[QgsVectorLayer] = None
         self.polygon_layer: Optional[QgsVectorLayer] = None
         self.sync_action: Optional[QAction] = None
+        self.full_sync_action: Optional[QAction] = None
         self._ids: Dict[str, Dict[int, int]] = {}
+        settings = QgsSettings()
+        self.client = ApiClient(
+            settings.value(API_URL_SETTING, DEFAULT_API_URL),
+            concurrency=settings.value(CONCURRENCY_SETTING, DEFAULT_CONCURRENCY, type=int),
+        )
+        # Очередь фоновых задач: выполняется только первая, остальные
+        # ждут ее завершения. Без ссылки на задачи Python удалит их
+        # объекты раньше, чем они завершатся
+        self._tasks: List[Tuple[Optional[str], ApiTask]] = []
 
     def initGui(self) -> None:
         """
@@ -55,8 +80,11 @@ class SyncPlugin:
         icon_path = os.path.join(os.path.dirname(__file__), "icon.png")
         icon = QIcon(icon_path)
         self.sync_action = QAction(icon,"Синхронизировать слои", self.iface.mainWindow())
-        self.sync_action.triggered.connect(self.sync_layers)
+        self.sync_action.triggered.connect(lambda: self.sync_layers())
         self.iface.addToolBarIcon(self.sync_action)
+        self.full_sync_action = QAction(icon, "Загрузить слои заново", self.iface.mainWindow())
+        self.full_sync_action.triggered.connect(self.full_sync_layers)
+        self.iface.addPluginToMenu("SyncPlugin", self.full_sync_action)
 
     def unload(self) -> None:
         """
@@ -65,6 +93,15 @@ class SyncPlugin:
         if self.sync_action:
             self.iface.removeToolBarIcon(self.sync_action)
             self.sync_action = None
+        if self.full_sync_action:
+            self.iface.removePluginMenu("SyncPlugin", self.full_sync_action)
+            self.full_sync_action = None
+        if self._tasks:
+            # Ожидающие задачи еще не переданы диспетчеру задач
+            _, running = self._tasks[0]
+            self._tasks.clear()
+            running.cancel()
+        self.client.close()
 
     def _connect_layer_signals(self) -> None:
         """
@@ -171,42 +208,91 @@ class SyncPlugin:
     def _on_features_added(self, layer: QgsVectorLayer, added_features: List[QgsFeature], geometry_type: str) -> None:
         """
         Обработчик события добавления объектов в слой.
+        Объекты отправляются в API фоновой задачей, полученные ID
+        записываются в слой по ее завершении.
 
         :param layer: слой QGIS
         :param added_features: список добавленных объектов
         :param geometry_type: тип геометрии слоя
         """
+        internal_ids: List[int] = []
+        features: List[Dict[str, Any]] = []
         for feature in added_features:
-            _id = self._send_feature_to_api(feature)
-            if _id is None:
-                self._log(f"Не удалось получить ID от API для объекта типа "
-                          f"«{geometry_type}»", Qgis.Critical)
+            data = self._feature_to_geojson_dict(feature)
+            if not data:
+                self._log("Не удалось сформировать объект для отправки в API.", Qgis.Critical)
                 continue
+            internal_ids.append(feature.id())
+            features.append(data)
+        if not features:
+            return
+
+        def on_finished(external_ids: Optional[List[Optional[int]]], errors: List[str]) -> None:
+            for error in errors:
+                self._log(error, Qgis.Critical)
             id_idx = layer.fields().indexFromName("id")
             if id_idx == -1:
                 self._log("Поле 'id' не найдено в слое.", Qgis.Critical)
-                continue
-
-            success = layer.dataProvider().changeAttributeValues({feature.id(): {id_idx: _id}})
-            layer_name = layer.name()
-            if layer_name not in self._ids:
-                self._ids[layer_name] = {}
-            self._ids[layer_name][feature.id()] = _id
-            if success:
-                self._log(f"Добавлен объект типа «{geometry_type}» с ID {_id}")
+                return
+            attribute_changes: Dict[int, Dict[int, Any]] = {}
+            for internal_id, external_id in zip(internal_ids, external_ids or []):
+                if external_id is None:
+                    continue
+                attribute_changes[internal_id] = {id_idx: external_id}
+                self._set_layer_id(layer, internal_id, external_id)
+            failed = len(internal_ids) - len(attribute_changes)
+            if failed:
+                self._log(f"Не удалось получить ID от API для {failed} объектов типа "
+                          f"«{geometry_type}»", Qgis.Critical)
+            if not attribute_changes:
+                return
+            if layer.dataProvider().changeAttributeValues(attribute_changes):
+                self._log(f"Добавлено объектов типа «{geometry_type}»: {len(attribute_changes)}")
             else:
-                self._log(f"Не удалось обновить ID объекта типа «"
+                self._log(f"Не удалось обновить ID объектов типа «"
                           f"{geometry_type}»", Qgis.Critical)
 
+        self._start_task(ApiTask(
+            f"SyncPlugin: отправка объектов «{geometry_type}»",
+            lambda task: self.client.upload(features, task),
+            on_finished,
+            total=len(features),
+        ))
+
     def _on_features_removed(self, layer: QgsVectorLayer, removed_ids: List[int], geometry_type: str) -> None:
         """
-       Обработчик события удаления объектов из слоя.
+        Обработчик события удаления объектов из слоя.
+        Объекты удаляются в API фоновой задачей.
 
-       :param layer: слой QGIS
-       :param removed_ids: список ID удаленных объектов
-       """
-        for feature_id in removed_ids:
-            self._delete_feature_from_api(feature_id, layer)
+        :param layer: слой QGIS
+        :param removed_ids: список ID удаленных объектов
+        :param geometry_type: тип геометрии слоя
+        """
+        external_ids: List[int] = []
+        for internal_id in removed_ids:
+            external_id = self._remove_layer_id(layer, internal_id)
+            if external_id is None:
+                self._log(f"Не найден внешний ID для внутреннего ID {internal_id} в слое {layer.name()}", Qgis.Critical)
+                continue
+            external_ids.append(external_id)
+        if not external_ids:
+            return
+
+        def on_finished(deleted: Optional[List[int]], errors: List[str]) -> None:
+            for error in errors:
+                self._log(error, Qgis.Warning)
+            failed = set(external_ids) - set(deleted or [])
+            if failed:
+                self._log(f"Не удалось удалить в API объекты типа «{geometry_type}»: "
+                          f"{sorted(failed)}", Qgis.Critical)
+            self._log(f"Удалено в API объектов типа «{geometry_type}»: {len(external_ids) - len(failed)}")
+
+        self._start_task(ApiTask(
+            f"SyncPlugin: удаление объектов «{geometry_type}»",
+            lambda task: self.client.delete(external_ids, task),
+            on_finished,
+            total=len(external_ids),
+        ))
 
     def _on_features_modified(self, layer: QgsVectorLayer, attribute_changes: Dict[int, Dict[int, Any]], geometry_type: str) -> None:
         """
@@ -230,84 +316,293 @@ class SyncPlugin:
         for feature_id in geometry_changes:
             self._log(f"Мог быть изменён объект (геометрия) типа «{geometry_type}» с ID {feature_id}, но пока нет метода для отправки данных на API")
 
-    def _log(self, message: str) -> None:
+    def _log(self, message: str, level: Qgis.MessageLevel = Qgis.Info) -> None:
         """
         Записывает сообщение в лог QGIS.
 
         :param message: сообщение для записи
+        :param level: уровень сообщения
         """
-        QgsMessageLog.logMessage(message, "SyncPlugin", level=Qgis.Info)
+        QgsMessageLog.logMessage(message, "SyncPlugin", level=level)
 
-    def sync_layers(self) -> None:
+    def full_sync_layers(self) -> None:
+        """
+        Полная синхронизация: очищает слои и загружает все объекты заново.
+        """
+        self.sync_layers(full=True)
+
+    def sync_layers(self, full: bool = False) -> None:
         """
         Основная функция синхронизации слоёв с API.
-        Загружает данные из API и обновляет слои в QGIS.
-        """
-        try:
-            response = requests.get("http://localhost/features")
-            response.raise_for_status()
-            data = response.json()
-            self._log("Данные успешно загружены из API.")
-        except requests.RequestException as error:
-            self._log(f"Ошибка запроса к API: {error}", Qgis.Critical)
-            return
+        Запрашивает у API только изменения после сохранённого курсора и
+        применяет их к слоям: добавляет новые объекты, удаляет удалённые и
+        обновляет изменённые. Курсор и соответствие QGIS-ID → API-ID
+        хранятся в пользовательских свойствах слоёв и сохраняются вместе
+        с проектом. Слой в памяти теряет объекты при перезапуске QGIS,
+        поэтому для него состояние из проекта не используется. Если
+        состояние не найдено или не совпадает с содержимым слоя,
+        выполняется полная синхронизация.
 
+        :param full: очистить слои и загрузить все объекты заново
+        """
         self.point_layer = self._get_or_create_layer("Points_synced", "Point")
         self.line_layer = self._get_or_create_layer("Lines_synced", "LineString")
         self.polygon_layer = self._get_or_create_layer("Polygons_synced", "Polygon")
+        self._connect_layer_signals()
+
+        cursor = None if full else self._load_sync_state()
+        if cursor is None:
+            self._log("Состояние синхронизации не найдено, слои будут загружены заново.")
+            for layer in self._geometry_type_to_layer().values():
+                layer.dataProvider().truncate()
+                self._clear_layer_ids(layer)
+            cursor = 0
+
+        pages: List[Dict[str, Any]] = []
+
+        def work(task: ApiTask) -> None:
+            since = cursor
+            while not task.isCanceled():
+                changes = self.client.get_changes(since)
+                pages.append(changes)
+                since = changes["cursor"]
+                if not changes["has_more"]:
+                    break
+
+        def on_finished(result: None, errors: List[str]) -> None:
+            # Применяем даже неполный результат: курсор сохраняется
+            # по последней полученной порции
+            last_cursor = cursor
+            applied = 0
+            for changes in pages:
+                applied += self._apply_changes(changes)
+                last_cursor = changes["cursor"]
+            self._save_sync_state(last_cursor)
+            for layer in self._geometry_type_to_layer().values():
+                layer.updateExtents()
+                layer.triggerRepaint()
+            for error in errors:
+                self._log(error, Qgis.Critical)
+            self._log(f"Слои синхронизированы, применено изменений: {applied}, курсор {last_cursor}.")
+
+        self._start_task(ApiTask("SyncPlugin: синхронизация слоёв", work, on_finished), "sync")
+
+    def _start_task(self, task: ApiTask, kind: Optional[str] = None) -> bool:
+        """
+        Ставит фоновую задачу в очередь и хранит ссылку на нее до
+        завершения. Задачи выполняются по одной: синхронизация, запущенная
+        во время отправки, получила бы из журнала изменений только что
+        созданные объекты раньше, чем их ID попадут в соответствие
+        QGIS-ID → API-ID, и добавила бы их в слой повторно.
+
+        :param task: задача
+        :param kind: вид задачи, для которого допускается только одна
+            задача в очереди
+        :return: False, если задача этого вида уже в очереди
+        """
+        if kind and any(kind == queued_kind for queued_kind, _ in self._tasks):
+            self._log("Синхронизация уже выполняется.", Qgis.Warning)
+            return False
+        entry = (kind, task)
+        self._tasks.append(entry)
+
+        def forget() -> None:
+            if entry in self._tasks:
+                self._tasks.remove(entry)
+                self._run_next_task()
+
+        task.taskCompleted.connect(forget)
+        task.taskTerminated.connect(forget)
+        if len(self._tasks) == 1:
+            self._run_next_task()
+        return True
+
+    def _run_next_task(self) -> None:
+        """
+        Передает диспетчеру задач QGIS первую задачу из очереди.
+        """
+        if self._tasks:
+            _, task = self._tasks[0]
+            QgsApplication.taskManager().addTask(task)
 
-        geometry_type_to_layer = {
+    def _geometry_type_to_layer(self) -> Dict[str, QgsVectorLayer]:
+        """
+        Возвращает синхронизируемые слои по типу геометрии GeoJSON.
+
+        :return: словарь тип геометрии → слой
+        """
+        layers = {
             "Point": self.point_layer,
             "LineString": self.line_layer,
             "Polygon": self.polygon_layer,
         }
+        return {geom_type: layer for geom_type, layer in layers.items() if layer}
 
-        for layer in geometry_type_to_layer.values():
-            if layer:
-                layer.dataProvider().truncate()
-                layer.triggerRepaint()
+    def _load_sync_state(self) -> Optional[int]:
+        """
+        Загружает курсор и соответствие QGIS-ID → API-ID из свойств слоёв.
 
-        self._connect_layer_signals()
+        :return: курсор, с которого продолжать синхронизацию, или None,
+            если состояние отсутствует или не совпадает с данными слоя
+        """
+        cursors = []
+        for layer in self._geometry_type_to_layer().values():
+            cursor = layer.customProperty(CURSOR_PROPERTY)
+            if cursor is None:
+                return None
+            if layer.name() not in self._ids:
+                # Слой в памяти не сохраняет объекты между сессиями QGIS,
+                # а свойства сохраняются вместе с проектом: курсор из
+                # проекта к такому слою неприменим
+                if layer.providerType() == "memory":
+                    layer.removeCustomProperty(CURSOR_PROPERTY)
+                    return None
+                prefix = f"{IDS_PROPERTY}/"
+                self._ids[layer.name()] = {
+                    int(key[len(prefix):]): int(layer.customProperty(key))
+                    for key in layer.customPropertyKeys()
+                    if key.startswith(prefix)
+                }
+            if len(self._ids[layer.name()]) != layer.dataProvider().featureCount():
+                return None
+            cursors.append(int(cursor))
+        return min(cursors) if cursors else None
+
+    def _save_sync_state(self, cursor: int) -> None:
+        """
+        Сохраняет курсор в свойства слоёв.
+
+        :param cursor: курсор последней применённой порции изменений
+        """
+        for layer in self._geometry_type_to_layer().values():
+            layer.setCustomProperty(CURSOR_PROPERTY, cursor)
+
+    def _set_layer_id(self, layer: QgsVectorLayer, internal_id: int, external_id: int) -> None:
+        """
+        Запоминает API-ID объекта слоя в памяти и в свойствах слоя.
+
+        :param layer: слой QGIS
+        :param internal_id: ID объекта в QGIS
+        :param external_id: ID объекта в API
+        """
+        self._ids.setdefault(layer.name(), {})[internal_id] = external_id
+        layer.setCustomProperty(f"{IDS_PROPERTY}/{internal_id}", external_id)
 
-        for feature_data in data.get("features", []):
+    def _remove_layer_id(self, layer: QgsVectorLayer, internal_id: int) -> Optional[int]:
+        """
+        Забывает API-ID объекта слоя.
+
+        :param layer: слой QGIS
+        :param internal_id: ID объекта в QGIS
+        :return: API-ID объекта или None, если он не был известен
+        """
+        layer.removeCustomProperty(f"{IDS_PROPERTY}/{internal_id}")
+        return self._ids.get(layer.name(), {}).pop(internal_id, None)
+
+    def _clear_layer_ids(self, layer: QgsVectorLayer) -> None:
+        """
+        Забывает API-ID всех объектов слоя.
+
+        :param layer: слой QGIS
+        """
+        prefix = f"{IDS_PROPERTY}/"
+        for key in layer.customPropertyKeys():
+            if key.startswith(prefix):
+                layer.removeCustomProperty(key)
+        self._ids[layer.name()] = {}
+
+    def _apply_changes(self, changes: Dict[str, Any]) -> int:
+        """
+        Применяет порцию изменений из /features/changes к слоям.
+
+        :param changes: ответ API с полями upserted и deleted
+        :return: количество применённых изменений
+        """
+        layers = self._geometry_type_to_layer()
+        locations: Dict[int, Tuple[QgsVectorLayer, int]] = {}
+        for layer in layers.values():
+            for internal_id, external_id in self._ids.setdefault(layer.name(), {}).items():
+                locations[external_id] = (layer, internal_id)
+
+        to_delete: Dict[str, List[int]] = {}
+        to_add: Dict[str, List[Tuple[int, QgsFeature]]] = {}
+        geometry_changes: Dict[str, Dict[int, QgsGeometry]] = {}
+        attribute_changes: Dict[str, Dict[int, Dict[int, Any]]] = {}
+
+        for external_id in changes.get("deleted", []):
+            if external_id in locations:
+                layer, internal_id = locations.pop(external_id)
+                to_delete.setdefault(layer.name(), []).append(internal_id)
+
+        for feature_data in changes.get("upserted", []):
             geom_type = feature_data["geometry"]["type"]
-            coordinates = feature_data["geometry"]["coordinates"]
             properties = feature_data.get("properties", {})
             external_id = properties.get("id", 0)
-            layer = geometry_type_to_layer.get(geom_type)
+            layer = layers.get(geom_type)
             if not layer:
                 self._log(f"Пропущен объект с типом геометрии {geom_type} — слой не найден.", Qgis.Critical)
                 continue
-
-            qgs_feature = QgsFeature()
-            qgs_feature.setFields(layer.fields())
-
-            if geom_type == "Point":
-                qgs_feature.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(*coordinates)))
-            elif geom_type == "LineString":
-                qgs_feature.setGeometry(QgsGeometry.fromPolylineXY([QgsPointXY(*pt) for pt in coordinates]))
-            elif geom_type == "Polygon":
-                qgs_feature.setGeometry(QgsGeometry.fromPolygonXY([[QgsPointXY(*pt) for pt in coordinates[0]]]))
-            else:
-                self._log(f"Неизвестный тип геометрии: {geom_type}",
-                    Qgis.Warning)
+            geometry = self._geometry_from_geojson(feature_data["geometry"])
+            if geometry is None:
                 continue
-
+            location = locations.get(external_id)
+            if location and location[0] is not layer:
+                # Тип геометрии изменился: объект переезжает в другой слой
+                to_delete.setdefault(location[0].name(), []).append(location[1])
+                location = None
+            if location:
+                internal_id = location[1]
+                fields = layer.fields()
+                geometry_changes.setdefault(layer.name(), {})[internal_id] = geometry
+                attribute_changes.setdefault(layer.name(), {})[internal_id] = {
+                    fields.indexFromName("name"): properties.get("name", ""),
+                    fields.indexFromName("type"): properties.get("type", ""),
+                }
+                continue
+            qgs_feature = QgsFeature(layer.fields())
+            qgs_feature.setGeometry(geometry)
             qgs_feature.setAttribute("name", properties.get("name", ""))
             qgs_feature.setAttribute("type", properties.get("type", ""))
             qgs_feature.setAttribute("id", external_id)
-            success = layer.dataProvider().addFeature(qgs_feature)
-            if success:
-                internal_id = qgs_feature.id()
-                layer_name = layer.name()
-                if layer_name not in self._ids:
-                    self._ids[layer_name] = {}
-                self._ids[layer_name][internal_id] = external_id
-                self._log(f"Объект добавлен: QGIS-ID={layer_name}/{internal_id} → API-ID={external_id}")
-            else:
-                self._log("Не удалось добавить объект в слой.", Qgis.Critical)
-
-        self._log("Слои успешно синхронизированы.")
+            to_add.setdefault(layer.name(), []).append((external_id, qgs_feature))
+
+        for layer in layers.values():
+            name = layer.name()
+            provider = layer.dataProvider()
+            if name in to_delete:
+                provider.deleteFeatures(to_delete[name])
+                for internal_id in to_delete[name]:
+                    self._remove_layer_id(layer, internal_id)
+            if name in geometry_changes:
+                provider.changeGeometryValues(geometry_changes[name])
+                provider.changeAttributeValues(attribute_changes[name])
+            if name in to_add:
+                success, added = provider.addFeatures([feature for _, feature in to_add[name]])
+                if not success:
+                    self._log(f"Не удалось добавить объекты в слой {name}.", Qgis.Critical)
+                    continue
+                for (external_id, _), qgs_feature in zip(to_add[name], added):
+                    self._set_layer_id(layer, qgs_feature.id(), external_id)
+
+        return len(changes.get("deleted", [])) + len(changes.get("upserted", []))
+
+    def _geometry_from_geojson(self, geometry: Dict[str, Any]) -> Optional[QgsGeometry]:
+        """
+        Строит геометрию QGIS из геометрии GeoJSON.
+
+        :param geometry: геометрия GeoJSON
+        :return: геометрия QGIS или None для неподдерживаемого типа
+        """
+        geom_type = geometry["type"]
+        coordinates = geometry["coordinates"]
+        if geom_type == "Point":
+            return QgsGeometry.fromPointXY(QgsPointXY(*coordinates))
+        if geom_type == "LineString":
+            return QgsGeometry.fromPolylineXY([QgsPointXY(*pt) for pt in coordinates])
+        if geom_type == "Polygon":
+            return QgsGeometry.fromPolygonXY([[QgsPointXY(*pt) for pt in ring] for ring in coordinates])
+        self._log(f"Неизвестный тип геометрии: {geom_type}", Qgis.Warning)
+        return None
 
     def _get_or_create_layer(self, name: str, geometry_type: str) -> QgsVectorLayer:
         """
@@ -372,51 +667,3 @@ class SyncPlugin:
                 "type": str(feature["type"]),
             },
         }
-
-    def _send_feature_to_api(self, feature: QgsFeature) -> Optional[int]:
-        """
-        Отправляет объект в API и возвращает полученный ID.
-
-        :param feature: объект QGIS для отправки
-        :return: ID объекта из API или None в случае ошибки
-        """
-        data = self._feature_to_geojson_dict(feature)
-        if not data:
-            self._log("Не удалось сформировать объект для отправки в API.", Qgis.Critical)
-            return None
-
-        try:
-            response = requests.post("http://localhost/features", json=data, timeout=5)
-            if response.status_code == 201:
-                self._log("Объект успешно отправлен в API.")
-                return response.json().get("id")
-            else:
-                self._log(f"Ошибка API: код {response.status_code}, ответ: {response.text}", Qgis.Critical)
-        except requests.RequestException as error:
-            self._log(f"Ошибка сети при отправке запроса: {error}", Qgis.Critical)
-        return None
-
-    def _delete_feature_from_api(self, internal_id_feature: int, layer: QgsVectorLayer) -> None:
-        """
-        Удаляет объект из API по его ID.
-
-        :param internal_id_feature: внутренний ID объекта в QGIS
-        :param layer: слой, содержащий объект
-        """
-        external_id = None
-        layer_name = layer.name()
-        if layer_name in self._ids and internal_id_feature in self._ids[layer_name]:
-            external_id = self._ids[layer_name].pop(internal_id_feature)
-
-        if external_id is None:
-            self._log(f"Не найден внешний ID для внутреннего ID {internal_id_feature} в слое {layer.name()}", Qgis.Critical)
-            return
-
-        try:
-            response = requests.delete(f"http://localhost/features/{external_id}", timeout=5)
-            if response.status_code == 204:
-                self._log("Объект успешно удален в API.")
-            else:
-                self._log(f"Ошибка API: код {response.status_code}, ответ: {response.text}", Qgis.Critical)
-        except requests.RequestException as error:
-            self._log(f"Ошибка сети при отправке запроса: {error}", Qgis.Warning)
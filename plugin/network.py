@@ -0,0 +1,244 @@
+"""
+Сетевая часть SyncPlugin: клиент API с пулом keep-alive соединений и
+фоновые задачи QGIS, которые выполняют запросы вне основного потока.
+"""
+import json
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from qgis.core import QgsTask
+
+# Объектов в одном запросе к /features/bulk и /features/delete
+BULK_CHUNK_SIZE = 1000
+CHANGES_PAGE_SIZE = 10000
+# Токен read-your-writes: сервер возвращает его в ответах на запись,
+# клиент отправляет со следующими чтениями, чтобы читать не со старой реплики
+CONSISTENCY_HEADER = "X-Consistency-Token"
+
+
+class ApiError(Exception):
+    pass
+
+
+class ApiClient:
+    """
+    Клиент REST API с общим requests.Session: соединения переиспользуются
+    между запросами, размер пула равен числу параллельных запросов.
+    Пакетные эндпоинты используются, если сервер их поддерживает,
+    иначе объекты отправляются по одному параллельно.
+    """
+    def __init__(self, base_url: str, concurrency: int = 4, timeout: float = 30) -> None:
+        """
+        :param base_url: адрес API без завершающего слэша
+        :param concurrency: число одновременных запросов
+        :param timeout: таймаут одного запроса, секунд
+        """
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # None — еще не проверяли, поддерживает ли сервер пакетные эндпоинты
+        self.bulk_supported: Optional[bool] = None
+        # Наибольший токен из ответов на запись, общий для потоков пула
+        self.consistency_token: Optional[int] = None
+        self._token_lock = threading.Lock()
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _request(self, method: str, path: str, **kwargs: Any) -> requests.Response:
+        if method == "GET" and self.consistency_token is not None:
+            kwargs["headers"] = {**kwargs.get("headers", {}), CONSISTENCY_HEADER: str(self.consistency_token)}
+        try:
+            response = self.session.request(method, f"{self.base_url}{path}", timeout=self.timeout, **kwargs)
+        except requests.RequestException as error:
+            raise ApiError(f"Ошибка сети при запросе {method} {path}: {error}") from error
+        token = response.headers.get(CONSISTENCY_HEADER)
+        if token and token.isdigit():
+            with self._token_lock:
+                self.consistency_token = max(int(token), self.consistency_token or 0)
+        return response
+
+    @staticmethod
+    def _check(response: requests.Response, *statuses: int) -> requests.Response:
+        if response.status_code not in statuses:
+            raise ApiError(f"Ошибка API: код {response.status_code}, ответ: {response.text}")
+        return response
+
+    def get_changes(self, since: int, limit: int = CHANGES_PAGE_SIZE) -> Dict[str, Any]:
+        """
+        Запрашивает порцию изменений после курсора since.
+
+        :param since: курсор последней примененной порции
+        :param limit: максимальное число записей журнала в порции
+        :return: ответ /features/changes
+        """
+        response = self._request("GET", "/features/changes", params={"since": since, "limit": limit})
+        return self._check(response, 200).json()
+
+    def upload(self, features: List[Dict[str, Any]], task: Optional["ApiTask"] = None) -> List[Optional[int]]:
+        """
+        Отправляет объекты в API.
+
+        :param features: объекты в формате GeoJSON
+        :param task: задача для отчета о прогрессе и проверки отмены
+        :return: ID объектов в API в порядке features (None для неотправленных)
+        """
+        chunks = [features[i:i + BULK_CHUNK_SIZE] for i in range(0, len(features), BULK_CHUNK_SIZE)]
+        if chunks and self.bulk_supported is not False:
+            ids = self._upload_chunk(chunks[0])
+            if ids is not None:
+                if task:
+                    task.advance(len(chunks[0]))
+                rest = self._run_concurrently(self._upload_chunk, chunks[1:], task, len)
+                for chunk, chunk_ids in zip(chunks[1:], rest):
+                    ids.extend(chunk_ids or [None] * len(chunk))
+                return ids
+        return self._run_concurrently(self._upload_one, features, task)
+
+    def _upload_chunk(self, chunk: List[Dict[str, Any]]) -> Optional[List[Optional[int]]]:
+        body = "".join(json.dumps(feature) + "\n" for feature in chunk)
+        response = self._request(
+            "POST", "/features/bulk",
+            data=body.encode(),
+            headers={"Content-Type": "application/x-ndjson"},
+            params={"batch_size": len(chunk)},
+        )
+        if response.status_code in (404, 405):
+            self.bulk_supported = False
+            return None
+        self.bulk_supported = True
+        # Отклоненные сервером объекты приходят в ids как None
+        return self._check(response, 200).json()["ids"]
+
+    def _upload_one(self, feature: Dict[str, Any]) -> Optional[int]:
+        response = self._check(self._request("POST", "/features", json=feature), 201)
+        return response.json().get("id")
+
+    def delete(self, ids: List[int], task: Optional["ApiTask"] = None) -> List[int]:
+        """
+        Удаляет объекты в API.
+
+        :param ids: ID объектов в API
+        :param task: задача для отчета о прогрессе и проверки отмены
+        :return: ID объектов, которые были удалены или уже отсутствовали
+        """
+        chunks = [ids[i:i + BULK_CHUNK_SIZE] for i in range(0, len(ids), BULK_CHUNK_SIZE)]
+        if chunks and self.bulk_supported is not False:
+            deleted = self._delete_chunk(chunks[0])
+            if deleted is not None:
+                if task:
+                    task.advance(len(chunks[0]))
+                rest = self._run_concurrently(self._delete_chunk, chunks[1:], task, len)
+                return deleted + [feature_id for chunk in rest if chunk for feature_id in chunk]
+        results = self._run_concurrently(self._delete_one, ids, task)
+        return [feature_id for feature_id in results if feature_id is not None]
+
+    def _delete_chunk(self, chunk: List[int]) -> Optional[List[int]]:
+        response = self._request("POST", "/features/delete", json={"ids": chunk})
+        if response.status_code in (404, 405):
+            self.bulk_supported = False
+            return None
+        self.bulk_supported = True
+        result = self._check(response, 200).json()
+        # Отсутствующие в API объекты тоже считаем удаленными
+        return result["ids"] + result["missing"]
+
+    def _delete_one(self, feature_id: int) -> Optional[int]:
+        self._check(self._request("DELETE", f"/features/{feature_id}"), 204, 404)
+        return feature_id
+
+    def _run_concurrently(
+        self,
+        function: Callable[[Any], Any],
+        items: List[Any],
+        task: Optional["ApiTask"] = None,
+        weight: Callable[[Any], int] = lambda item: 1,
+    ) -> List[Any]:
+        """
+        Выполняет function для каждого элемента в пуле потоков.
+        Ошибка отдельного запроса не прерывает остальные: результат для
+        него None, текст ошибки попадает в task.errors.
+
+        :param function: запрос для одного элемента
+        :param items: элементы
+        :param task: задача для отчета о прогрессе и проверки отмены
+        :param weight: вклад элемента в прогресс
+        :return: результаты в порядке items
+        """
+        results: List[Any] = [None] * len(items)
+        if not items:
+            return results
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {executor.submit(function, item): index for index, item in enumerate(items)}
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    results[index] = future.result()
+                except CancelledError:
+                    continue
+                except ApiError as error:
+                    if task:
+                        task.errors.append(str(error))
+                if task:
+                    task.advance(weight(items[index]))
+                    if task.isCanceled():
+                        for pending in futures:
+                            pending.cancel()
+        return results
+
+
+class ApiTask(QgsTask):
+    """
+    Фоновая задача QGIS с запросами к API. Функция work выполняется вне
+    основного потока и не должна обращаться к слоям; on_finished
+    вызывается в основном потоке с результатом work и списком ошибок.
+    """
+    def __init__(
+        self,
+        description: str,
+        work: Callable[["ApiTask"], Any],
+        on_finished: Callable[[Any, List[str]], None],
+        total: int = 0,
+    ) -> None:
+        """
+        :param description: название задачи в диспетчере задач QGIS
+        :param work: функция, выполняющая запросы
+        :param on_finished: обработчик результата в основном потоке
+        :param total: объем работы для индикатора прогресса
+        """
+        super().__init__(description, QgsTask.CanCancel)
+        self.work = work
+        self.on_finished = on_finished
+        self.total = total
+        self.done = 0
+        self.result: Any = None
+        self.errors: List[str] = []
+
+    def advance(self, amount: int = 1) -> None:
+        """
+        Отмечает выполненную часть работы.
+
+        :param amount: объем выполненной работы
+        """
+        self.done += amount
+        if self.total:
+            self.setProgress(min(100.0, self.done * 100.0 / self.total))
+
+    def run(self) -> bool:
+        try:
+            self.result = self.work(self)
+        except ApiError as error:
+            self.errors.append(str(error))
+            return False
+        return not self.isCanceled()
+
+    def finished(self, result: bool) -> None:
+        self.on_finished(self.result, self.errors)
@@ -1,14 +1,186 @@
-from typing import Annotated
+from typing import Annotated, Literal
 
-from fastapi import Depends
+from fastapi import Depends, Header, HTTPException, Query, Request, status
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from src.cache.etag import CACHE_CONTROL, etag_matches, make_etag
 from src.connectors.database_init import async_session_maker
+from src.connectors.replicas import replica_router
 from src.managers.db_manager import DBManager
+from src.schemas.feature import FeatureFilter, FeaturePage, GeometryOptions
 
+# Токен read-your-writes: версия коллекции после записи. Приходит в
+# ответах на запись, клиент отправляет его с последующими чтениями
+CONSISTENCY_HEADER = "X-Consistency-Token"
 
-async def get_db():
+
+async def get_read_session_factory(
+    consistency_token: int | None = Header(
+        default=None,
+        alias=CONSISTENCY_HEADER,
+        ge=0,
+        description="Версия из ответа на запись: чтение увидит эту запись",
+    ),
+) -> async_sessionmaker[AsyncSession]:
+    """
+    Фабрика сессий для чтения, одна на запрос: реплика по стратегии из
+    настроек или основная БД, если реплик нет, они отстают или еще не
+    получили запись с версией consistency_token
+    :return: async_sessionmaker[AsyncSession]
+    """
+    replica = await replica_router.choose(consistency_token or 0)
+    return replica or async_session_maker
+
+
+ReadSessionFactoryDep = Annotated[
+    async_sessionmaker[AsyncSession], Depends(get_read_session_factory)
+]
+
+
+async def get_db(read_session_factory: ReadSessionFactoryDep):
+    async with DBManager(
+        session_factories=async_session_maker,
+        read_session_factories=read_session_factory,
+    ) as db:
+        yield db
+
+
+async def get_primary_db():
+    """
+    DBManager, который и читает из основной БД: для чтений, результат
+    которых кэшируется. Реплика может еще не получить запись, после
+    которой кэш сброшен, и в кэш снова попали бы старые данные
+    """
     async with DBManager(session_factories=async_session_maker) as db:
         yield db
 
 
+def get_session_factory(
+    read_session_factory: ReadSessionFactoryDep,
+) -> async_sessionmaker[AsyncSession]:
+    """
+    Фабрика сессий для потоковых ответов: сессия из get_db закрывается
+    до отправки тела ответа, поэтому генератор открывает свою. Потоки
+    только читают, поэтому это та же фабрика, что и для чтения в get_db
+    :return: async_sessionmaker[AsyncSession]
+    """
+    return read_session_factory
+
+
+def get_feature_filter(
+    bbox: str | None = Query(
+        default=None,
+        description="Охватывающий прямоугольник minx,miny,maxx,maxy",
+        examples=["38.9,45.0,39.0,45.1"],
+    ),
+    intersects: str | None = Query(
+        default=None,
+        description="GeoJSON геометрия, с которой пересекаются объекты",
+    ),
+    within: str | None = Query(
+        default=None,
+        description="GeoJSON геометрия, внутри которой лежат объекты",
+    ),
+) -> FeatureFilter:
+    try:
+        return FeatureFilter.model_validate({
+            "bbox": bbox,
+            "intersects": intersects,
+            "within": within,
+        })
+    except ValidationError as ex:
+        raise RequestValidationError([
+            {**error, "loc": ("query", *error["loc"])}
+            for error in ex.errors(include_url=False, include_context=False)
+        ])
+
+
+def get_feature_page(
+    limit: int | None = Query(
+        default=None,
+        ge=1,
+        le=10_000,
+        description="Размер страницы, без него отдаются все объекты",
+    ),
+    after_id: int | None = Query(
+        default=None,
+        description="Курсор: id последнего объекта предыдущей страницы",
+    ),
+    order: Literal["asc", "desc"] = Query(
+        default="asc", description="Порядок сортировки по id"
+    ),
+) -> FeaturePage:
+    return FeaturePage(limit=limit, after_id=after_id, order=order)
+
+
+def get_geometry_options(
+    zoom: int | None = Query(
+        default=None,
+        ge=0,
+        le=24,
+        description="Масштаб карты: геометрия упрощается до пикселя",
+    ),
+    tolerance: float | None = Query(
+        default=None,
+        gt=0,
+        description="Допуск упрощения в градусах, важнее zoom",
+    ),
+    precision: int | None = Query(
+        default=None,
+        ge=0,
+        le=15,
+        description="Знаков после запятой в координатах",
+    ),
+) -> GeometryOptions:
+    return GeometryOptions(zoom=zoom, tolerance=tolerance, precision=precision)
+
+
+def check_etag(request: Request, version: int | str) -> str:
+    """
+    ETag ответа по версии. При совпадении с If-None-Match отвечает 304
+    :param version: версия коллекции или данных ответа
+    :return: str - значение заголовка ETag для ответа
+    """
+    route = request.scope.get("route")
+    # Accept тоже выбирает представление (формат /features)
+    etag = make_etag(
+        version,
+        route.path if route else request.url.path,
+        [
+            *request.query_params.multi_items(),
+            ("accept", request.headers.get("accept", "")),
+        ],
+    )
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+        )
+    return etag
+
+
+async def get_collection_etag(
+    request: Request, db: Annotated[DBManager, Depends(get_db)]
+) -> str:
+    """
+    ETag ответа по версии коллекции. Версия читается до данных: если
+    запись успеет закоммититься между ними, ETag окажется старше данных
+    и следующий запрос просто получит ответ заново. При совпадении с
+    If-None-Match отвечает 304 без обращения к таблице features
+    :return: str - значение заголовка ETag для ответа
+    """
+    version = await db.feature_changes.get_version()
+    return check_etag(request, version)
+
+
 DBDep = Annotated[DBManager, Depends(get_db)]
+PrimaryDBDep = Annotated[DBManager, Depends(get_primary_db)]
+SessionFactoryDep = Annotated[
+    async_sessionmaker[AsyncSession], Depends(get_session_factory)
+]
+FeatureFilterDep = Annotated[FeatureFilter, Depends(get_feature_filter)]
+FeaturePageDep = Annotated[FeaturePage, Depends(get_feature_page)]
+GeometryOptionsDep = Annotated[GeometryOptions, Depends(get_geometry_options)]
+ETagDep = Annotated[str, Depends(get_collection_etag)]
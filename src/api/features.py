@@ -1,13 +1,216 @@
-from fastapi import APIRouter, Body, HTTPException, Path, status
+from collections.abc import AsyncIterator, Iterator
+from tempfile import SpooledTemporaryFile
+from typing import IO, Literal
 
-from src.api.dependencies import DBDep
+import orjson
+
+from fastapi import (
+    APIRouter,
+    Body,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    status,
+)
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import Row
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.background import BackgroundTask
+
+from src.api.dependencies import (
+    CONSISTENCY_HEADER,
+    DBDep,
+    ETagDep,
+    FeatureFilterDep,
+    FeaturePageDep,
+    GeometryOptionsDep,
+    SessionFactoryDep,
+)
+from src.cache.etag import CACHE_CONTROL
+from src.cache.tiles import invalidate_tiles, union_bounds
 from src.exeptions.error import ObjectNotFoundError
+from src.formats.binary import (
+    FLATGEOBUF_MEDIA_TYPE,
+    PARQUET_MEDIA_TYPE,
+    WKB_STREAM_MEDIA_TYPE,
+    geoparquet_available,
+    iter_geoparquet,
+    iter_wkb_stream,
+)
+from src.formats.geojson import (
+    COLLECTION_HEAD,
+    COLLECTION_TAIL,
+    GEOJSON_MEDIA_TYPE,
+    GEOJSON_SEQ_MEDIA_TYPE,
+    NDJSON_MEDIA_TYPE,
+    RECORD_SEPARATOR,
+    SEQUENCE_MEDIA_TYPES,
+    IncompleteJSONError,
+    iter_collection_features,
+    iter_feature_collection,
+    iter_feature_sequence,
+    iter_sequence_features,
+)
+from src.managers.db_manager import DBManager
 from src.openapi_examples import LineString, Point, Polygon
-from src.schemas.feature import FeatureCollection, FeatureRequest
+from src.schemas.feature import (
+    BulkDeleteResult,
+    BulkError,
+    BulkInsertResult,
+    FeatureChanges,
+    FeatureCollection,
+    FeatureDeleteRequest,
+    FeatureFilter,
+    FeaturePage,
+    FeatureRequest,
+    Geometry,
+    GeometryOptions,
+    Link,
+    NearestFeatureCollection,
+    SpatialJoinResult,
+)
 from src.schemas.message import MessageID
 
 router = APIRouter(prefix="/features", tags=["Управление геометрией"])
 
+FeatureFormat = Literal[
+    "geojson", "ndjson", "geojsonseq", "fgb", "parquet", "wkb"
+]
+
+# Результат пространственного соединения держится в памяти до этого
+# размера, дальше - во временном файле
+JOIN_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+JOIN_READ_SIZE = 64 * 1024
+
+FORMAT_MEDIA_TYPES: dict[FeatureFormat, str] = {
+    "geojson": GEOJSON_MEDIA_TYPE,
+    "ndjson": NDJSON_MEDIA_TYPE,
+    "geojsonseq": GEOJSON_SEQ_MEDIA_TYPE,
+    "fgb": FLATGEOBUF_MEDIA_TYPE,
+    "parquet": PARQUET_MEDIA_TYPE,
+    "wkb": WKB_STREAM_MEDIA_TYPE,
+}
+
+
+def negotiate_format(accept: str) -> FeatureFormat:
+    """
+    Формат ответа по заголовку Accept, если format не передан явно
+    :param accept: значение заголовка Accept
+    :return: FeatureFormat, по умолчанию geojson
+    """
+    formats: dict[str, FeatureFormat] = {
+        media_type: output_format
+        for output_format, media_type in FORMAT_MEDIA_TYPES.items()
+    }
+    candidates = []
+    for position, item in enumerate(accept.split(",")):
+        media_type, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_type.strip().lower() in formats and quality > 0:
+            candidates.append((-quality, position, media_type.strip()))
+    if not candidates:
+        return "geojson"
+    return formats[min(candidates)[2].lower()]
+
+
+class FeaturePageTracker:
+    """
+    Запоминает последний отданный id, чтобы построить ссылку на следующую
+    страницу, когда объекты уже отправлены клиенту
+    """
+
+    def __init__(self, request: Request, page: FeaturePage) -> None:
+        self.request = request
+        self.page = page
+        self.count = 0
+        self.last_id: int | None = None
+
+    async def track(
+        self, batches: AsyncIterator[list[Row]]
+    ) -> AsyncIterator[list[str]]:
+        async for rows in batches:
+            if rows:
+                self.count += len(rows)
+                self.last_id = rows[-1].id
+            yield [row.feature for row in rows]
+
+    @property
+    def next_href(self) -> str | None:
+        if self.page.limit is None or self.count < self.page.limit:
+            return None
+        url = self.request.url.include_query_params(after_id=self.last_id)
+        return str(url)
+
+    def links(self) -> list[dict]:
+        if self.next_href is None:
+            return []
+        return [Link(href=self.next_href, rel="next").model_dump()]
+
+
+def stream_features(
+    session_factory: async_sessionmaker[AsyncSession],
+    output_format: FeatureFormat,
+    filters: FeatureFilter,
+    tracker: FeaturePageTracker,
+    options: GeometryOptions | None = None,
+    headers: dict[str, str] | None = None,
+) -> StreamingResponse:
+    async def content() -> AsyncIterator[bytes]:
+        async with DBManager(session_factories=session_factory) as db:
+            if output_format == "wkb":
+                chunks = iter_wkb_stream(
+                    db.feature.stream_wkb(
+                        filters, tracker.page, options=options
+                    )
+                )
+            elif output_format == "parquet":
+                chunks = iter_geoparquet(
+                    db.feature.stream_columns(
+                        filters, tracker.page, options=options
+                    )
+                )
+            else:
+                batches = tracker.track(
+                    db.feature.stream_features(
+                        filters, tracker.page, options=options
+                    )
+                )
+                if output_format == "ndjson":
+                    chunks = iter_feature_sequence(batches)
+                elif output_format == "geojsonseq":
+                    chunks = iter_feature_sequence(batches, RECORD_SEPARATOR)
+                else:
+                    chunks = iter_feature_collection(batches, tracker.links)
+            async for chunk in chunks:
+                yield chunk
+
+    return StreamingResponse(
+        content(),
+        media_type=FORMAT_MEDIA_TYPES[output_format],
+        headers=headers,
+    )
+
+
+def consistency_headers(db: DBManager) -> dict[str, str]:
+    """
+    Заголовок с токеном read-your-writes для ответа на запись
+    :return: dict[str, str] - пустой, если ничего не записано
+    """
+    version = db.written_version
+    if version is None:
+        return {}
+    return {CONSISTENCY_HEADER: str(version)}
+
 
 @router.post(
     path="",
@@ -16,20 +219,515 @@ router = APIRouter(prefix="/features", tags=["Управление геомет
 )
 async def create_feature(
     db: DBDep,
+    response: Response,
     data: FeatureRequest = Body(
         openapi_examples={"1": Point, "2": LineString, "3": Polygon},
     ),
 ) -> MessageID:
-    feature_id = await db.feature.add(data)
-    await db.commit()
+    try:
+        feature_id = await db.feature.add(data)
+        await db.commit()
+    except DBAPIError as ex:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Объект не добавлен: {ex.orig}",
+        )
+    invalidate_tiles([data.geometry.bounds])
+    response.headers.update(consistency_headers(db))
     return MessageID(id=feature_id)
 
 
-@router.get(path="", summary="Получение всех объектов")
+def format_validation_error(ex: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(map(str, error['loc']))}: {error['msg']}"
+        for error in ex.errors(include_url=False)
+    )
+
+
+async def insert_rows(
+    db: DBManager,
+    result: BulkInsertResult,
+    batch: list[tuple[int, FeatureRequest]],
+    batch_number: int,
+) -> list[tuple[int, FeatureRequest]]:
+    """
+    Добавляет объекты пачки по одному, каждый в своей точке сохранения,
+    и коммитит их вместе: в result.errors попадают только объекты,
+    отклоненные БД. Счетчики типов и журнал изменений пишутся один раз
+    для принятых объектов перед коммитом: иначе первая же точка
+    сохранения взяла бы блокировку журнала раньше блокировок счетчиков,
+    в обратном другим писателям порядке, и они могли бы ждать друг друга
+    :return: добавленные объекты
+    """
+    inserted = []
+    for index, feature in batch:
+        try:
+            async with db.begin_nested():
+                (row,) = await db.feature.insert_many([feature])
+        except DBAPIError as ex:
+            result.errors.append(
+                BulkError(
+                    index=index,
+                    batch=batch_number,
+                    detail=f"Объект не добавлен: {ex.orig}",
+                )
+            )
+            continue
+        inserted.append((index, row, feature))
+    try:
+        await db.feature.record_inserted([
+            (row, feature) for _, row, feature in inserted
+        ])
+        await db.commit()
+    except DBAPIError as ex:
+        await db.rollback()
+        result.errors.append(
+            BulkError(
+                index=batch[0][0],
+                batch=batch_number,
+                detail=f"Пачка {batch[0][0]}-{batch[-1][0]} не добавлена: "
+                f"{ex.orig}",
+            )
+        )
+        return []
+    for index, (feature_id, _), _ in inserted:
+        result.ids[index] = feature_id
+    return [(index, feature) for index, _, feature in inserted]
+
+
+async def insert_batch(
+    db: DBManager,
+    result: BulkInsertResult,
+    batch: list[tuple[int, FeatureRequest]],
+    batch_number: int,
+) -> None:
+    """
+    Добавляет пачку объектов отдельной транзакцией. Если БД отклоняет
+    пачку, она повторяется по одному объекту (insert_rows), и ошибки
+    записываются в result.errors для отдельных объектов
+    """
+    try:
+        ids = await db.feature.add_many([feature for _, feature in batch])
+        await db.commit()
+    except DBAPIError:
+        await db.rollback()
+        batch = await insert_rows(db, result, batch, batch_number)
+    else:
+        for (index, _), feature_id in zip(batch, ids):
+            result.ids[index] = feature_id
+    if batch:
+        invalidate_tiles([
+            union_bounds(feature.geometry.bounds for _, feature in batch)
+        ])
+
+
+@router.post(
+    path="/bulk",
+    summary="Пакетная загрузка объектов",
+    response_model=BulkInsertResult,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                GEOJSON_MEDIA_TYPE: {
+                    "schema": {
+                        "$ref": "#/components/schemas/FeatureCollection"
+                    }
+                },
+                NDJSON_MEDIA_TYPE: {
+                    "schema": {"$ref": "#/components/schemas/FeatureRequest"}
+                },
+            },
+        }
+    },
+)
+async def create_features_bulk(
+    request: Request,
+    db: DBDep,
+    batch_size: int = Query(
+        default=1000, ge=1, le=10_000, description="Объектов в одном INSERT"
+    ),
+) -> ORJSONResponse:
+    """
+    Принимает FeatureCollection или NDJSON/GeoJSONSeq и добавляет объекты
+    пачками по мере чтения тела. Возвращает id в порядке объектов во
+    входных данных (null для отклоненных) и ошибки по объектам и пачкам
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0]
+    if content_type.strip() in SEQUENCE_MEDIA_TYPES:
+        raw_features = iter_sequence_features(request.stream())
+    else:
+        raw_features = iter_collection_features(request.stream())
+
+    result = BulkInsertResult(ids=[], errors=[])
+    batch: list[tuple[int, FeatureRequest]] = []
+    batch_number = 0
+    try:
+        async for raw_feature in raw_features:
+            index = len(result.ids)
+            result.ids.append(None)
+            try:
+                feature = FeatureRequest.model_validate_json(raw_feature)
+            except ValidationError as ex:
+                result.errors.append(
+                    BulkError(index=index, detail=format_validation_error(ex))
+                )
+                continue
+            batch.append((index, feature))
+            if len(batch) >= batch_size:
+                await insert_batch(db, result, batch, batch_number)
+                batch = []
+                batch_number += 1
+    except IncompleteJSONError as ex:
+        result.errors.append(BulkError(detail=str(ex)))
+    if batch:
+        await insert_batch(db, result, batch, batch_number)
+    # Модель собрана здесь же, повторная валидация ответа не нужна:
+    # для сотен тысяч id она дороже самой сериализации
+    return ORJSONResponse(result.model_dump(), headers=consistency_headers(db))
+
+
+def parse_join_geometry(raw: bytes) -> Geometry:
+    """
+    Геометрия элемента входных данных соединения: объект Feature или
+    сама геометрия GeoJSON
+    :param raw: JSON элемента
+    :return: Geometry
+    """
+    try:
+        item = orjson.loads(raw)
+    except orjson.JSONDecodeError as ex:
+        raise ValueError(f"Некорректный JSON: {ex}")
+    if isinstance(item, dict) and item.get("type") == "Feature":
+        item = item.get("geometry")
+    try:
+        return Geometry.model_validate(item)
+    except ValidationError as ex:
+        raise ValueError(format_validation_error(ex))
+
+
+async def join_batch(
+    db: DBManager,
+    spool: IO[bytes],
+    errors: list[BulkError],
+    batch: list[tuple[int, Geometry]],
+    batch_number: int,
+    predicate: Literal["intersects", "contains"],
+    separator: bytes,
+) -> bytes:
+    """
+    Соединяет пачку геометрий с объектами и дописывает результаты в
+    spool, включая пустые ids для геометрий без совпадений. Если БД
+    отклоняет запрос, каждая геометрия пачки попадает в errors
+    :return: bytes - разделитель для следующей записи
+    """
+    try:
+        rows = await db.feature.join_geometries(batch, predicate)
+    except DBAPIError as ex:
+        await db.rollback()
+        errors.extend(
+            BulkError(
+                index=index,
+                batch=batch_number,
+                detail=f"Пачка {batch[0][0]}-{batch[-1][0]} не соединена: "
+                f"{ex.orig}",
+            )
+            for index, _ in batch
+        )
+        return separator
+    matches = {index: ids for index, ids in rows}
+    for index, _ in batch:
+        spool.write(separator)
+        spool.write(
+            orjson.dumps({"index": index, "ids": matches.get(index, [])})
+        )
+        separator = b","
+    return separator
+
+
+def iter_spool(spool: IO[bytes]) -> Iterator[bytes]:
+    """
+    Читает временный файл с начала и закрывает его в конце. Синхронный
+    генератор: StreamingResponse читает его в пуле потоков
+    """
+    try:
+        spool.seek(0)
+        while chunk := spool.read(JOIN_READ_SIZE):
+            yield chunk
+    finally:
+        spool.close()
+
+
+@router.post(
+    path="/join",
+    summary="Пространственное соединение с объектами",
+    response_model=SpatialJoinResult,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "oneOf": [
+                            {
+                                "type": "array",
+                                "items": {
+                                    "$ref": "#/components/schemas/Geometry"
+                                },
+                            },
+                            {"$ref": "#/components/schemas/FeatureCollection"},
+                        ]
+                    }
+                },
+                NDJSON_MEDIA_TYPE: {
+                    "schema": {"$ref": "#/components/schemas/Geometry"}
+                },
+            },
+        }
+    },
+)
+async def join_features(
+    request: Request,
+    db: DBDep,
+    predicate: Literal["intersects", "contains"] = Query(
+        default="intersects",
+        description="intersects - объекты, пересекающиеся с геометрией, "
+        "contains - объекты, содержащие геометрию",
+    ),
+    batch_size: int = Query(
+        default=1000,
+        ge=1,
+        le=10_000,
+        description="Геометрий в одном запросе к БД",
+    ),
+) -> StreamingResponse:
+    """
+    Для каждой входной геометрии возвращает id хранимых объектов, которые
+    пересекаются с ней или содержат ее (например, полигоны, в которые
+    попадают GPS точки). Принимает массив геометрий, FeatureCollection
+    или NDJSON/GeoJSONSeq и соединяет их с объектами пачками по мере
+    чтения тела. results - в порядке входных данных, index - номер
+    геометрии; некорректные геометрии и геометрии пачек, отклоненных
+    БД, попадают в errors
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0]
+    if content_type.strip() in SEQUENCE_MEDIA_TYPES:
+        raw_items = iter_sequence_features(request.stream())
+    else:
+        raw_items = iter_collection_features(request.stream())
+
+    spool = SpooledTemporaryFile(max_size=JOIN_SPOOL_MAX_SIZE)
+    try:
+        spool.write(b'{"results":[')
+        separator = b""
+        errors: list[BulkError] = []
+        batch: list[tuple[int, Geometry]] = []
+        batch_number = 0
+        index = 0
+        try:
+            async for raw_item in raw_items:
+                try:
+                    batch.append((index, parse_join_geometry(raw_item)))
+                except ValueError as ex:
+                    errors.append(BulkError(index=index, detail=str(ex)))
+                index += 1
+                if len(batch) >= batch_size:
+                    separator = await join_batch(
+                        db,
+                        spool,
+                        errors,
+                        batch,
+                        batch_number,
+                        predicate,
+                        separator,
+                    )
+                    batch = []
+                    batch_number += 1
+        except IncompleteJSONError as ex:
+            errors.append(BulkError(detail=str(ex)))
+        if batch:
+            await join_batch(
+                db, spool, errors, batch, batch_number, predicate, separator
+            )
+        spool.write(b'],"errors":')
+        spool.write(orjson.dumps([error.model_dump() for error in errors]))
+        spool.write(b"}")
+    except BaseException:
+        spool.close()
+        raise
+    # Фоновая задача закрывает файл, если тело ответа так и не читалось
+    return StreamingResponse(
+        iter_spool(spool),
+        media_type="application/json",
+        background=BackgroundTask(spool.close),
+    )
+
+
+@router.get(
+    path="",
+    summary="Получение объектов",
+    response_model=FeatureCollection,
+)
 async def get_feature_collection(
+    request: Request,
     db: DBDep,
-) -> FeatureCollection:
-    return await db.feature.get_feature_collection()
+    session_factory: SessionFactoryDep,
+    filters: FeatureFilterDep,
+    page: FeaturePageDep,
+    options: GeometryOptionsDep,
+    etag: ETagDep,
+    stream: bool = Query(
+        default=False,
+        description="Отдавать коллекцию потоком, читая БД курсором",
+    ),
+    output_format: FeatureFormat | None = Query(
+        default=None,
+        alias="format",
+        description="geojson - FeatureCollection, ndjson и geojsonseq - "
+        "по объекту на строку, fgb - FlatGeobuf с пространственным "
+        "индексом, parquet - GeoParquet, wkb - поток записей WKB. "
+        "Без параметра формат выбирается по Accept, по умолчанию geojson",
+    ),
+):
+    if output_format is None:
+        output_format = negotiate_format(request.headers.get("accept", ""))
+    if output_format == "parquet" and not geoparquet_available():
+        raise HTTPException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail="GeoParquet недоступен: не установлен pyarrow",
+        )
+    tracker = FeaturePageTracker(request, page)
+    # Возвращаемый Response не наследует заголовки внедренного Response,
+    # поэтому ETag выставляется явно
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept"}
+    if output_format == "fgb":
+        flatgeobuf = await db.feature.get_flatgeobuf(filters, page, options)
+        content, tracker.count, tracker.last_id = flatgeobuf
+        if tracker.next_href:
+            headers["Link"] = f'<{tracker.next_href}>; rel="next"'
+        return Response(
+            content=content,
+            media_type=FLATGEOBUF_MEDIA_TYPE,
+            headers=headers,
+        )
+    if stream or output_format != "geojson":
+        return stream_features(
+            session_factory, output_format, filters, tracker, options, headers
+        )
+    batches = tracker.track(
+        db.feature.stream_features(filters, page, options=options)
+    )
+    chunks = iter_feature_collection(batches, tracker.links)
+    content = b"".join([chunk async for chunk in chunks])
+    if tracker.next_href:
+        headers["Link"] = f'<{tracker.next_href}>; rel="next"'
+    return Response(
+        content=content, media_type=GEOJSON_MEDIA_TYPE, headers=headers
+    )
+
+
+@router.get(
+    path="/nearest",
+    summary="Ближайшие к точке объекты",
+    response_model=NearestFeatureCollection,
+)
+async def get_nearest_features(
+    db: DBDep,
+    options: GeometryOptionsDep,
+    etag: ETagDep,
+    lon: float = Query(ge=-180, le=180, description="Долгота точки"),
+    lat: float = Query(ge=-90, le=90, description="Широта точки"),
+    k: int = Query(default=10, ge=1, le=1000, description="Число объектов"),
+    geometry_type: Literal["Point", "LineString", "Polygon"] | None = Query(
+        default=None, alias="type", description="Тип геометрии"
+    ),
+    max_distance: float | None = Query(
+        default=None, gt=0, description="Наибольшее расстояние, метры"
+    ),
+    distance: bool = Query(
+        default=False,
+        description="Добавить в properties расстояние distance в метрах",
+    ),
+) -> Response:
+    """
+    Возвращает k ближайших к точке объектов по возрастанию расстояния.
+    Поиск идет по пространственному индексу (KNN оператор <->),
+    расстояние считается на сфере до ближайшей точки геометрии
+    """
+    features = await db.feature.get_nearest(
+        lon,
+        lat,
+        k,
+        geometry_type=geometry_type.upper() if geometry_type else None,
+        max_distance=max_distance,
+        with_distance=distance,
+        options=options,
+    )
+    content = b"".join([
+        COLLECTION_HEAD,
+        ",".join(features).encode(),
+        COLLECTION_TAIL,
+    ])
+    return Response(
+        content=content,
+        media_type=GEOJSON_MEDIA_TYPE,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
+@router.get(
+    path="/changes",
+    summary="Изменения объектов после курсора",
+    response_model=FeatureChanges,
+)
+async def get_feature_changes(
+    db: DBDep,
+    since: int = Query(
+        default=0,
+        ge=0,
+        description="Курсор из предыдущего ответа, 0 - с самого начала",
+    ),
+    limit: int = Query(
+        default=10_000, ge=1, le=100_000, description="Записей журнала"
+    ),
+) -> Response:
+    """
+    Возвращает добавленные/измененные объекты (upserted) и id удаленных
+    (deleted) после курсора since, а также новый курсор. Несколько
+    изменений одного объекта схлопываются в последнее. Если has_more,
+    нужно повторить запрос с новым курсором
+    """
+    changes = await db.feature_changes.get_since(since, limit + 1)
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    latest_operations = {
+        change.feature_id: change.operation for change in changes
+    }
+    deleted = sorted(
+        feature_id
+        for feature_id, operation in latest_operations.items()
+        if operation == "delete"
+    )
+    upserted = await db.feature.get_feature_json(
+        sorted(
+            feature_id
+            for feature_id, operation in latest_operations.items()
+            if operation != "delete"
+        )
+    )
+    head = orjson.dumps({
+        "cursor": changes[-1].seq if changes else since,
+        "has_more": has_more,
+        "deleted": deleted,
+    })
+    content = b"".join([
+        head[:-1],
+        b',"upserted":[',
+        ",".join(upserted).encode(),
+        b"]}",
+    ])
+    return Response(content=content, media_type="application/json")
 
 
 @router.delete(
@@ -38,12 +736,40 @@ async def get_feature_collection(
     status_code=status.HTTP_204_NO_CONTENT,
 )
 async def delete_feature(
-    db: DBDep, feature_id: int = Path(description="Айди объекта")
+    db: DBDep,
+    response: Response,
+    feature_id: int = Path(description="Айди объекта"),
 ) -> None:
     try:
-        await db.feature.delete(id=feature_id)
+        bounds = await db.feature.delete(id=feature_id)
     except ObjectNotFoundError as ex:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=ex.detail
         )
     await db.commit()
+    invalidate_tiles([bounds])
+    response.headers.update(consistency_headers(db))
+
+
+@router.post(
+    path="/delete",
+    summary="Пакетное удаление объектов",
+    response_model=BulkDeleteResult,
+)
+async def delete_features(
+    db: DBDep, filters: FeatureDeleteRequest
+) -> ORJSONResponse:
+    """
+    Удаляет объекты по списку id, bbox/intersects/within и вхождению
+    properties (условия объединяются через AND) одним запросом.
+    В missing попадают переданные id, которые не были удалены
+    """
+    rows = await db.feature.delete_many(filters)
+    await db.commit()
+    if rows:
+        invalidate_tiles([union_bounds(tuple(row)[1:5] for row in rows)])
+    deleted = sorted(row.id for row in rows)
+    missing = sorted(set(filters.ids or ()) - set(deleted))
+    return ORJSONResponse(
+        {"ids": deleted, "missing": missing}, headers=consistency_headers(db)
+    )
@@ -0,0 +1,51 @@
+import time
+
+from fastapi import APIRouter, Response, status
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.config import settings
+from src.connectors.database_init import engine
+from src.connectors.pool import get_pool
+from src.connectors.replicas import replica_router
+from src.schemas.health import DBHealth, PoolStatus, ReplicaStatus
+
+router = APIRouter(prefix="/health", tags=["Состояние"])
+
+
+@router.get(
+    path="/db",
+    summary="Получить состояние БД и пула соединений",
+    responses={
+        status.HTTP_503_SERVICE_UNAVAILABLE: {
+            "model": DBHealth,
+            "description": "БД недоступна",
+        }
+    },
+)
+async def get_db_health(response: Response) -> DBHealth:
+    latency_ms = None
+    start = time.perf_counter()
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+        latency_ms = (time.perf_counter() - start) * 1000
+    except (OSError, SQLAlchemyError):
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return DBHealth(
+        status="ok" if latency_ms is not None else "unavailable",
+        latency_ms=latency_ms,
+        pgbouncer=settings.DB_PGBOUNCER,
+        pool=PoolStatus.model_validate(get_pool(engine).stats()),
+        replicas=[
+            ReplicaStatus(
+                name=replica.name,
+                available=replica.available,
+                lag_seconds=replica.lag,
+                pool=PoolStatus.model_validate(
+                    get_pool(replica.engine).stats()
+                ),
+            )
+            for replica in replica_router.replicas
+        ],
+    )
@@ -0,0 +1,24 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+
+from src.config import settings
+from src.metrics.app import registry
+from src.metrics.multiprocess import read_states, write_state
+from src.metrics.registry import CONTENT_TYPE
+
+router = APIRouter(prefix="", tags=["Состояние"])
+
+
+@router.get(
+    path="/metrics",
+    summary="Метрики в формате Prometheus",
+    response_class=PlainTextResponse,
+)
+async def get_metrics() -> PlainTextResponse:
+    if not settings.METRICS_DIR:
+        return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+    # Запрос попадает в один из воркеров: отдаем сумму по всем
+    await run_in_threadpool(write_state, registry, settings.METRICS_DIR)
+    states = await run_in_threadpool(read_states, settings.METRICS_DIR)
+    return PlainTextResponse(registry.render(states), media_type=CONTENT_TYPE)
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Request, Response
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 
-from src.api.dependencies import DBDep
+from src.api.dependencies import DBDep, check_etag
+from src.cache.etag import CACHE_CONTROL, content_version
 from src.config import settings
 
 
@@ -19,5 +20,14 @@ async def read_root(request: Request) -> HTMLResponse:
 
 
 @router.get(path="/stats", summary="Получить статистику по типам")
-async def get_stats(db: DBDep) -> dict[str, int]:
-    return await db.feature.get_feature_count_by_type()
+async def get_stats(
+    request: Request, db: DBDep, response: Response
+) -> dict[str, int]:
+    """
+    ETag считается по самим счетчикам, а не по журналу изменений:
+    пересчет reconcile_type_counts меняет счетчики без записи в журнал
+    """
+    stats = await db.feature.get_feature_count_by_type()
+    response.headers["ETag"] = check_etag(request, content_version(stats))
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return stats
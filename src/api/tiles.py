@@ -0,0 +1,84 @@
+import orjson
+
+from fastapi import APIRouter, HTTPException, Path, status
+from fastapi.responses import Response
+
+from src.api.dependencies import PrimaryDBDep
+from src.cache.tiles import cluster_cache, tile_cache
+from src.formats.geojson import GEOJSON_MEDIA_TYPE
+
+router = APIRouter(prefix="/tiles", tags=["Векторные тайлы"])
+
+MVT_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+
+
+def check_tile(z: int, x: int, y: int) -> None:
+    if x >= 2**z or y >= 2**z:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Тайл вне сетки уровня масштаба",
+        )
+
+
+@router.get(
+    path="/{z}/{x}/{y}.mvt",
+    summary="Векторный тайл (слои points, lines, polygons)",
+    response_class=Response,
+    responses={200: {"content": {MVT_MEDIA_TYPE: {}}}},
+)
+async def get_tile(
+    db: PrimaryDBDep,
+    z: int = Path(ge=0, le=24, description="Уровень масштаба"),
+    x: int = Path(ge=0, description="Колонка тайла"),
+    y: int = Path(ge=0, description="Строка тайла"),
+) -> Response:
+    check_tile(z, x, y)
+    key = (z, x, y)
+    tile = tile_cache.get(key)
+    if tile is None:
+        generation = tile_cache.generation
+        tile = await db.feature.get_tile(z, x, y)
+        tile_cache.put(key, tile, generation)
+    return Response(content=tile, media_type=MVT_MEDIA_TYPE)
+
+
+@router.get(
+    path="/{z}/{x}/{y}/clusters",
+    summary="Кластеры точек тайла",
+    response_class=Response,
+    responses={200: {"content": {GEOJSON_MEDIA_TYPE: {}}}},
+)
+async def get_tile_clusters(
+    db: PrimaryDBDep,
+    z: int = Path(ge=0, le=24, description="Уровень масштаба"),
+    x: int = Path(ge=0, description="Колонка тайла"),
+    y: int = Path(ge=0, description="Строка тайла"),
+) -> Response:
+    """
+    Точки тайла, сгруппированные по сетке с ячейкой 64 пикселя, в виде
+    FeatureCollection: геометрия - центр масс кластера, в properties -
+    число точек count, bbox - охват точек кластера
+    """
+    check_tile(z, x, y)
+    key = (z, x, y)
+    content = cluster_cache.get(key)
+    if content is None:
+        generation = cluster_cache.generation
+        rows = await db.feature.get_clusters(z, x, y)
+        content = orjson.dumps({
+            "type": "FeatureCollection",
+            "features": [
+                {
+                    "type": "Feature",
+                    "bbox": [row.min_x, row.min_y, row.max_x, row.max_y],
+                    "geometry": {
+                        "type": "Point",
+                        "coordinates": [row.x, row.y],
+                    },
+                    "properties": {"count": row.count},
+                }
+                for row in rows
+            ],
+        })
+        cluster_cache.put(key, content, generation)
+    return Response(content=content, media_type=GEOJSON_MEDIA_TYPE)
@@ -0,0 +1,56 @@
+import hashlib
+
+from collections.abc import Mapping
+from urllib.parse import urlencode
+
+import orjson
+
+# Клиент всегда перепроверяет ответ через If-None-Match, а не берет
+# его из кэша без запроса: версия коллекции меняется при любой записи
+CACHE_CONTROL = "no-cache"
+
+
+def make_etag(
+    version: int | str, path: str, params: list[tuple[str, str]]
+) -> str:
+    """
+    Сильный ETag представления: версия коллекции плюс хэш пути и
+    параметров запроса (фильтры, страница, формат дают разные ответы)
+    :param version: версия коллекции - последний seq журнала изменений,
+        или версия данных ответа из content_version
+    :param path: шаблон пути маршрута, не зависит от ROOT_PATH
+    :param params: параметры запроса
+    :return: str - значение заголовка ETag
+    """
+    query = urlencode(sorted(params))
+    digest = hashlib.sha256(f"{path}?{query}".encode()).hexdigest()[:16]
+    return f'"{version}-{digest}"'
+
+
+def content_version(data: Mapping[str, int]) -> str:
+    """
+    Версия по самим данным ответа, а не по журналу изменений: для
+    данных, которые меняются и без записи в журнал
+    :param data: данные ответа
+    :return: str - хэш данных
+    """
+    content = orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(content).hexdigest()[:16]
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Сравнение для If-None-Match (RFC 9110, 13.1.2): слабое, то есть
+    префикс W/ не учитывается - его добавляет, например, nginx при сжатии
+    :param if_none_match: значение заголовка If-None-Match
+    :param etag: текущий ETag представления
+    :return: bool
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        tag.strip().removeprefix("W/") == etag
+        for tag in if_none_match.split(",")
+    )
@@ -0,0 +1,69 @@
+import asyncio
+import logging
+
+from collections.abc import Sequence
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.cache.tiles import TileCache
+from src.managers.db_manager import DBManager
+
+logger = logging.getLogger(__name__)
+
+SYNC_BATCH_SIZE = 10_000
+
+
+async def _invalidate_since(
+    session_factory: async_sessionmaker[AsyncSession],
+    caches: Sequence[TileCache],
+    since: int,
+) -> int:
+    async with DBManager(session_factories=session_factory) as db:
+        while True:
+            rows = await db.feature_changes.get_bounds_since(
+                since, SYNC_BATCH_SIZE
+            )
+            if not rows:
+                return since
+            bounds = [tuple(row)[1:] for row in rows]
+            for cache in caches:
+                cache.invalidate(bounds)
+            since = rows[-1].seq
+            if len(rows) < SYNC_BATCH_SIZE:
+                return since
+
+
+async def sync_tile_cache(
+    session_factory: async_sessionmaker[AsyncSession],
+    caches: Sequence[TileCache],
+    interval: float,
+) -> None:
+    """
+    Сбрасывает тайлы по записям других воркеров: каждый процесс держит
+    свой кэш, а invalidate_tiles после записи видит только свой.
+    Журнал изменений читается с последнего обработанного seq, тайл,
+    собранный во время записи, отсекается по cache.generation
+    :param session_factory: фабрика сессий основной БД
+    :param caches: кэши тайлов процесса
+    :param interval: период опроса журнала, секунды
+    """
+    since = None
+    failing = False
+    while True:
+        try:
+            if since is None:
+                async with DBManager(session_factories=session_factory) as db:
+                    since = await db.feature_changes.get_version()
+                # Пока версия не была известна, кэш мог пропустить сброс
+                for cache in caches:
+                    cache.clear()
+            else:
+                since = await _invalidate_since(session_factory, caches, since)
+            failing = False
+        except (OSError, SQLAlchemyError) as ex:
+            # Пишем в лог один раз, а не на каждой попытке
+            if not failing:
+                logger.warning("Синхронизация кэша тайлов не удалась: %s", ex)
+            failing = True
+        await asyncio.sleep(interval)
@@ -0,0 +1,221 @@
+import math
+
+from collections import OrderedDict
+from collections.abc import Iterable
+from pathlib import Path
+from typing import cast
+
+from src.config import settings
+
+TileKey = tuple[int, int, int]
+Bounds = tuple[float, float, float, float]
+# Охват из БД: у пустой геометрии все значения NULL
+MaybeBounds = tuple[float | None, float | None, float | None, float | None]
+
+# Буфер ST_AsMVTGeom (64 из 4096) в долях тайла: объекты рядом с тайлом
+# тоже попадают в него и должны сбрасывать кэш
+TILE_BUFFER_FRACTION = 64 / 4096
+
+
+def tile_bounds(z: int, x: int, y: int, buffer: float = 0.0) -> Bounds:
+    """
+    Границы тайла XYZ (Web Mercator) в градусах EPSG:4326
+    :param buffer: расширение границ в долях размера тайла
+    :return: Bounds
+    """
+    n = 2**z
+
+    def lon(tile_x: float) -> float:
+        return tile_x / n * 360.0 - 180.0
+
+    def lat(tile_y: float) -> float:
+        return math.degrees(
+            math.atan(math.sinh(math.pi * (1 - 2 * tile_y / n)))
+        )
+
+    return (
+        lon(x - buffer),
+        lat(min(n, y + 1 + buffer)),
+        lon(x + 1 + buffer),
+        lat(max(0, y - buffer)),
+    )
+
+
+def known_bounds(bounds: Iterable[MaybeBounds | None]) -> list[Bounds]:
+    """
+    Охваты без пустых: у пустой геометрии охвата нет, и сбрасывать
+    по ней нечего
+    :return: list[Bounds]
+    """
+    return [
+        cast(Bounds, item)
+        for item in bounds
+        if item is not None and None not in item
+    ]
+
+
+def union_bounds(bounds: Iterable[MaybeBounds | None]) -> Bounds | None:
+    """
+    Общий охват нескольких охватов
+    :return: Bounds | None - None, если все охваты пустые
+    """
+    known = known_bounds(bounds)
+    if not known:
+        return None
+    min_xs, min_ys, max_xs, max_ys = zip(*known)
+    return min(min_xs), min(min_ys), max(max_xs), max(max_ys)
+
+
+def intersects(first: Bounds, second: Bounds) -> bool:
+    return not (
+        first[2] < second[0]
+        or second[2] < first[0]
+        or first[3] < second[1]
+        or second[3] < first[1]
+    )
+
+
+class TileCache:
+    """
+    LRU кэш готовых тайлов, ограниченный по объему. Вытесненные из памяти
+    тайлы при заданном directory сохраняются на диск (тоже LRU).
+    Записи сбрасываются по охвату измененных объектов
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        directory: str = "",
+        disk_max_bytes: int = 0,
+        suffix: str = ".mvt",
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self.directory = Path(directory) if directory else None
+        self.suffix = suffix
+        self.generation = 0
+        self._memory: OrderedDict[TileKey, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: OrderedDict[TileKey, int] = OrderedDict()
+        self._disk_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._memory) + len(self._disk)
+
+    def _path(self, key: TileKey) -> Path:
+        assert self.directory is not None
+        z, x, y = key
+        return self.directory / str(z) / str(x) / f"{y}{self.suffix}"
+
+    def get(self, key: TileKey) -> bytes | None:
+        tile = self._memory.get(key)
+        if tile is not None:
+            self._memory.move_to_end(key)
+            return tile
+        if key not in self._disk:
+            return None
+        try:
+            tile = self._path(key).read_bytes()
+        except OSError:
+            self._drop_from_disk(key)
+            return None
+        self._drop_from_disk(key)
+        self._put_in_memory(key, tile)
+        return tile
+
+    def put(self, key: TileKey, tile: bytes, generation: int) -> None:
+        """
+        Сохраняет тайл, если с начала его построения не было сбросов:
+        иначе в кэш мог бы попасть тайл, собранный до изменения данных
+        :param generation: значение self.generation до запроса к БД
+        """
+        if generation != self.generation or len(tile) > self.max_bytes:
+            return
+        self._drop(key)
+        self._put_in_memory(key, tile)
+
+    def invalidate(self, bounds: Iterable[MaybeBounds | None]) -> int:
+        """
+        Сбрасывает тайлы, пересекающиеся с переданными охватами
+        :param bounds: охваты измененных объектов (minx, miny, maxx, maxy),
+            пустые пропускаются
+        :return: количество сброшенных тайлов
+        """
+        bounds = known_bounds(bounds)
+        if not bounds:
+            return 0
+        self.generation += 1
+        stale = [
+            key
+            for key in [*self._memory, *self._disk]
+            if any(
+                intersects(tile_bounds(*key, TILE_BUFFER_FRACTION), changed)
+                for changed in bounds
+            )
+        ]
+        for key in stale:
+            self._drop(key)
+        return len(stale)
+
+    def clear(self) -> None:
+        self.generation += 1
+        for key in [*self._memory, *self._disk]:
+            self._drop(key)
+
+    def _put_in_memory(self, key: TileKey, tile: bytes) -> None:
+        self._memory[key] = tile
+        self._memory_bytes += len(tile)
+        while self._memory_bytes > self.max_bytes:
+            evicted_key, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self._spill(evicted_key, evicted)
+
+    def _spill(self, key: TileKey, tile: bytes) -> None:
+        if self.directory is None or len(tile) > self.disk_max_bytes:
+            return
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(tile)
+        except OSError:
+            return
+        self._disk[key] = len(tile)
+        self._disk_bytes += len(tile)
+        while self._disk_bytes > self.disk_max_bytes:
+            self._drop_from_disk(next(iter(self._disk)))
+
+    def _drop(self, key: TileKey) -> None:
+        tile = self._memory.pop(key, None)
+        if tile is not None:
+            self._memory_bytes -= len(tile)
+        self._drop_from_disk(key)
+
+    def _drop_from_disk(self, key: TileKey) -> None:
+        size = self._disk.pop(key, None)
+        if size is None:
+            return
+        self._disk_bytes -= size
+        self._path(key).unlink(missing_ok=True)
+
+
+tile_cache = TileCache(
+    max_bytes=settings.TILE_CACHE_MAX_BYTES,
+    directory=settings.TILE_CACHE_DIR,
+    disk_max_bytes=settings.TILE_CACHE_DISK_MAX_BYTES,
+)
+# Кластеры точек по тайлам (GeoJSON), сбрасываются вместе с тайлами
+cluster_cache = TileCache(
+    max_bytes=settings.CLUSTER_CACHE_MAX_BYTES, suffix=".geojson"
+)
+TILE_CACHES = (tile_cache, cluster_cache)
+
+
+def invalidate_tiles(bounds: Iterable[MaybeBounds | None]) -> None:
+    """
+    Сбрасывает закэшированные тайлы и кластеры в охвате измененных
+    объектов. Вызывается после коммита любой записи в таблицу features
+    :param bounds: охваты измененных объектов
+    """
+    bounds = list(bounds)
+    for cache in TILE_CACHES:
+        cache.invalidate(bounds)
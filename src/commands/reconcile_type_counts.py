@@ -0,0 +1,31 @@
+"""
+Пересчет счетчиков объектов по типам (feature_type_counts) по таблице
+features. Нужен, если счетчики разошлись с данными, например после
+изменения features в обход API.
+
+Запуск:
+    python -m src.commands.reconcile_type_counts
+"""
+
+import asyncio
+
+from src.connectors.database_init import async_session_maker_null_pool
+from src.managers.db_manager import DBManager
+
+
+async def main() -> None:
+    async with DBManager(
+        session_factories=async_session_maker_null_pool
+    ) as db:
+        before = await db.feature.type_counts.get_all()
+        after = await db.feature.type_counts.rebuild()
+        await db.commit()
+    for geometry_type in sorted(before.keys() | after.keys()):
+        print(
+            f"{geometry_type:>12}: {before.get(geometry_type, 0)}"
+            f" -> {after.get(geometry_type, 0)}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
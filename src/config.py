@@ -1,3 +1,5 @@
+import os
+
 from typing import Literal
 
 from pydantic import Field
@@ -17,9 +19,73 @@ class Settings(BaseSettings):
     PG_DB_NAME: str = Field(default="")
     PG_DATA: str = Field(default="")
 
+    # Пул соединений с БД, у каждого воркера свой
+    DB_POOL_SIZE: int = Field(default=10, ge=1)
+    DB_MAX_OVERFLOW: int = Field(default=10, ge=0)
+    # Сколько соединений с основной БД могут открыть все воркеры вместе,
+    # 0 - без ограничения. Урезает DB_POOL_SIZE и DB_MAX_OVERFLOW воркера
+    DB_MAX_CONNECTIONS: int = Field(default=0, ge=0)
+    # Сколько секунд ждать свободного соединения до ошибки
+    DB_POOL_TIMEOUT: float = Field(default=30, gt=0)
+    # Соединения старше этого числа секунд пересоздаются, -1 - никогда
+    DB_POOL_RECYCLE: int = Field(default=1800, ge=-1)
+    DB_POOL_PRE_PING: bool = Field(default=True)
+    # Сколько соединений открыть при старте приложения, 0 - не открывать
+    DB_POOL_PREWARM: int = Field(default=10, ge=0)
+    # Кэш подготовленных выражений на одно соединение
+    DB_STATEMENT_CACHE_SIZE: int = Field(default=100, ge=0)
+    # Подключение через PgBouncer в режиме transaction/statement:
+    # подготовленные выражения на сервере не переиспользуются
+    DB_PGBOUNCER: bool = Field(default=False)
+
+    # Реплики для чтения: DSN через запятую в формате db_url, пусто -
+    # все запросы идут в основную БД
+    DB_REPLICA_URLS: str = Field(default="")
+    DB_REPLICA_STRATEGY: Literal["round_robin", "least_connections"] = Field(
+        default="round_robin"
+    )
+    # Реплика с отставанием больше этого числа секунд не используется
+    DB_REPLICA_MAX_LAG: float = Field(default=5, gt=0)
+    DB_REPLICA_CHECK_INTERVAL: float = Field(default=2, gt=0)
+
     # Настройки сервера
     HOST: str = Field(default="")
     ROOT_PATH: str = Field(default="")
+    # Адрес и порт, на которых слушает uvicorn (python -m src.server)
+    SERVER_HOST: str = Field(default="127.0.0.1")
+    SERVER_PORT: int = Field(default=8000)
+    # Процессов-воркеров в MODE=PROD, 0 - по числу ядер
+    WORKERS: int = Field(default=1, ge=0)
+    # Больше keepalive_timeout upstream в nginx: соединение закрывает
+    # nginx, а не приложение, и nginx не отправит запрос в закрытое
+    KEEP_ALIVE_TIMEOUT: int = Field(default=75, ge=1)
+    # Сколько секунд при остановке дожидаться запросов в обработке
+    GRACEFUL_SHUTDOWN_TIMEOUT: int = Field(default=30, ge=0)
+
+    # Каталог, через который воркеры складывают метрики для /metrics;
+    # при WORKERS > 1 без него сервер создает временный каталог
+    METRICS_DIR: str = Field(default="")
+    # Период записи метрик воркера в METRICS_DIR, секунды
+    METRICS_FLUSH_INTERVAL: float = Field(default=5, gt=0)
+
+    # Период синхронизации кэша тайлов между воркерами по журналу
+    # изменений, секунды; 0 - не синхронизировать. При одном воркере
+    # синхронизация не запускается
+    TILE_CACHE_SYNC_INTERVAL: float = Field(default=1, ge=0)
+
+    # Настройки кэша векторных тайлов
+    TILE_CACHE_MAX_BYTES: int = Field(default=64 * 1024 * 1024)
+    # Если задан, вытесненные из памяти тайлы сохраняются на диск
+    TILE_CACHE_DIR: str = Field(default="")
+    TILE_CACHE_DISK_MAX_BYTES: int = Field(default=1024 * 1024 * 1024)
+    # Кэш кластеров точек по тайлам, только в памяти
+    CLUSTER_CACHE_MAX_BYTES: int = Field(default=16 * 1024 * 1024)
+
+    # Сжатие ответов: ответы меньше порога отдаются как есть
+    COMPRESSION_MIN_SIZE: int = Field(default=1024)
+    COMPRESSION_GZIP_LEVEL: int = Field(default=6, ge=1, le=9)
+    # brotli используется, только если установлен пакет brotli
+    COMPRESSION_BROTLI_QUALITY: int = Field(default=4, ge=0, le=11)
 
     @property
     def db_url(self) -> str:
@@ -33,6 +99,45 @@ class Settings(BaseSettings):
             f"{self.DB_HOST}:{self.PG_PORT}/{self.PG_DB_NAME}"
         )
 
+    @property
+    def workers(self) -> int:
+        """
+        Количество процессов-воркеров
+        :return: int
+        """
+        return self.WORKERS or os.cpu_count() or 1
+
+    @property
+    def pool_size(self) -> int:
+        """
+        Размер пула воркера с учетом DB_MAX_CONNECTIONS
+        :return: int
+        """
+        if not self.DB_MAX_CONNECTIONS:
+            return self.DB_POOL_SIZE
+        per_worker = self.DB_MAX_CONNECTIONS // self.workers
+        return max(1, min(self.DB_POOL_SIZE, per_worker))
+
+    @property
+    def max_overflow(self) -> int:
+        """
+        Сверх пула воркера с учетом DB_MAX_CONNECTIONS
+        :return: int
+        """
+        if not self.DB_MAX_CONNECTIONS:
+            return self.DB_MAX_OVERFLOW
+        per_worker = self.DB_MAX_CONNECTIONS // self.workers
+        return max(0, min(self.DB_MAX_OVERFLOW, per_worker - self.pool_size))
+
+    @property
+    def replica_urls(self) -> list[str]:
+        """
+        Строки подключения к репликам для чтения
+        :return: list[str]
+        """
+        urls = (url.strip() for url in self.DB_REPLICA_URLS.split(","))
+        return [url for url in urls if url]
+
     # Настройки откуда будут браться данные переменных окружения
     model_config = SettingsConfigDict(env_file=".env")
 
@@ -1,17 +1,75 @@
+import asyncio
+import logging
+
+from uuid import uuid4
+
 from sqlalchemy import NullPool
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase
 
 from src.config import settings
+from src.connectors.pool import InstrumentedPool
+from src.metrics.sql import instrument_engine
+
+logger = logging.getLogger(__name__)
+
+
+def get_connect_args() -> dict:
+    """
+    Параметры подключения asyncpg. С PgBouncer кэши подготовленных
+    выражений выключены, а имена выражений уникальны: соседние
+    транзакции могут попасть на одно серверное соединение
+    :return: dict
+    """
+    if settings.DB_PGBOUNCER:
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return {
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    }
+
+
+def create_pooled_engine(url: str) -> AsyncEngine:
+    """
+    Движок с пулом соединений по настройкам DB_POOL_* и замером SQL
+    запросов для /metrics
+    :param url: строка подключения
+    :return: AsyncEngine
+    """
+    pooled_engine = create_async_engine(
+        url=url,
+        echo=False,
+        poolclass=InstrumentedPool,
+        pool_size=settings.pool_size,
+        max_overflow=settings.max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=get_connect_args(),
+    )
+    instrument_engine(pooled_engine)
+    return pooled_engine
 
-engine = create_async_engine(
+
+engine = create_pooled_engine(settings.db_url)
+
+engine_null_pool = create_async_engine(
     url=settings.db_url,
     echo=False,
+    poolclass=NullPool,
+    connect_args=get_connect_args(),
 )
 
-engine_null_pool = create_async_engine(
-    url=settings.db_url, echo=False, poolclass=NullPool
-)
+instrument_engine(engine_null_pool)
 
 
 async_session_maker = async_sessionmaker(
@@ -24,5 +82,41 @@ async_session_maker_null_pool = async_sessionmaker(
 )
 
 
+async def prewarm_pool(engine: AsyncEngine, count: int) -> int:
+    """
+    Открывает count соединений одновременно и возвращает их в пул,
+    чтобы первые запросы не тратили время на подключение к БД.
+    Недоступная БД не мешает запуску приложения
+    :param engine: движок с пулом соединений
+    :param count: сколько соединений открыть
+    :return: int - сколько соединений открыто
+    """
+    connections = [engine.connect() for _ in range(count)]
+    results = await asyncio.gather(
+        *(connection.start() for connection in connections),
+        return_exceptions=True,
+    )
+    opened = [
+        connection
+        for connection, result in zip(connections, results)
+        if not isinstance(result, BaseException)
+    ]
+    await asyncio.gather(*(connection.close() for connection in opened))
+    errors = [
+        result for result in results if isinstance(result, BaseException)
+    ]
+    for error in errors:
+        if not isinstance(error, (OSError, SQLAlchemyError)):
+            raise error
+    if errors:
+        logger.warning(
+            "Открыто %d из %d соединений с БД: %s",
+            len(opened),
+            count,
+            errors[0],
+        )
+    return len(opened)
+
+
 class BaseORM(DeclarativeBase):
     pass
@@ -0,0 +1,70 @@
+import time
+
+from typing import cast
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений, который замеряет ожидание свободного соединения:
+    сколько запросов ждут прямо сейчас, среднее и максимальное время
+    получения соединения и число отказов по pool_timeout
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.waiting = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def connect(self):
+        start = time.perf_counter()
+        self.waiting += 1
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.waiting -= 1
+        wait = time.perf_counter() - start
+        self.checkouts += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+        return connection
+
+    def stats(self) -> dict[str, int | float]:
+        """
+        Текущее состояние пула и накопленные замеры ожидания
+        :return: dict[str, int | float]
+        """
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            # overflow() отрицателен, пока пул не заполнен до pool_size
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "waiting": self.waiting,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_avg_ms": (
+                self.wait_total / self.checkouts * 1000
+                if self.checkouts
+                else 0.0
+            ),
+            "wait_max_ms": self.wait_max * 1000,
+        }
+
+
+def get_pool(engine: AsyncEngine) -> InstrumentedPool:
+    """
+    Пул движка, созданного create_pooled_engine
+    :return: InstrumentedPool
+    """
+    return cast(InstrumentedPool, engine.pool)
@@ -0,0 +1,152 @@
+import asyncio
+import itertools
+import logging
+
+from collections.abc import Sequence
+from typing import Literal
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+)
+
+from src.config import settings
+from src.connectors.database_init import create_pooled_engine
+from src.connectors.pool import get_pool
+from src.repositories.feature_changes import FeatureChangeRepository
+
+logger = logging.getLogger(__name__)
+
+# Отставание реплики в секундах. Если все полученные WAL уже применены,
+# реплика не отстает, даже если основная БД давно не писала
+REPLICA_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+    """
+)
+
+
+class Replica:
+    def __init__(self, name: str, engine: AsyncEngine) -> None:
+        self.name = name
+        self.engine = engine
+        self.session_maker = async_sessionmaker(
+            bind=engine, expire_on_commit=False
+        )
+        # До первой проверки реплика считается доступной
+        self.available = True
+        self.lag: float | None = None
+
+    @property
+    def checked_out(self) -> int:
+        return get_pool(self.engine).checkedout()
+
+    async def check(self, timeout: float) -> None:
+        try:
+            async with asyncio.timeout(timeout):
+                async with self.engine.connect() as connection:
+                    result = await connection.execute(REPLICA_LAG_QUERY)
+                    self.lag = float(result.scalar_one())
+            self.available = True
+        except (OSError, SQLAlchemyError) as ex:
+            if self.available:
+                logger.warning("Реплика %s недоступна: %s", self.name, ex)
+            self.available = False
+            self.lag = None
+
+    async def get_version(self) -> int:
+        async with self.session_maker() as session:
+            return await FeatureChangeRepository(session).get_version()
+
+
+class ReplicaRouter:
+    """
+    Выбор реплики для чтения: по кругу или с наименьшим числом занятых
+    соединений. Реплики, которые недоступны или отстают больше max_lag,
+    пропускаются; если подходящей нет, чтение идет в основную БД
+    """
+
+    def __init__(
+        self,
+        replicas: Sequence[Replica],
+        strategy: Literal["round_robin", "least_connections"],
+        max_lag: float,
+    ) -> None:
+        self.replicas = list(replicas)
+        self.strategy = strategy
+        self.max_lag = max_lag
+        self._counter = itertools.count()
+
+    def candidates(self) -> list[Replica]:
+        """
+        Подходящие реплики в порядке предпочтения
+        :return: list[Replica]
+        """
+        replicas = [
+            replica
+            for replica in self.replicas
+            if replica.available
+            and (replica.lag is None or replica.lag <= self.max_lag)
+        ]
+        if not replicas:
+            return []
+        if self.strategy == "least_connections":
+            return sorted(replicas, key=lambda replica: replica.checked_out)
+        start = next(self._counter) % len(replicas)
+        return replicas[start:] + replicas[:start]
+
+    async def choose(
+        self, min_version: int = 0
+    ) -> async_sessionmaker[AsyncSession] | None:
+        """
+        Фабрика сессий реплики для чтения
+        :param min_version: версия коллекции, которую реплика уже должна
+            содержать (токен read-your-writes), 0 - любая
+        :return: фабрика сессий или None, если читать нужно из основной БД
+        """
+        for replica in self.candidates():
+            if not min_version:
+                return replica.session_maker
+            try:
+                if await replica.get_version() >= min_version:
+                    return replica.session_maker
+            except (OSError, SQLAlchemyError):
+                replica.available = False
+        return None
+
+    async def check(self, timeout: float) -> None:
+        await asyncio.gather(
+            *(replica.check(timeout) for replica in self.replicas)
+        )
+
+    async def run_checks(self, interval: float) -> None:
+        """
+        Периодически обновляет доступность и отставание реплик
+        :param interval: период проверки, секунды
+        """
+        while True:
+            await asyncio.sleep(interval)
+            await self.check(timeout=interval)
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+replica_router = ReplicaRouter(
+    [
+        Replica(f"replica-{number}", create_pooled_engine(url))
+        for number, url in enumerate(settings.replica_urls, start=1)
+    ],
+    strategy=settings.DB_REPLICA_STRATEGY,
+    max_lag=settings.DB_REPLICA_MAX_LAG,
+)
@@ -0,0 +1,131 @@
+import io
+import json
+import struct
+
+from collections.abc import AsyncIterator, Sequence
+
+from sqlalchemy import Row
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow - необязательная зависимость для GeoParquet
+    pa = None
+    pq = None
+
+FLATGEOBUF_MEDIA_TYPE = "application/flatgeobuf"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+# Поток записей: id (int8), длина WKB (int4), WKB, длина properties
+# (int4), properties в JSON (UTF-8). Целые - big-endian, WKB - NDR
+WKB_STREAM_MEDIA_TYPE = "application/x-wkb-stream"
+
+GEOPARQUET_METADATA = {
+    "version": "1.0.0",
+    "primary_column": "geometry",
+    "columns": {
+        # crs не указан - по спецификации это OGC:CRS84 (долгота, широта),
+        # что совпадает с порядком осей EPSG:4326 в PostGIS
+        "geometry": {"encoding": "WKB", "geometry_types": []},
+    },
+}
+
+
+_RECORD_HEADER = struct.Struct(">qi")
+_LENGTH = struct.Struct(">i")
+
+
+async def iter_wkb_stream(
+    batches: AsyncIterator[Sequence[Row]],
+) -> AsyncIterator[bytes]:
+    """
+    Поток записей WKB_STREAM_MEDIA_TYPE, по части на пачку строк
+    :param batches: пачки строк (id, wkb, properties)
+    :return: AsyncIterator[bytes]
+    """
+    async for rows in batches:
+        parts = []
+        for feature_id, wkb, properties in rows:
+            properties = properties.encode()
+            parts += (
+                _RECORD_HEADER.pack(feature_id, len(wkb)),
+                wkb,
+                _LENGTH.pack(len(properties)),
+                properties,
+            )
+        if parts:
+            yield b"".join(parts)
+
+
+def geoparquet_available() -> bool:
+    return pq is not None
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Файл для ParquetWriter, из которого записанные байты забираются
+    после каждой группы строк
+    """
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def take(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+async def iter_geoparquet(
+    batches: AsyncIterator[Sequence[Row]],
+) -> AsyncIterator[bytes]:
+    """
+    Пишет GeoParquet по группе строк на пачку: каждая группа уходит
+    клиенту сразу, в памяти держится только текущая пачка
+    :param batches: пачки строк (id, wkb, name, type)
+    :return: AsyncIterator[bytes]
+    """
+    if pa is None or pq is None:
+        raise RuntimeError("Для GeoParquet нужен пакет pyarrow")
+    schema = pa.schema(
+        [
+            ("id", pa.int64()),
+            ("name", pa.string()),
+            ("type", pa.string()),
+            ("geometry", pa.binary()),
+        ],
+        metadata={"geo": json.dumps(GEOPARQUET_METADATA)},
+    )
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        async for rows in batches:
+            if not rows:
+                continue
+            ids, geometries, names, types = zip(*rows)
+            writer.write_table(
+                pa.Table.from_arrays(
+                    [
+                        pa.array(ids, pa.int64()),
+                        pa.array(names, pa.string()),
+                        pa.array(types, pa.string()),
+                        pa.array(geometries, pa.binary()),
+                    ],
+                    schema=schema,
+                )
+            )
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()
@@ -0,0 +1,204 @@
+import re
+
+from collections.abc import AsyncIterator, Callable, Sequence
+
+import orjson
+
+GEOJSON_MEDIA_TYPE = "application/geo+json"
+GEOJSON_SEQ_MEDIA_TYPE = "application/geo+json-seq"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+COLLECTION_HEAD = b'{"type":"FeatureCollection","features":['
+COLLECTION_TAIL = b"]}"
+
+# Разделитель записей GeoJSON Text Sequences (RFC 8142)
+RECORD_SEPARATOR = "\x1e"
+
+SEQUENCE_MEDIA_TYPES = (
+    NDJSON_MEDIA_TYPE,
+    GEOJSON_SEQ_MEDIA_TYPE,
+    "application/json-seq",
+    "application/jsonl",
+)
+
+_STRUCTURE = re.compile(rb'[{}\[\]",]')
+_STRING_TAIL = re.compile(rb'(?:[^"\\]|\\.)*"', re.DOTALL)
+
+
+async def iter_feature_collection(
+    batches: AsyncIterator[Sequence[str]],
+    links: Callable[[], Sequence[dict]] | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    Собирает FeatureCollection по частям из пачек готовых JSON объектов,
+    не держа всю коллекцию в памяти
+    :param batches: пачки объектов Feature, сериализованных в JSON
+    :param links: вызывается после последней пачки, возвращает ссылки
+    (например, на следующую страницу)
+    :return: AsyncIterator[bytes]
+    """
+    yield COLLECTION_HEAD
+    separator = ""
+    async for batch in batches:
+        if not batch:
+            continue
+        yield (separator + ",".join(batch)).encode()
+        separator = ","
+    collection_links = links() if links else None
+    if collection_links:
+        yield b'],"links":' + orjson.dumps(list(collection_links)) + b"}"
+    else:
+        yield COLLECTION_TAIL
+
+
+async def iter_feature_sequence(
+    batches: AsyncIterator[Sequence[str]], record_separator: str = ""
+) -> AsyncIterator[bytes]:
+    """
+    Отдает объекты Feature построчно (NDJSON), либо с разделителем
+    записей RS для GeoJSONSeq
+    :param batches: пачки объектов Feature, сериализованных в JSON
+    :param record_separator: префикс каждой записи
+    :return: AsyncIterator[bytes]
+    """
+    async for batch in batches:
+        if not batch:
+            continue
+        yield "".join(
+            f"{record_separator}{feature}\n" for feature in batch
+        ).encode()
+
+
+class IncompleteJSONError(ValueError):
+    pass
+
+
+class FeatureCollectionReader:
+    """
+    Инкрементально выделяет элементы массива features из тела
+    FeatureCollection (или элементы массива верхнего уровня), не разбирая
+    и не накапливая весь документ: в памяти держится только текущий,
+    еще не дочитанный объект. Элементы, которые не являются объектами
+    (null, числа, строки), тоже отдаются: их отклонит валидация, и ошибка
+    придет с настоящим индексом элемента
+    """
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._pos = 0
+        self._depth = 0
+        self._key = b""
+        self._in_features = False
+        # Глубина, на которой начинаются элементы массива
+        self._items_depth = 2
+        self._start: int | None = None
+        # Начало текущего элемента-скаляра: после [ или запятой массива
+        self._item_from: int | None = None
+
+    def feed(self, chunk: bytes) -> list[bytes]:
+        self._buffer += chunk
+        buffer = self._buffer
+        features = []
+        while True:
+            match = _STRUCTURE.search(buffer, self._pos)
+            if match is None:
+                self._pos = len(buffer)
+                break
+            char = match.group()
+            if char == b'"':
+                tail = _STRING_TAIL.match(buffer, match.end())
+                if tail is None:
+                    # Строка не дочитана, продолжим с ее начала
+                    self._pos = match.start()
+                    break
+                if self._depth == 1:
+                    self._key = bytes(buffer[match.end() : tail.end() - 1])
+                self._pos = tail.end()
+                continue
+            self._pos = match.end()
+            in_items = self._in_features and self._depth == self._items_depth
+            if in_items and char in b",]" and self._item_from is not None:
+                item = bytes(buffer[self._item_from : match.start()]).strip()
+                if item:
+                    features.append(item)
+                self._item_from = None
+            if char == b",":
+                if in_items:
+                    self._item_from = self._pos
+                continue
+            if char in b"{[":
+                if in_items:
+                    self._start = match.start()
+                    self._item_from = None
+                elif self._depth == 0 and char == b"[":
+                    self._in_features = True
+                    self._items_depth = 1
+                    self._item_from = self._pos
+                elif self._depth == 1 and self._key == b"features":
+                    self._in_features = char == b"["
+                    if self._in_features:
+                        self._item_from = self._pos
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if (
+                    self._depth == self._items_depth
+                    and self._start is not None
+                ):
+                    features.append(bytes(buffer[self._start : self._pos]))
+                    self._start = None
+                elif self._depth == self._items_depth - 1:
+                    self._in_features = False
+        # Отбрасываем уже обработанную часть буфера
+        keep_from = self._pos
+        for position in (self._start, self._item_from):
+            if position is not None:
+                keep_from = min(keep_from, position)
+        del buffer[:keep_from]
+        self._pos -= keep_from
+        if self._start is not None:
+            self._start -= keep_from
+        if self._item_from is not None:
+            self._item_from -= keep_from
+        return features
+
+    def close(self) -> None:
+        if self._depth != 0 or self._start is not None:
+            raise IncompleteJSONError("Тело FeatureCollection обрезано")
+
+
+async def iter_collection_features(
+    chunks: AsyncIterator[bytes],
+) -> AsyncIterator[bytes]:
+    """
+    Отдает объекты Feature из FeatureCollection (или элементы массива
+    верхнего уровня) по мере чтения тела
+    :param chunks: тело запроса по частям
+    :return: AsyncIterator[bytes] - JSON отдельных объектов
+    """
+    reader = FeatureCollectionReader()
+    async for chunk in chunks:
+        for feature in reader.feed(chunk):
+            yield feature
+    reader.close()
+
+
+async def iter_sequence_features(
+    chunks: AsyncIterator[bytes],
+) -> AsyncIterator[bytes]:
+    """
+    Отдает объекты из NDJSON или GeoJSONSeq по мере чтения тела
+    :param chunks: тело запроса по частям
+    :return: AsyncIterator[bytes] - JSON отдельных объектов
+    """
+    tail = b""
+    async for chunk in chunks:
+        lines = (tail + chunk).split(b"\n")
+        tail = lines.pop()
+        for line in lines:
+            line = line.strip(b"\x1e \t\r")
+            if line:
+                yield line
+    tail = tail.strip(b"\x1e \t\r")
+    if tail:
+        yield tail
@@ -6,32 +6,124 @@ from src.config import settings
 
 sys.path.append(str(Path(__file__).parent.parent))
 
-from contextlib import asynccontextmanager
+import asyncio
+import logging
+import os
+import time
 
-import uvicorn
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 
 
 from src.api.features import router as features_router
+from src.api.health import router as health_router
+from src.api.metrics import router as metrics_router
 from  src.api.plugin import router as plugin_router
 from src.api.stats import router as stats_router
+from src.api.tiles import router as tiles_router
+from src.cache.sync import sync_tile_cache
+from src.cache.tiles import TILE_CACHES
+from src.connectors.database_init import (
+    async_session_maker,
+    engine,
+    prewarm_pool,
+)
+from src.connectors.replicas import replica_router
+from src.metrics.app import registry
+from src.metrics.multiprocess import flush_metrics, write_state
+from src.middlewares.compression import CompressionMiddleware
+from src.middlewares.metrics import MetricsMiddleware
+from src.server import main
+
+logger = logging.getLogger("uvicorn.error")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    opened = await prewarm_pool(
+        engine, min(settings.DB_POOL_PREWARM, settings.pool_size)
+    )
+    background_tasks = []
+    # С одним воркером записи сбрасывают его кэш сами, опрашивать журнал
+    # незачем
+    if settings.workers > 1 and settings.TILE_CACHE_SYNC_INTERVAL:
+        background_tasks.append(
+            asyncio.create_task(
+                sync_tile_cache(
+                    async_session_maker,
+                    TILE_CACHES,
+                    settings.TILE_CACHE_SYNC_INTERVAL,
+                )
+            )
+        )
+    if settings.METRICS_DIR:
+        background_tasks.append(
+            asyncio.create_task(
+                flush_metrics(
+                    registry,
+                    settings.METRICS_DIR,
+                    settings.METRICS_FLUSH_INTERVAL,
+                )
+            )
+        )
+    if replica_router.replicas:
+        # Первая проверка до приема запросов: недоступные реплики
+        # не получат ни одного чтения
+        await replica_router.check(timeout=settings.DB_REPLICA_CHECK_INTERVAL)
+        background_tasks.append(
+            asyncio.create_task(
+                replica_router.run_checks(settings.DB_REPLICA_CHECK_INTERVAL)
+            )
+        )
+    logger.info(
+        "Воркер %d запущен за %.2f с: цикл событий %s, пул %d+%d "
+        "соединений, открыто %d",
+        os.getpid(),
+        time.perf_counter() - started,
+        type(asyncio.get_running_loop()).__module__,
+        settings.pool_size,
+        settings.max_overflow,
+        opened,
+    )
     yield
-
-
-app = FastAPI(lifespan=lifespan,root_path=settings.ROOT_PATH)
+    # Сюда uvicorn доходит после завершения запросов в обработке
+    # (или по GRACEFUL_SHUTDOWN_TIMEOUT)
+    for task in background_tasks:
+        task.cancel()
+    if settings.METRICS_DIR:
+        # Итоговые значения: файл остается после остановки воркера
+        write_state(registry, settings.METRICS_DIR)
+    await replica_router.dispose()
+    await engine.dispose()
+
+
+app = FastAPI(
+    lifespan=lifespan,
+    root_path=settings.ROOT_PATH,
+    default_response_class=ORJSONResponse,
+)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+# Последним: снаружи сжатия, размер ответа считается после него
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(features_router)
+app.include_router(health_router)
+app.include_router(metrics_router)
 app.include_router(plugin_router)
 app.include_router(stats_router)
+app.include_router(tiles_router)
 
 app.mount(f"/static", StaticFiles(directory="src/static"), name="static")
 
 
 if __name__ == "__main__":
-    uvicorn.run(app="main:app", reload=True)
+    main()
@@ -1,26 +1,63 @@
+from src.repositories.feature_changes import (
+    WRITTEN_VERSION_KEY,
+    FeatureChangeRepository,
+)
 from src.repositories.features import FeatureRepository
 
 
 class DBManager:
-    def __init__(self, session_factories):
+    def __init__(self, session_factories, read_session_factories=None):
+        """
+        :param session_factories: фабрика сессий основной БД
+        :param read_session_factories: фабрика сессий для методов чтения
+            (реплика), по умолчанию - основная БД
+        """
         self.session_factories = session_factories
+        self.read_session_factories = read_session_factories
 
     async def __aenter__(self):
         self.session = self.session_factories()
+        self.read_session = None
+        if self.read_session_factories not in (None, self.session_factories):
+            self.read_session = self.read_session_factories()
 
-        self.feature = FeatureRepository(self.session)
+        self.feature = FeatureRepository(self.session, self.read_session)
+        self.feature_changes = FeatureChangeRepository(
+            self.session, self.read_session
+        )
 
         return self
 
     async def __aexit__(self, *args):
         await self.session.rollback()
         await self.session.close()
+        if self.read_session is not None:
+            await self.read_session.close()
+
+    @property
+    def written_version(self) -> int | None:
+        """
+        Версия коллекции после записей этой сессии: после коммита клиент
+        передает ее как токен read-your-writes
+        :return: int | None - None, если сессия ничего не записала
+        """
+        return self.session.info.get(WRITTEN_VERSION_KEY)
 
     async def commit(self):
         await self.session.commit()
 
     async def rollback(self):
         await self.session.rollback()
+        if self.read_session is not None:
+            # Ошибка чтения прерывает и транзакцию реплики
+            await self.read_session.rollback()
+
+    def begin_nested(self):
+        """
+        Точка сохранения (SAVEPOINT): ошибка внутри блока async with
+        откатывает только его, транзакция остается рабочей
+        """
+        return self.session.begin_nested()
 
     async def flush(self):
         await self.session.flush()
@@ -0,0 +1,118 @@
+import time
+
+from collections.abc import AsyncIterator, Sequence
+from contextvars import ContextVar
+from typing import TypeVar
+
+from starlette.types import Scope
+
+from src.metrics.registry import Counter, Gauge, Histogram, Registry
+
+T = TypeVar("T", bound=Sequence)
+
+registry = Registry()
+
+# Маршрут без шаблона (404, статика) - одна метка, а не путь запроса:
+# иначе число рядов метрик растет без ограничений
+OTHER_ROUTE = "other"
+
+HTTP_REQUESTS = registry.register(
+    Counter(
+        "http_requests_total",
+        "Число обработанных запросов",
+        ("method", "route", "status"),
+    )
+)
+HTTP_REQUEST_DURATION = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Время обработки запроса, включая отправку тела ответа",
+        ("method", "route"),
+    )
+)
+HTTP_REQUESTS_IN_FLIGHT = registry.register(
+    Gauge("http_requests_in_flight", "Запросы в обработке")
+)
+HTTP_RESPONSE_SIZE = registry.register(
+    Histogram(
+        "http_response_size_bytes",
+        "Размер тела ответа после сжатия",
+        ("method", "route"),
+        buckets=(100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000, 1e8),
+    )
+)
+DB_QUERY_DURATION = registry.register(
+    Histogram(
+        "db_query_duration_seconds",
+        "Время выполнения SQL запросов по маршрутам API",
+        ("route",),
+        buckets=(
+            0.0005,
+            0.001,
+            0.0025,
+            0.005,
+            0.01,
+            0.025,
+            0.05,
+            0.1,
+            0.25,
+            0.5,
+            1.0,
+            5.0,
+        ),
+    )
+)
+FEATURE_CONVERSIONS = registry.register(
+    Counter(
+        "feature_conversions_total",
+        "Число объектов, преобразованных в формат ответа",
+        ("format",),
+    )
+)
+FEATURE_CONVERSION_SECONDS = registry.register(
+    Counter(
+        "feature_conversion_seconds_total",
+        "Суммарное время получения преобразованных объектов из курсора",
+        ("format",),
+    )
+)
+
+# scope текущего запроса: маршрут в нем появляется после роутинга,
+# поэтому метку читают в момент замера, а не при входе в middleware
+current_scope: ContextVar[Scope | None] = ContextVar(
+    "current_scope", default=None
+)
+
+
+def route_label(scope: Scope | None) -> str:
+    """
+    Шаблон пути маршрута (/features/{feature_id}) для меток метрик
+    :param scope: scope запроса или None вне запроса
+    :return: str
+    """
+    route = scope.get("route") if scope is not None else None
+    return getattr(route, "path", OTHER_ROUTE)
+
+
+async def count_conversions(
+    output_format: str, batches: AsyncIterator[T]
+) -> AsyncIterator[T]:
+    """
+    Считает объекты пачек и время их получения из курсора: геометрию в
+    формат ответа преобразует PostGIS, и это время входит в ожидание
+    очередной пачки
+    :param output_format: значение метки format
+    :param batches: пачки строк из курсора
+    :return: AsyncIterator[T] - те же пачки
+    """
+    while True:
+        start = time.perf_counter()
+        try:
+            batch = await batches.__anext__()
+        except StopAsyncIteration:
+            return
+        FEATURE_CONVERSIONS.inc(output_format, amount=len(batch))
+        FEATURE_CONVERSION_SECONDS.inc(
+            output_format, amount=time.perf_counter() - start
+        )
+        yield batch
@@ -0,0 +1,85 @@
+"""
+Метрики нескольких воркеров: реестр у каждого процесса свой, поэтому
+процессы пишут его состояние в общий каталог METRICS_DIR (файл на
+процесс), а /metrics складывает состояния всех файлов. Файлы завершенных
+процессов остаются: их счетчики входят в сумму, как и до остановки.
+"""
+
+import asyncio
+import logging
+import os
+
+import orjson
+
+from src.metrics.registry import MetricState, Registry
+
+logger = logging.getLogger(__name__)
+
+STATE_SUFFIX = ".json"
+
+
+def write_state(registry: Registry, directory: str) -> None:
+    """
+    Записывает состояние реестра процесса в каталог метрик
+    :param registry: реестр метрик процесса
+    :param directory: каталог метрик
+    """
+    path = os.path.join(directory, f"{os.getpid()}{STATE_SUFFIX}")
+    # Через временный файл: читатель не увидит недописанный JSON
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(orjson.dumps(registry.state()))
+    os.replace(temporary, path)
+
+
+def read_states(directory: str) -> list[dict[str, MetricState]]:
+    """
+    Читает состояния реестров всех процессов из каталога метрик
+    :param directory: каталог метрик
+    :return: list[dict[str, MetricState]]
+    """
+    states = []
+    for name in os.listdir(directory):
+        if not name.endswith(STATE_SUFFIX):
+            continue
+        try:
+            with open(os.path.join(directory, name), "rb") as file:
+                states.append(orjson.loads(file.read()))
+        except (OSError, orjson.JSONDecodeError) as ex:
+            logger.warning("Не удалось прочитать метрики %s: %s", name, ex)
+    return states
+
+
+def clear_states(directory: str) -> None:
+    """
+    Создает каталог метрик и удаляет состояния прошлого запуска сервера:
+    иначе счетчики продолжились бы с их значений
+    :param directory: каталог метрик
+    """
+    os.makedirs(directory, exist_ok=True)
+    for name in os.listdir(directory):
+        if name.endswith((STATE_SUFFIX, f"{STATE_SUFFIX}.tmp")):
+            os.remove(os.path.join(directory, name))
+
+
+async def flush_metrics(
+    registry: Registry, directory: str, interval: float
+) -> None:
+    """
+    Периодически записывает состояние реестра процесса в каталог метрик,
+    чтобы /metrics в другом воркере видел значения этого
+    :param registry: реестр метрик процесса
+    :param directory: каталог метрик
+    :param interval: период записи, секунды
+    """
+    failing = False
+    while True:
+        try:
+            write_state(registry, directory)
+            failing = False
+        except OSError as ex:
+            # Пишем в лог один раз, а не на каждой попытке
+            if not failing:
+                logger.warning("Не удалось записать метрики: %s", ex)
+            failing = True
+        await asyncio.sleep(interval)
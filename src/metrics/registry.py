@@ -0,0 +1,255 @@
+import threading
+
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Any, Self, TypeVar
+
+# Границы корзин гистограммы по умолчанию, секунды
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = tuple[str, ...]
+# Ряды метрики в виде, пригодном для JSON: [метки, значение...]
+MetricState = list[list[Any]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    )
+    return f"{{{pairs}}}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric(ABC):
+    """
+    Метрика с набором меток: значения хранятся по кортежу значений меток
+    """
+
+    type_name = ""
+
+    def __init__(
+        self, name: str, documentation: str, labels: Sequence[str] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def samples(self) -> Iterator[str]:
+        """
+        Строки с текущими значениями метрики в текстовом формате Prometheus
+        :return: Iterator[str]
+        """
+
+    @abstractmethod
+    def empty(self) -> Self:
+        """
+        Метрика с тем же именем, описанием и метками, но без значений
+        :return: Metric
+        """
+
+    @abstractmethod
+    def state(self) -> MetricState:
+        """
+        Текущие ряды метрики для передачи в другой процесс
+        :return: MetricState
+        """
+
+    @abstractmethod
+    def load(self, state: MetricState) -> None:
+        """
+        Прибавляет к значениям метрики ряды другого процесса
+        :param state: результат state() метрики с тем же именем
+        """
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+            *self.samples(),
+        ]
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def __init__(
+        self, name: str, documentation: str, labels: Sequence[str] = ()
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def empty(self) -> Self:
+        return type(self)(self.name, self.documentation, self.label_names)
+
+    def state(self) -> MetricState:
+        with self._lock:
+            return [
+                [list(labels), value] for labels, value in self._values.items()
+            ]
+
+    def load(self, state: MetricState) -> None:
+        for labels, value in state:
+            self.inc(*labels, amount=value)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield (
+                f"{self.name}{_format_labels(self.label_names, labels)} "
+                f"{_format_value(value)}"
+            )
+
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # По каждому набору меток: число наблюдений в каждой корзине
+        # (последняя - +Inf) и их сумма
+        self._counts: dict[LabelValues, list[int]] = {}
+        self._sums: dict[LabelValues, float] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(labels)
+            if counts is None:
+                counts = self._counts[labels] = [0] * (len(self.buckets) + 1)
+                self._sums[labels] = 0.0
+            counts[index] += 1
+            self._sums[labels] += value
+
+    def empty(self) -> Self:
+        return type(self)(
+            self.name, self.documentation, self.label_names, self.buckets
+        )
+
+    def state(self) -> MetricState:
+        with self._lock:
+            return [
+                [list(labels), list(counts), self._sums[labels]]
+                for labels, counts in self._counts.items()
+            ]
+
+    def load(self, state: MetricState) -> None:
+        with self._lock:
+            for labels, counts, total in state:
+                key = tuple(labels)
+                current = self._counts.setdefault(key, [0] * len(counts))
+                for index, count in enumerate(counts):
+                    current[index] += count
+                self._sums[key] = self._sums.get(key, 0.0) + total
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            series = [
+                (labels, list(counts), self._sums[labels])
+                for labels, counts in self._counts.items()
+            ]
+        bucket_names = (*self.label_names, "le")
+        bounds = (*self.buckets, float("inf"))
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                bucket_labels = _format_labels(
+                    bucket_names, (*labels, _format_value(bound))
+                )
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            series_labels = _format_labels(self.label_names, labels)
+            yield f"{self.name}_sum{series_labels} {_format_value(total)}"
+            yield f"{self.name}_count{series_labels} {cumulative}"
+
+
+M = TypeVar("M", bound=Metric)
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: M) -> M:
+        if metric.name in self._metrics:
+            raise ValueError(f"Метрика {metric.name} уже зарегистрирована")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def state(self) -> dict[str, MetricState]:
+        """
+        Ряды всех метрик процесса по именам метрик
+        :return: dict[str, MetricState]
+        """
+        return {name: metric.state() for name, metric in self._metrics.items()}
+
+    def render(self, states: Iterable[dict[str, MetricState]] = ()) -> str:
+        """
+        Все метрики в текстовом формате Prometheus
+        :param states: состояния реестров процессов (state()), значения
+            которых складываются; пусто - значения этого процесса
+        :return: str
+        """
+        states = list(states)
+        metrics: Iterable[Metric] = self._metrics.values()
+        if states:
+            metrics = [self._merge(metric, states) for metric in metrics]
+        return "".join(metric.render() + "\n" for metric in metrics)
+
+    @staticmethod
+    def _merge(metric: Metric, states: list[dict[str, MetricState]]) -> Metric:
+        merged = metric.empty()
+        for state in states:
+            merged.load(state.get(metric.name, []))
+        return merged
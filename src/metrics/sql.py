@@ -0,0 +1,35 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.metrics.app import DB_QUERY_DURATION, current_scope, route_label
+
+
+def _before_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+) -> None:
+    context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+) -> None:
+    DB_QUERY_DURATION.observe(
+        time.perf_counter() - context._query_start,
+        route_label(current_scope.get()),
+    )
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """
+    Замеряет время SQL запросов движка с меткой маршрута API,
+    из которого они выполнены
+    :param engine: асинхронный движок
+    """
+    event.listen(
+        engine.sync_engine, "before_cursor_execute", _before_cursor_execute
+    )
+    event.listen(
+        engine.sync_engine, "after_cursor_execute", _after_cursor_execute
+    )
@@ -0,0 +1,228 @@
+import re
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli  # pyright: ignore[reportMissingImports]
+except ImportError:  # brotli - необязательная зависимость
+    brotli = None
+
+COMPRESSIBLE_MEDIA_TYPES = (
+    "application/json",
+    "application/geo+json",
+    "application/geo+json-seq",
+    "application/x-ndjson",
+    "application/vnd.mapbox-vector-tile",
+    "application/javascript",
+    "image/svg+xml",
+)
+
+_ETAG_ENCODING = re.compile(r'-(gzip|br)"$')
+
+
+class GzipEncoder:
+    def __init__(self, level: int) -> None:
+        # wbits=31 - формат gzip, а не голый deflate
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, finish: bool) -> bytes:
+        body = self._compressor.compress(data)
+        # SYNC_FLUSH отдает клиенту все, что сжато к этому моменту:
+        # потоковый ответ не застревает в буфере компрессора
+        flush_mode = zlib.Z_FINISH if finish else zlib.Z_SYNC_FLUSH
+        return body + self._compressor.flush(flush_mode)
+
+
+class BrotliEncoder:
+    def __init__(self, quality: int) -> None:
+        assert brotli is not None
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, finish: bool) -> bytes:
+        body = self._compressor.process(data)
+        if finish:
+            return body + self._compressor.finish()
+        return body + self._compressor.flush()
+
+
+def parse_accept_encoding(header: str) -> dict[str, float]:
+    """
+    Кодировки из Accept-Encoding с их q-весами
+    :param header: значение заголовка
+    :return: dict[str, float]
+    """
+    encodings = {}
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        encodings[name.strip().lower()] = quality
+    return encodings
+
+
+class CompressionMiddleware:
+    """
+    Сжимает ответы gzip или brotli (если установлен пакет brotli) по
+    Accept-Encoding. Ответ сжимается, только если набрал minimum_size
+    байт; потоковые ответы сжимаются по частям, каждая часть уходит
+    клиенту сразу. ETag сжатого ответа получает суффикс кодировки, а
+    суффикс в If-None-Match снимается до передачи запроса приложению,
+    поэтому 304 работает для любой кодировки
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def choose_encoding(self, accept_encoding: str) -> str | None:
+        encodings = parse_accept_encoding(accept_encoding)
+        candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+        best = None
+        for encoding in candidates:
+            quality = encodings.get(encoding, encodings.get("*", 0.0))
+            if quality > 0 and (best is None or quality > best[1]):
+                best = (encoding, quality)
+        return best[0] if best else None
+
+    def make_encoder(self, encoding: str) -> GzipEncoder | BrotliEncoder:
+        if encoding == "br":
+            return BrotliEncoder(self.brotli_quality)
+        return GzipEncoder(self.gzip_level)
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        encoding = self.choose_encoding(headers.get("accept-encoding", ""))
+        if_none_match = headers.get("if-none-match")
+        if if_none_match:
+            # scope меняется на месте, без копии: внешние middleware
+            # (метрики) читают из него маршрут после роутинга
+            request_headers = MutableHeaders(scope=scope)
+            request_headers["if-none-match"] = ",".join(
+                _ETAG_ENCODING.sub('"', tag.strip())
+                for tag in if_none_match.split(",")
+            )
+        await _CompressionResponder(self, encoding, if_none_match)(
+            scope, receive, send
+        )
+
+
+class _CompressionResponder:
+    def __init__(
+        self,
+        middleware: CompressionMiddleware,
+        encoding: str | None,
+        if_none_match: str | None,
+    ) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self.if_none_match = if_none_match or ""
+        self.send: Send
+        self.start_message: Message | None = None
+        self.buffer = bytearray()
+        self.encoder: GzipEncoder | BrotliEncoder | None = None
+        # None - решение о сжатии еще не принято
+        self.compressing: bool | None = None
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        self.send = send
+        await self.middleware.app(scope, receive, self.send_wrapper)
+
+    async def send_wrapper(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            headers = MutableHeaders(raw=message["headers"])
+            media_type = headers.get("content-type", "").split(";")[0]
+            compressible = media_type.strip() in COMPRESSIBLE_MEDIA_TYPES
+            if compressible or message["status"] == 304:
+                headers.add_vary_header("Accept-Encoding")
+            if message["status"] == 304:
+                # Тела у 304 нет, но ETag должен совпасть с тем, что
+                # есть у клиента: со сжатым вариантом, если пришел он
+                etag = headers.get("etag", "")
+                if self.encoding and (
+                    f'{etag[:-1]}-{self.encoding}"' in self.if_none_match
+                ):
+                    self._tag_etag(headers)
+                self.compressing = False
+            elif (
+                not compressible
+                or self.encoding is None
+                or "content-encoding" in headers
+            ):
+                self.compressing = False
+            if self.compressing is False:
+                await self.send(message)
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        if self.compressing is False:
+            await self.send(message)
+            return
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressing is None:
+            self.buffer += body
+            if len(self.buffer) < self.middleware.minimum_size:
+                if more_body:
+                    return
+                # Ответ целиком меньше порога: отдаем как есть
+                self.compressing = False
+                assert self.start_message is not None
+                await self.send(self.start_message)
+                await self.send({
+                    "type": "http.response.body",
+                    "body": bytes(self.buffer),
+                })
+                return
+            self.compressing = True
+            await self._start_compressed()
+            body = bytes(self.buffer)
+            self.buffer.clear()
+        assert self.encoder is not None
+        await self.send({
+            "type": "http.response.body",
+            "body": self.encoder.compress(body, finish=not more_body),
+            "more_body": more_body,
+        })
+
+    async def _start_compressed(self) -> None:
+        assert self.start_message is not None and self.encoding is not None
+        self.encoder = self.middleware.make_encoder(self.encoding)
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers["Content-Encoding"] = self.encoding
+        # Размер сжатого тела заранее неизвестен: chunked передача
+        del headers["Content-Length"]
+        self._tag_etag(headers)
+        await self.send(self.start_message)
+
+    def _tag_etag(self, headers: MutableHeaders) -> None:
+        etag = headers.get("etag")
+        if etag and etag.endswith('"'):
+            headers["ETag"] = f'{etag[:-1]}-{self.encoding}"'
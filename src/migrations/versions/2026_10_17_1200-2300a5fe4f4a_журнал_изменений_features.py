@@ -0,0 +1,58 @@
+"""Журнал изменений features
+
+Revision ID: 2300a5fe4f4a
+Revises: 01adebe295d6
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2300a5fe4f4a"
+down_revision: Union[str, Sequence[str], None] = "01adebe295d6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "feature_changes",
+        sa.Column("seq", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("feature_id", sa.Integer(), nullable=False),
+        sa.Column("operation", sa.String(length=6), nullable=False),
+        sa.Column("min_x", sa.Float(), nullable=False),
+        sa.Column("min_y", sa.Float(), nullable=False),
+        sa.Column("max_x", sa.Float(), nullable=False),
+        sa.Column("max_y", sa.Float(), nullable=False),
+        sa.Column(
+            "changed_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("seq"),
+    )
+    # Уже существующие объекты попадают в журнал как добавленные,
+    # чтобы синхронизация с since=0 получила их все
+    op.execute(
+        """
+        INSERT INTO feature_changes
+            (feature_id, operation, min_x, min_y, max_x, max_y)
+        SELECT id, 'insert', ST_XMin(geometry), ST_YMin(geometry),
+               ST_XMax(geometry), ST_YMax(geometry)
+        FROM features
+        ORDER BY id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("feature_changes")
@@ -0,0 +1,53 @@
+"""Счетчики объектов по типам
+
+Revision ID: 9c41d27e5b83
+Revises: 2300a5fe4f4a
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9c41d27e5b83"
+down_revision: Union[str, Sequence[str], None] = "2300a5fe4f4a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "features",
+        sa.Column(
+            "geometry_type",
+            sa.String(length=32),
+            sa.Computed("GeometryType(geometry)", persisted=True),
+            nullable=False,
+        ),
+    )
+    op.create_table(
+        "feature_type_counts",
+        sa.Column("geometry_type", sa.String(length=32), nullable=False),
+        sa.Column("count", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("geometry_type"),
+    )
+    op.execute(
+        """
+        INSERT INTO feature_type_counts (geometry_type, count)
+        SELECT geometry_type, count(*)
+        FROM features
+        GROUP BY geometry_type
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("feature_type_counts")
+    op.drop_column("features", "geometry_type")
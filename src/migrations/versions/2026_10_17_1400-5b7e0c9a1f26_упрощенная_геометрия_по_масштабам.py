@@ -0,0 +1,50 @@
+"""Упрощенная геометрия по масштабам
+
+Revision ID: 5b7e0c9a1f26
+Revises: 9c41d27e5b83
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import geoalchemy2
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5b7e0c9a1f26"
+down_revision: Union[str, Sequence[str], None] = "9c41d27e5b83"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Допуск - размер пикселя тайла 512px на масштабе: 360 / (512 * 2**zoom)
+SIMPLIFIED_ZOOMS = (4, 8, 12)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for zoom in SIMPLIFIED_ZOOMS:
+        tolerance = 360 / (512 * 2**zoom)
+        op.add_column(
+            "features",
+            sa.Column(
+                f"geometry_z{zoom}",
+                geoalchemy2.types.Geometry(
+                    srid=4326, spatial_index=False, nullable=False
+                ),
+                sa.Computed(
+                    f"ST_SimplifyPreserveTopology(geometry, {tolerance!r})",
+                    persisted=True,
+                ),
+                nullable=False,
+            ),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for zoom in reversed(SIMPLIFIED_ZOOMS):
+        op.drop_column("features", f"geometry_z{zoom}")
@@ -0,0 +1,43 @@
+"""Пустой охват в журнале изменений
+
+Revision ID: 7d3f2a8c4e91
+Revises: 5b7e0c9a1f26
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7d3f2a8c4e91"
+down_revision: Union[str, Sequence[str], None] = "5b7e0c9a1f26"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# У пустой геометрии (ST_IsEmpty) охвата нет, ST_XMin и др. дают NULL
+BOUNDS_COLUMNS = ("min_x", "min_y", "max_x", "max_y")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for column in BOUNDS_COLUMNS:
+        op.alter_column(
+            "feature_changes", column, existing_type=sa.Float(), nullable=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        "DELETE FROM feature_changes WHERE "
+        + " OR ".join(f"{column} IS NULL" for column in BOUNDS_COLUMNS)
+    )
+    for column in BOUNDS_COLUMNS:
+        op.alter_column(
+            "feature_changes", column, existing_type=sa.Float(), nullable=False
+        )
@@ -0,0 +1,44 @@
+"""Индекс geography для ближайших
+
+Revision ID: 3e8b6d1f0a27
+Revises: 7d3f2a8c4e91
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3e8b6d1f0a27"
+down_revision: Union[str, Sequence[str], None] = "7d3f2a8c4e91"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Выражение совпадает с cast(geometry, GEOGRAPHY) в запросах: иначе
+# планировщик не использует индекс
+GEOGRAPHY_EXPRESSION = "CAST(geometry AS geography(GEOMETRY,4326))"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "idx_features_geography",
+        "features",
+        [sa.text(GEOGRAPHY_EXPRESSION)],
+        unique=False,
+        postgresql_using="gist",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "idx_features_geography",
+        table_name="features",
+        postgresql_using="gist",
+    )
@@ -1,3 +1,5 @@
+from src.models.feature_changes import FeatureChangesORM
+from src.models.feature_type_counts import FeatureTypeCountsORM
 from src.models.features import FeaturesORM
 
-__all__ = ["FeaturesORM"]
+__all__ = ["FeatureChangesORM", "FeatureTypeCountsORM", "FeaturesORM"]
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.connectors.database_init import BaseORM
+
+
+class FeatureChangesORM(BaseORM):
+    __tablename__ = "feature_changes"
+
+    seq: Mapped[int] = mapped_column(
+        BigInteger, primary_key=True, autoincrement=True
+    )
+    feature_id: Mapped[int] = mapped_column(nullable=False)
+    # insert / update / delete
+    operation: Mapped[str] = mapped_column(String(6), nullable=False)
+    # Охват объекта на момент изменения, для сброса кэшей по области.
+    # NULL для пустой геометрии: у нее нет охвата
+    min_x: Mapped[float | None]
+    min_y: Mapped[float | None]
+    max_x: Mapped[float | None]
+    max_y: Mapped[float | None]
+    changed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
@@ -0,0 +1,12 @@
+from sqlalchemy import BigInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.connectors.database_init import BaseORM
+
+
+class FeatureTypeCountsORM(BaseORM):
+    __tablename__ = "feature_type_counts"
+
+    # Значение GeometryType(geometry): POINT, LINESTRING, POLYGON
+    geometry_type: Mapped[str] = mapped_column(String(32), primary_key=True)
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
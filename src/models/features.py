@@ -1,9 +1,40 @@
-from geoalchemy2 import Geometry
+from geoalchemy2 import Geography, Geometry
+from sqlalchemy import Computed, Index, String, cast
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.connectors.database_init import BaseORM
 
+# Масштабы, для которых хранятся упрощенные копии геометрии. Копия
+# диапазона используется для всех масштабов не крупнее своего
+SIMPLIFIED_ZOOMS = (4, 8, 12)
+# Размер тайла в пикселях, от которого считается допуск упрощения
+TILE_PIXELS = 512
+# Приведение к geography в запросах должно совпадать с выражением
+# индекса idx_features_geography, иначе индекс не используется
+GEOGRAPHY = Geography(srid=4326)
+
+
+def zoom_tolerance(zoom: int) -> float:
+    """
+    Допуск упрощения для масштаба - размер пикселя в градусах
+    :param zoom: уровень масштаба
+    :return: float
+    """
+    return 360 / (TILE_PIXELS * 2**zoom)
+
+
+def simplified_geometry(zoom: int) -> Mapped[Geometry]:
+    return mapped_column(
+        Geometry(geometry_type="GEOMETRY", srid=4326, spatial_index=False),
+        Computed(
+            f"ST_SimplifyPreserveTopology(geometry, {zoom_tolerance(zoom)!r})",
+            persisted=True,
+        ),
+        # Не грузить копии при выборке всей модели
+        deferred=True,
+    )
+
 
 class FeaturesORM(BaseORM):
     __tablename__ = "features"
@@ -20,3 +51,20 @@ class FeaturesORM(BaseORM):
     )
 
     properties: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    # Хранимая генерируемая колонка: тип считается один раз при записи,
+    # а не из геометрии при каждом чтении
+    geometry_type: Mapped[str] = mapped_column(
+        String(32), Computed("GeometryType(geometry)", persisted=True)
+    )
+    # Упрощенные копии пересчитываются PostgreSQL при каждой записи
+    geometry_z4: Mapped[Geometry] = simplified_geometry(4)
+    geometry_z8: Mapped[Geometry] = simplified_geometry(8)
+    geometry_z12: Mapped[Geometry] = simplified_geometry(12)
+
+
+# Индекс для поиска ближайших по расстоянию на сфере (<-> по geography)
+Index(
+    "idx_features_geography",
+    cast(FeaturesORM.geometry, GEOGRAPHY),
+    postgresql_using="gist",
+)
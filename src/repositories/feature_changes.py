@@ -0,0 +1,115 @@
+from collections.abc import Iterable
+
+from sqlalchemy import Row, Table, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.cache.tiles import MaybeBounds
+from src.models.feature_changes import FeatureChangesORM
+
+# Ключ транзакционной advisory-блокировки журнала изменений
+CHANGES_LOCK_KEY = 7_242_019
+# Ключ session.info с seq последнего записанного изменения
+WRITTEN_VERSION_KEY = "written_version"
+
+
+class FeatureChangeRepository:
+    model = FeatureChangesORM
+
+    def __init__(
+        self, session: AsyncSession, read_session: AsyncSession | None = None
+    ):
+        self.session = session
+        # Чтение может идти в реплику, запись - только в session
+        self.read_session = read_session or session
+
+    async def add(
+        self,
+        operation: str,
+        changes: Iterable[tuple[int, *MaybeBounds]],
+    ) -> None:
+        """
+        Записывает изменения в журнал. Перед записью берется advisory
+        блокировка до конца транзакции: seq выдается только после коммита
+        предыдущего писателя, поэтому порядок seq совпадает с порядком
+        коммитов и читатель не пропустит изменения за курсором.
+        Вызывается последним действием перед коммитом
+        :param operation: insert / update / delete
+        :param changes: id объекта и его охват (minx, miny, maxx, maxy),
+            для пустой геометрии - None
+        """
+        rows = [
+            {
+                "feature_id": feature_id,
+                "operation": operation,
+                "min_x": min_x,
+                "min_y": min_y,
+                "max_x": max_x,
+                "max_y": max_y,
+            }
+            for feature_id, min_x, min_y, max_x, max_y in changes
+        ]
+        if not rows:
+            return
+        await self.session.execute(
+            select(func.pg_advisory_xact_lock(CHANGES_LOCK_KEY))
+        )
+        table = self.model.__table__
+        assert isinstance(table, Table)
+        result = await self.session.execute(
+            insert(table).returning(self.model.seq), rows
+        )
+        # Версия коллекции после коммита транзакции - токен
+        # read-your-writes для клиента (DBManager.written_version)
+        last_seq = max(result.scalars().all())
+        self.session.info[WRITTEN_VERSION_KEY] = max(
+            last_seq, self.session.info.get(WRITTEN_VERSION_KEY, 0)
+        )
+
+    async def get_version(self) -> int:
+        """
+        Версия коллекции объектов - seq последнего изменения. Растет при
+        любой записи в features, читается по первичному ключу журнала
+        :return: int, 0 для пустого журнала
+        """
+        query = select(func.coalesce(func.max(self.model.seq), 0))
+        result = await self.read_session.execute(query)
+        return result.scalar_one()
+
+    async def get_since(self, since: int, limit: int) -> list[Row]:
+        """
+        Изменения с seq больше курсора, по возрастанию seq
+        :param since: курсор, полученный с предыдущей порцией
+        :param limit: максимальное количество записей
+        :return: list[Row]
+        """
+        query = (
+            select(self.model.seq, self.model.feature_id, self.model.operation)
+            .where(self.model.seq > since)
+            .order_by(self.model.seq)
+            .limit(limit)
+        )
+        result = await self.read_session.execute(query)
+        return list(result.all())
+
+    async def get_bounds_since(self, since: int, limit: int) -> list[Row]:
+        """
+        Охваты изменений с seq больше курсора, по возрастанию seq: по ним
+        другие процессы сбрасывают свои кэши тайлов
+        :param since: последний обработанный seq
+        :param limit: максимальное количество записей
+        :return: list[Row] - seq, min_x, min_y, max_x, max_y
+        """
+        query = (
+            select(
+                self.model.seq,
+                self.model.min_x,
+                self.model.min_y,
+                self.model.max_x,
+                self.model.max_y,
+            )
+            .where(self.model.seq > since)
+            .order_by(self.model.seq)
+            .limit(limit)
+        )
+        result = await self.read_session.execute(query)
+        return list(result.all())
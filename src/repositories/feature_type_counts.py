@@ -0,0 +1,76 @@
+from collections import Counter
+from collections.abc import Iterable
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.feature_type_counts import FeatureTypeCountsORM
+from src.models.features import FeaturesORM
+
+
+class FeatureTypeCountRepository:
+    model = FeatureTypeCountsORM
+
+    def __init__(
+        self, session: AsyncSession, read_session: AsyncSession | None = None
+    ):
+        self.session = session
+        self.read_session = read_session or session
+
+    async def add(self, geometry_types: Iterable[str], sign: int = 1) -> None:
+        """
+        Изменяет счетчики в той же транзакции, что и запись в features.
+        UPSERT с count = count + excluded.count атомарен: параллельные
+        писатели ждут блокировку строки счетчика до коммита и не теряют
+        обновления. Строки обновляются в порядке типа, чтобы две
+        транзакции не заблокировали друг друга
+        :param geometry_types: типы добавленных или удаленных объектов
+        :param sign: 1 при добавлении, -1 при удалении
+        """
+        counts = Counter(geometry_types)
+        if not counts:
+            return
+        stmt = pg_insert(self.model).values([
+            {"geometry_type": geometry_type, "count": sign * count}
+            for geometry_type, count in sorted(counts.items())
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self.model.geometry_type],
+            set_={"count": self.model.count + stmt.excluded.count},
+        )
+        await self.session.execute(stmt)
+
+    async def get_all(self) -> dict[str, int]:
+        return await self._get_all(self.read_session)
+
+    async def _get_all(self, session: AsyncSession) -> dict[str, int]:
+        query = select(self.model.geometry_type, self.model.count).where(
+            self.model.count > 0
+        )
+        result = await session.execute(query)
+        return {
+            geometry_type: count for geometry_type, count in result.tuples()
+        }
+
+    async def rebuild(self) -> dict[str, int]:
+        """
+        Пересчитывает счетчики по таблице features. SHARE блокировка
+        features не дает писателям изменить данные до коммита пересчета,
+        чтение при этом не блокируется
+        :return: dict[str, int] - новые значения счетчиков
+        """
+        await self.session.execute(
+            text(f"LOCK TABLE {FeaturesORM.__tablename__} IN SHARE MODE")
+        )
+        await self.session.execute(delete(self.model))
+        await self.session.execute(
+            insert(self.model).from_select(
+                ["geometry_type", "count"],
+                select(FeaturesORM.geometry_type, func.count()).group_by(
+                    FeaturesORM.geometry_type
+                ),
+            )
+        )
+        # Пересчет еще не закоммичен: читать можно только из своей сессии
+        return await self._get_all(self.session)
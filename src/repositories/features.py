@@ -1,44 +1,223 @@
-from geoalchemy2.functions import GeometryType
-from sqlalchemy import delete, func, select
+from collections.abc import AsyncIterator, Mapping, Sequence
+from typing import Literal
+
+from sqlalchemy import (
+    ARRAY,
+    JSON,
+    Integer,
+    LargeBinary,
+    Row,
+    Table,
+    Text,
+    any_,
+    bindparam,
+    cast,
+    delete,
+    func,
+    insert,
+    select,
+    type_coerce,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.cache.tiles import MaybeBounds
 from src.exeptions.error import ObjectNotFoundError
 from src.mappers.features import FeatureMapper
-from src.models.features import FeaturesORM
+from src.metrics.app import count_conversions
+from src.models.features import (
+    GEOGRAPHY,
+    SIMPLIFIED_ZOOMS,
+    TILE_PIXELS,
+    FeaturesORM,
+    zoom_tolerance,
+)
+from src.repositories.feature_changes import FeatureChangeRepository
+from src.repositories.feature_type_counts import FeatureTypeCountRepository
 from src.schemas.feature import (
     FeatureCollection,
+    FeatureDeleteRequest,
+    FeatureFilter,
+    FeaturePage,
     FeatureRequest,
+    Geometry,
+    GeometryOptions,
 )
 
+# Слой тайла -> тип геометрии, названия слоев совпадают с ключами /stats
+TILE_LAYERS = {"points": "POINT", "lines": "LINESTRING", "polygons": "POLYGON"}
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+# Половина ширины мира в Web Mercator (EPSG:3857), метры
+WEB_MERCATOR_HALF = 20037508.342789244
+# Сторона ячейки сетки кластеризации в пикселях тайла TILE_PIXELS
+CLUSTER_CELL_PIXELS = 64
+
 
 class FeatureRepository:
     mapper = FeatureMapper
     model = FeaturesORM
 
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self, session: AsyncSession, read_session: AsyncSession | None = None
+    ):
         self.session = session
+        # Методы только для чтения используют read_session: реплику,
+        # если DBManager ее выбрал, иначе ту же session
+        self.read_session = read_session or session
+        self.changes = FeatureChangeRepository(session, read_session)
+        self.type_counts = FeatureTypeCountRepository(session, read_session)
 
     async def add(self, feature_data: FeatureRequest) -> int:
-        feature = self.mapper.to_entity(feature_data)
-        self.session.add(feature)
-        await self.session.flush()
-        return feature.id
-
-    async def delete(self, **filter_by) -> None:
-        query = select(self.model).filter_by(**filter_by)
-        result = await self.session.execute(query)
+        """
+        Добавляет один объект тем же Core INSERT, что и add_many:
+        без ORM объекта, flush и преобразования геометрии через shapely
+        :return: int - id добавленного объекта
+        """
+        (feature_id,) = await self.add_many([feature_data])
+        return feature_id
+
+    async def add_many(self, features: Sequence[FeatureRequest]) -> list[int]:
+        """
+        Добавляет объекты одним многострочным INSERT ... RETURNING id и
+        записывает их в счетчики типов и журнал изменений
+        :param features: объекты для добавления
+        :return: list[int] - id в порядке переданных объектов
+        """
+        rows = await self.insert_many(features)
+        await self.record_inserted(list(zip(rows, features)))
+        return [feature_id for feature_id, _ in rows]
+
+    async def insert_many(
+        self, features: Sequence[FeatureRequest]
+    ) -> list[tuple[int, str]]:
+        """
+        Добавляет объекты одним многострочным INSERT ... RETURNING без
+        записи в счетчики и журнал: их делает record_inserted. Геометрия
+        передается в PostGIS как GeoJSON
+        :param features: объекты для добавления
+        :return: list[tuple[int, str]] - id и тип геометрии в порядке
+        переданных объектов
+        """
+        if not features:
+            return []
+        # Core таблица вместо ORM модели: без identity map и unit of work
+        table = self.model.__table__
+        assert isinstance(table, Table)
+        stmt = (
+            insert(table)
+            .values(
+                geometry=func.ST_SetSRID(
+                    func.ST_GeomFromGeoJSON(bindparam("geojson", type_=Text)),
+                    4326,
+                )
+            )
+            .returning(
+                table.c.id, table.c.geometry_type, sort_by_parameter_order=True
+            )
+        )
+        result = await self.session.execute(
+            stmt,
+            [
+                {
+                    "geojson": feature.geometry.model_dump_json(),
+                    "properties": feature.properties.model_dump(),
+                }
+                for feature in features
+            ],
+        )
+        return [(row.id, row.geometry_type) for row in result.all()]
+
+    async def record_inserted(
+        self, inserted: Sequence[tuple[tuple[int, str], FeatureRequest]]
+    ) -> None:
+        """
+        Записывает добавленные insert_many объекты в счетчики типов и
+        журнал изменений. Счетчики обновляются раньше журнала, как и при
+        удалении: блокировки берутся в одном порядке во всех писателях
+        :param inserted: пары (id, тип геометрии) и добавленный объект
+        """
+        await self.type_counts.add(
+            geometry_type for (_, geometry_type), _ in inserted
+        )
+        await self.changes.add(
+            "insert",
+            [
+                (feature_id, *feature.geometry.bounds)
+                for (feature_id, _), feature in inserted
+            ],
+        )
+
+    def _bounds_columns(self) -> tuple:
+        return (
+            func.ST_XMin(self.model.geometry).label("min_x"),
+            func.ST_YMin(self.model.geometry).label("min_y"),
+            func.ST_XMax(self.model.geometry).label("max_x"),
+            func.ST_YMax(self.model.geometry).label("max_y"),
+        )
+
+    async def delete(self, **filter_by) -> MaybeBounds:
+        """
+        Удаляет объект одним DELETE ... RETURNING
+        :return: охват удаленного объекта для сброса кэша тайлов (None
+        вместо координат для пустой геометрии)
+        """
+        delete_model_stmt = (
+            delete(self.model)
+            .filter_by(**filter_by)
+            .returning(
+                self.model.id,
+                *self._bounds_columns(),
+                self.model.geometry_type,
+            )
+        )
+        result = await self.session.execute(delete_model_stmt)
         try:
-            feature_result = result.scalar_one()
+            row = result.one()
         except NoResultFound:
             raise ObjectNotFoundError
-        if feature_result:
-            delete_model_stmt = delete(self.model).filter_by(**filter_by)
-            await self.session.execute(delete_model_stmt)
+        await self.type_counts.add([row.geometry_type], sign=-1)
+        await self.changes.add("delete", [tuple(row)[:5]])
+        return tuple(row)[1:5]
+
+    async def delete_many(self, filters: FeatureDeleteRequest) -> list[Row]:
+        """
+        Удаляет объекты по списку id, пространственным фильтрам и
+        вхождению properties (условия объединяются через AND) одним
+        DELETE ... RETURNING
+        :return: list[Row] - id, охват (min_x, min_y, max_x, max_y) и тип
+        каждого удаленного объекта
+        """
+        clauses = self._filter_clauses(filters)
+        if filters.ids is not None:
+            clauses.append(
+                self.model.id
+                == any_(bindparam("ids", filters.ids, type_=ARRAY(Integer)))
+            )
+        if filters.properties is not None:
+            clauses.append(self.model.properties.contains(filters.properties))
+        delete_model_stmt = (
+            delete(self.model)
+            .where(*clauses)
+            .returning(
+                self.model.id,
+                *self._bounds_columns(),
+                self.model.geometry_type,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(delete_model_stmt)
+        rows = list(result.all())
+        await self.type_counts.add(
+            (row.geometry_type for row in rows), sign=-1
+        )
+        await self.changes.add("delete", [tuple(row)[:5] for row in rows])
+        return rows
 
     async def get_feature_collection(self) -> FeatureCollection:
         query = select(self.model).select_from(self.model)
-        features_result = await self.session.execute(query)
+        features_result = await self.read_session.execute(query)
         features_list = features_result.scalars().all()
         features_collection = FeatureCollection(
             features=[
@@ -47,25 +226,517 @@ class FeatureRepository:
         )
         return features_collection
 
-    async def get_feature_count_by_type(self) -> dict[str, int]:
+    @staticmethod
+    def _geometry_from_json(geometry: Geometry):
+        return func.ST_SetSRID(
+            func.ST_GeomFromGeoJSON(geometry.model_dump_json()), 4326
+        )
+
+    def _filter_clauses(self, filters: FeatureFilter | None) -> list:
+        """
+        Условия WHERE для пространственных фильтров. && и ST_Intersects
+        обслуживаются GiST индексом idx_features_geometry
+        :param filters: фильтры запроса
+        :return: list
+        """
+        if filters is None:
+            return []
+        clauses = []
+        if filters.bbox:
+            envelope = func.ST_MakeEnvelope(*filters.bbox, 4326)
+            clauses.append(self.model.geometry.op("&&")(envelope))
+        if filters.intersects:
+            clauses.append(
+                func.ST_Intersects(
+                    self.model.geometry,
+                    self._geometry_from_json(filters.intersects),
+                )
+            )
+        if filters.within:
+            clauses.append(
+                func.ST_Within(
+                    self.model.geometry,
+                    self._geometry_from_json(filters.within),
+                )
+            )
+        return clauses
+
+    def _zoom_geometry(self, zoom: int, simplify: bool = True):
+        """
+        Геометрия для масштаба: хранимая упрощенная копия ближайшего
+        диапазона не крупнее zoom, а для крупных масштабов - исходная
+        геометрия, упрощенная на лету (если simplify)
+        :param zoom: уровень масштаба
+        :param simplify: упрощать ли геометрию крупнее последней копии
+        """
+        for band in SIMPLIFIED_ZOOMS:
+            if zoom <= band:
+                return getattr(self.model, f"geometry_z{band}")
+        if not simplify:
+            return self.model.geometry
+        return func.ST_SimplifyPreserveTopology(
+            self.model.geometry, zoom_tolerance(zoom)
+        )
+
+    def _output_geometry(
+        self, options: GeometryOptions | None, reduce_precision: bool = True
+    ):
+        """
+        Геометрия для ответа с учетом допуска, масштаба и точности
+        :param options: параметры упрощения и точности
+        :param reduce_precision: округлять координаты ST_ReducePrecision
+        (для GeoJSON точность задается в ST_AsGeoJSON)
+        """
+        geometry = self.model.geometry
+        if options is None:
+            return geometry
+        if options.tolerance is not None:
+            geometry = func.ST_SimplifyPreserveTopology(
+                geometry, options.tolerance
+            )
+        elif options.zoom is not None:
+            geometry = self._zoom_geometry(options.zoom)
+        if reduce_precision and options.precision is not None:
+            geometry = func.ST_ReducePrecision(
+                geometry, 10.0**-options.precision
+            )
+        return geometry
+
+    def _feature_json(
+        self,
+        options: GeometryOptions | None = None,
+        extra_properties: Mapping | None = None,
+    ):
+        """
+        Выражение, собирающее объект Feature в JSON на стороне PostGIS:
+        id добавляется в properties, как и в FeatureMapper.to_feature
+        :param options: параметры упрощения и точности геометрии
+        :param extra_properties: дополнительные свойства, имя -> выражение
+        """
+        geometry = self._output_geometry(options, reduce_precision=False)
+        # 9 знаков - значение ST_AsGeoJSON по умолчанию
+        precision = 9
+        if options is not None and options.precision is not None:
+            precision = options.precision
+        extra = [
+            item
+            for name, value in (extra_properties or {}).items()
+            for item in (name, value)
+        ]
+        properties = self.model.properties.op("||")(
+            func.jsonb_build_object("id", self.model.id, *extra)
+        )
+        return cast(
+            func.json_build_object(
+                "type",
+                "Feature",
+                "geometry",
+                cast(func.ST_AsGeoJSON(geometry, precision), JSON),
+                "properties",
+                properties,
+            ),
+            Text,
+        )
+
+    def _page_query(self, query, page: FeaturePage | None):
+        """
+        Keyset пагинация: поиск по первичному ключу вместо OFFSET,
+        поэтому стоимость страницы не зависит от ее номера
+        :param query: запрос к таблице объектов
+        :param page: параметры страницы
+        """
+        if page is None:
+            return query.order_by(self.model.id)
+        if page.order == "desc":
+            if page.after_id is not None:
+                query = query.where(self.model.id < page.after_id)
+            query = query.order_by(self.model.id.desc())
+        else:
+            if page.after_id is not None:
+                query = query.where(self.model.id > page.after_id)
+            query = query.order_by(self.model.id)
+        return query.limit(page.limit)
+
+    async def _stream_rows(
+        self,
+        columns: Sequence,
+        filters: FeatureFilter | None,
+        page: FeaturePage | None,
+        batch_size: int,
+    ) -> AsyncIterator[list[Row]]:
+        query = select(*columns).where(*self._filter_clauses(filters))
+        query = self._page_query(query, page).execution_options(
+            yield_per=batch_size
+        )
+        result = await self.read_session.stream(query)
+        async for partition in result.partitions():
+            yield list(partition)
+
+    async def stream_features(
+        self,
+        filters: FeatureFilter | None = None,
+        page: FeaturePage | None = None,
+        batch_size: int = 1000,
+        options: GeometryOptions | None = None,
+    ) -> AsyncIterator[list[Row]]:
+        """
+        Читает объекты через серверный курсор и отдает их пачками
+        по batch_size в виде строк (id, feature). JSON объекта строится
+        в БД и не разбирается в Python
+        :param filters: пространственные фильтры
+        :param page: параметры страницы
+        :param batch_size: количество строк, забираемых из курсора за раз
+        :param options: параметры упрощения и точности геометрии
+        :return: AsyncIterator[list[Row]]
+        """
+        columns = (
+            self.model.id,
+            self._feature_json(options).label("feature"),
+        )
+        batches = count_conversions(
+            "json", self._stream_rows(columns, filters, page, batch_size)
+        )
+        async for rows in batches:
+            yield rows
+
+    async def stream_wkb(
+        self,
+        filters: FeatureFilter | None = None,
+        page: FeaturePage | None = None,
+        batch_size: int = 1000,
+        options: GeometryOptions | None = None,
+    ) -> AsyncIterator[list[Row]]:
+        """
+        Строки (id, wkb, properties) для потока WKB: геометрия в WKB
+        из PostGIS, properties - JSON текстом, без разбора в Python
+        :return: AsyncIterator[list[Row]]
+        """
+        columns = (
+            self.model.id,
+            type_coerce(
+                func.ST_AsBinary(self._output_geometry(options), "NDR"),
+                LargeBinary,
+            ).label("wkb"),
+            cast(self.model.properties, Text).label("properties"),
+        )
+        batches = count_conversions(
+            "wkb", self._stream_rows(columns, filters, page, batch_size)
+        )
+        async for rows in batches:
+            yield rows
+
+    async def stream_columns(
+        self,
+        filters: FeatureFilter | None = None,
+        page: FeaturePage | None = None,
+        batch_size: int = 10_000,
+        options: GeometryOptions | None = None,
+    ) -> AsyncIterator[list[Row]]:
+        """
+        Строки (id, wkb, name, type) для колоночных форматов:
+        геометрия отдается в WKB как хранится, без shapely
+        :return: AsyncIterator[list[Row]]
+        """
+        columns = (
+            self.model.id,
+            type_coerce(
+                func.ST_AsBinary(self._output_geometry(options)), LargeBinary
+            ).label("wkb"),
+            self.model.properties["name"].astext.label("name"),
+            self.model.properties["type"].astext.label("type"),
+        )
+        batches = count_conversions(
+            "columns", self._stream_rows(columns, filters, page, batch_size)
+        )
+        async for rows in batches:
+            yield rows
+
+    async def get_flatgeobuf(
+        self,
+        filters: FeatureFilter | None = None,
+        page: FeaturePage | None = None,
+        options: GeometryOptions | None = None,
+    ) -> Row:
+        """
+        FlatGeobuf с пространственным индексом (ST_AsFlatGeobuf). Индекс
+        пишется перед объектами, поэтому файл собирается в БД целиком
+        :return: Row - (content, count, last_id): байты FlatGeobuf,
+        количество объектов и id последнего по порядку страницы
+        """
+        query = select(
+            self.model.id,
+            self.model.properties["name"].astext.label("name"),
+            self.model.properties["type"].astext.label("type"),
+            self._output_geometry(options).label("geometry"),
+        ).where(*self._filter_clauses(filters))
+        rows = self._page_query(query, page).subquery("features_page")
+        descending = page is not None and page.order == "desc"
+        last_id = func.min(rows.c.id) if descending else func.max(rows.c.id)
+        result = await self.read_session.execute(
+            select(
+                func.coalesce(
+                    func.ST_AsFlatGeobuf(
+                        rows.table_valued(), True, "geometry"
+                    ),
+                    b"",
+                ).label("content"),
+                func.count().label("count"),
+                last_id.label("last_id"),
+            ).select_from(rows)
+        )
+        return result.one()
+
+    async def get_feature_json(self, ids: Sequence[int]) -> list[str]:
+        """
+        Объекты Feature (JSON из PostGIS) по списку id, по возрастанию id
+        :param ids: id объектов, отсутствующие пропускаются
+        :return: list[str]
+        """
+        if not ids:
+            return []
+        query = (
+            select(self._feature_json())
+            .where(
+                self.model.id
+                == any_(bindparam("ids", list(ids), type_=ARRAY(Integer)))
+            )
+            .order_by(self.model.id)
+        )
+        result = await self.read_session.execute(query)
+        return list(result.scalars())
+
+    async def get_nearest(
+        self,
+        lon: float,
+        lat: float,
+        k: int,
+        geometry_type: str | None = None,
+        max_distance: float | None = None,
+        with_distance: bool = False,
+        options: GeometryOptions | None = None,
+    ) -> list[str]:
+        """
+        k ближайших к точке объектов по расстоянию в метрах на сфере:
+        оператор <-> для geography идет по GiST индексу
+        idx_features_geography. Расстояние в градусах на высоких широтах
+        дает другой порядок, поэтому индекс по geometry здесь не подходит
+        :param lon: долгота точки
+        :param lat: широта точки
+        :param k: количество объектов
+        :param geometry_type: тип геометрии (POINT, LINESTRING, POLYGON)
+        :param max_distance: наибольшее расстояние в метрах
+        :param with_distance: добавить расстояние distance в properties
+        :param options: параметры упрощения и точности геометрии
+        :return: list[str] - объекты Feature в JSON по возрастанию
+        расстояния
+        """
+        point = func.ST_SetSRID(func.ST_MakePoint(lon, lat), 4326)
+        geography = cast(self.model.geometry, GEOGRAPHY)
+        point_geography = cast(point, GEOGRAPHY)
+        distance = func.ST_Distance(geography, point_geography, False)
+        clauses = []
+        if geometry_type is not None:
+            clauses.append(self.model.geometry_type == geometry_type)
+        if max_distance is not None:
+            # ST_DWithin по geography сам отбирает кандидатов по индексу
+            # idx_features_geography и верен у антимеридиана и полюсов,
+            # где охват круга в градусах не описать одним прямоугольником
+            clauses.append(
+                func.ST_DWithin(
+                    geography, point_geography, max_distance, False
+                )
+            )
+        candidates = (
+            select(self.model.id, distance.label("distance"))
+            .where(*clauses)
+            .order_by(geography.op("<->")(point_geography))
+            .limit(k)
+            .subquery("candidates")
+        )
+        extra_properties = None
+        if with_distance:
+            extra_properties = {"distance": candidates.c.distance}
+        query = (
+            select(self._feature_json(options, extra_properties))
+            .join(candidates, candidates.c.id == self.model.id)
+            .order_by(candidates.c.distance, self.model.id)
+            .limit(k)
+        )
+        result = await self.read_session.execute(query)
+        return list(result.scalars())
+
+    async def join_geometries(
+        self,
+        geometries: Sequence[tuple[int, Geometry]],
+        predicate: Literal["intersects", "contains"] = "intersects",
+    ) -> list[Row]:
+        """
+        Пространственное соединение пачки входных геометрий с хранимыми
+        объектами одним запросом: геометрии передаются массивами и
+        разворачиваются unnest, соединение по ST_Intersects/ST_Contains
+        идет через GiST индекс idx_features_geometry
+        :param geometries: пары (номер во входных данных, геометрия)
+        :param predicate: intersects - объект пересекается с геометрией,
+            contains - объект содержит геометрию
+        :return: list[Row] - (index, ids) только для геометрий, у которых
+        есть совпадения, по возрастанию index; ids по возрастанию
+        """
+        if not geometries:
+            return []
+        # MATERIALIZED: каждая геометрия разбирается из GeoJSON один раз,
+        # а не при каждой проверке пары
+        rows = (
+            func.unnest(
+                bindparam(
+                    "indexes",
+                    [index for index, _ in geometries],
+                    type_=ARRAY(Integer),
+                ),
+                bindparam(
+                    "geojsons",
+                    [geometry.model_dump_json() for _, geometry in geometries],
+                    type_=ARRAY(Text),
+                ),
+            )
+            .table_valued("index", "geojson")
+            .render_derived()
+        )
+        inputs = (
+            select(
+                rows.c.index,
+                func.ST_SetSRID(
+                    func.ST_GeomFromGeoJSON(rows.c.geojson), 4326
+                ).label("geometry"),
+            )
+            .cte("inputs")
+            .prefix_with("MATERIALIZED")
+        )
+        if predicate == "contains":
+            condition = func.ST_Contains(
+                self.model.geometry, inputs.c.geometry
+            )
+        else:
+            condition = func.ST_Intersects(
+                self.model.geometry, inputs.c.geometry
+            )
         query = (
             select(
-                GeometryType(self.model.geometry).label("type"),
-                func.count("*").label("count"),
+                inputs.c.index,
+                func.array_agg(
+                    aggregate_order_by(self.model.id, self.model.id)
+                ).label("ids"),
             )
-            .select_from(self.model)
-            .group_by(GeometryType(self.model.geometry))
+            .select_from(inputs)
+            .join(self.model, condition)
+            .group_by(inputs.c.index)
+            .order_by(inputs.c.index)
+        )
+        result = await self.read_session.execute(query)
+        return list(result.all())
+
+    async def get_clusters(self, z: int, x: int, y: int) -> list[Row]:
+        """
+        Кластеры точек тайла: точки в Web Mercator привязываются
+        ST_SnapToGrid к сетке, выровненной по тайлу, со стороной ячейки
+        CLUSTER_CELL_PIXELS пикселей, и группируются по узлу сетки
+        :return: list[Row] - (count, x, y, min_x, min_y, max_x, max_y):
+        число точек, центр масс и охват кластера в градусах
+        """
+        tile_size = 2 * WEB_MERCATOR_HALF / 2**z
+        cell = tile_size * CLUSTER_CELL_PIXELS / TILE_PIXELS
+        # Узлы сетки в центрах ячеек: ячейки не выходят за границы тайла
+        origin_x = -WEB_MERCATOR_HALF + x * tile_size + cell / 2
+        origin_y = WEB_MERCATOR_HALF - (y + 1) * tile_size + cell / 2
+        envelope = func.ST_TileEnvelope(z, x, y)
+        snapped = func.ST_SnapToGrid(
+            func.ST_Transform(self.model.geometry, 3857),
+            origin_x,
+            origin_y,
+            cell,
+            cell,
         )
-        result_execute = await self.session.execute(query)
-        features_stats = result_execute.all()
+        centroid = func.ST_Centroid(func.ST_Collect(self.model.geometry))
+        extent = func.ST_Extent(self.model.geometry)
+        query = (
+            select(
+                func.count().label("count"),
+                func.ST_X(centroid).label("x"),
+                func.ST_Y(centroid).label("y"),
+                func.ST_XMin(extent).label("min_x"),
+                func.ST_YMin(extent).label("min_y"),
+                func.ST_XMax(extent).label("max_x"),
+                func.ST_YMax(extent).label("max_y"),
+            )
+            .where(
+                self.model.geometry.op("&&")(
+                    func.ST_Transform(envelope, 4326)
+                ),
+                self.model.geometry_type == "POINT",
+            )
+            .group_by(snapped)
+        )
+        result = await self.read_session.execute(query)
+        return list(result.all())
+
+    async def get_tile(self, z: int, x: int, y: int) -> bytes:
+        """
+        Собирает векторный тайл (MVT) с отдельным слоем на каждый тип
+        геометрии. Отбор по && с охватом тайла идет через GiST индекс
+        :return: bytes
+        """
+        envelope = func.ST_TileEnvelope(z, x, y)
+        geometry = self._zoom_geometry(z, simplify=False)
+        layers = []
+        for layer, geometry_type in TILE_LAYERS.items():
+            rows = (
+                select(
+                    self.model.id,
+                    self.model.properties,
+                    func.ST_AsMVTGeom(
+                        # ST_AsMVTGeom сам упрощает геометрию до сетки
+                        # тайла, копия лишь сокращает число вершин на входе
+                        func.ST_Transform(geometry, 3857),
+                        envelope,
+                        TILE_EXTENT,
+                        TILE_BUFFER,
+                        True,
+                    ).label("geom"),
+                )
+                .where(
+                    self.model.geometry.op("&&")(
+                        func.ST_Transform(envelope, 4326)
+                    ),
+                    self.model.geometry_type == geometry_type,
+                )
+                .subquery(layer)
+            )
+            layer_mvt = select(
+                func.ST_AsMVT(
+                    rows.table_valued(), layer, TILE_EXTENT, "geom", "id"
+                )
+            ).scalar_subquery()
+            layers.append(func.coalesce(layer_mvt, b""))
+        tile = layers[0]
+        for layer_mvt in layers[1:]:
+            tile = tile.op("||")(layer_mvt)
+        result = await self.read_session.execute(select(tile))
+        return result.scalar_one()
+
+    async def get_feature_count_by_type(self) -> dict[str, int]:
+        """
+        Количество объектов по типам из счетчиков feature_type_counts,
+        без сканирования таблицы features
+        :return: dict[str, int]
+        """
+        features_stats = await self.type_counts.get_all()
         stats = dict()
         # Переделал json под пример
-        for feature in features_stats:
-            if feature.type == "POINT":
+        for geometry_type, count in features_stats.items():
+            if geometry_type == "POINT":
                 _type = "points"
-            elif feature.type == "LINESTRING":
+            elif geometry_type == "LINESTRING":
                 _type = "lines"
             else:
                 _type = "polygons"
-            stats[_type] = feature.count
+            stats[_type] = stats.get(_type, 0) + count
         return stats
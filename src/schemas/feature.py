@@ -1,12 +1,75 @@
-from typing import Any, Literal, Union
+import json
 
-from pydantic import BaseModel
+from typing import Any, Literal, Union, cast
+
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+Position = list[float]
+
+
+def is_position(value: Any) -> bool:
+    return (
+        isinstance(value, list)
+        and len(value) >= 2
+        and not any(isinstance(item, list) for item in value)
+    )
 
 
 class Geometry(BaseModel):
     type: Literal["Point", "LineString", "Polygon"]
     coordinates: Union[list[float], list[list[float]], list[list[list[float]]]]
 
+    @model_validator(mode="after")
+    def check_coordinates(self) -> "Geometry":
+        """
+        Вложенность координат должна соответствовать типу, линии и
+        кольца - содержать минимальное по GeoJSON число точек, а кольца -
+        быть замкнутыми: такие геометрии отклоняет PostGIS, и ошибка
+        возвращается до записи в БД
+        """
+        coordinates: Any = self.coordinates
+        if self.type == "Point":
+            valid = is_position(coordinates)
+        elif self.type == "LineString":
+            valid = len(coordinates) >= 2 and all(
+                map(is_position, coordinates)
+            )
+        else:
+            valid = bool(coordinates) and all(
+                isinstance(ring, list)
+                and len(ring) >= 4
+                and all(map(is_position, ring))
+                and ring[0] == ring[-1]
+                for ring in coordinates
+            )
+        if not valid:
+            raise ValueError(f"Некорректные координаты для типа {self.type}")
+        return self
+
+    @property
+    def positions(self) -> list[Position]:
+        """
+        Все точки геометрии, для полигона - точки всех колец
+        :return: list[Position]
+        """
+        if self.type == "Point":
+            return [cast(Position, self.coordinates)]
+        if self.type == "LineString":
+            return cast(list[Position], self.coordinates)
+        rings = cast(list[list[Position]], self.coordinates)
+        return [point for ring in rings for point in ring]
+
+    @property
+    def bounds(self) -> tuple[float, float, float, float]:
+        """
+        Охват геометрии (minx, miny, maxx, maxy) без построения shapely
+        :return: tuple[float, float, float, float]
+        """
+        points = self.positions
+        xs = [point[0] for point in points]
+        ys = [point[1] for point in points]
+        return min(xs), min(ys), max(xs), max(ys)
+
 
 class FeatureProperties(BaseModel):
     name: str
@@ -28,6 +91,123 @@ class FeaturesResponse(BaseModel):
     properties: FeaturePropertiesID
 
 
+class Link(BaseModel):
+    href: str
+    rel: str
+    type: str = "application/geo+json"
+
+
 class FeatureCollection(BaseModel):
     type: str = "FeatureCollection"
     features: list[FeaturesResponse]
+    links: list[Link] | None = None
+
+
+class NearestFeatureProperties(FeaturePropertiesID):
+    # Расстояние до точки в метрах, если запрошено
+    distance: float | None = None
+
+
+class NearestFeature(BaseModel):
+    type: str = "Feature"
+    geometry: dict[str, Any]
+    properties: NearestFeatureProperties
+
+
+class NearestFeatureCollection(BaseModel):
+    type: str = "FeatureCollection"
+    features: list[NearestFeature]
+
+
+class FeatureFilter(BaseModel):
+    bbox: tuple[float, float, float, float] | None = None
+    intersects: Geometry | None = None
+    within: Geometry | None = None
+
+    @field_validator("bbox", mode="before")
+    @classmethod
+    def split_bbox(cls, value: Any) -> Any:
+        if isinstance(value, str):
+            return value.split(",")
+        return value
+
+    @field_validator("bbox")
+    @classmethod
+    def check_bbox(
+        cls, value: tuple[float, float, float, float] | None
+    ) -> tuple[float, float, float, float] | None:
+        if value:
+            min_x, min_y, max_x, max_y = value
+            if min_x > max_x or min_y > max_y:
+                raise ValueError("bbox задается как minx,miny,maxx,maxy")
+        return value
+
+    @field_validator("intersects", "within", mode="before")
+    @classmethod
+    def parse_geometry(cls, value: Any) -> Any:
+        if isinstance(value, str):
+            return json.loads(value)
+        return value
+
+
+class FeatureDeleteRequest(FeatureFilter):
+    ids: list[int] | None = None
+    properties: dict[str, Any] | None = None
+
+    @model_validator(mode="after")
+    def check_criteria(self) -> "FeatureDeleteRequest":
+        criteria = (self.ids, self.bbox, self.intersects, self.within)
+        if all(value is None for value in criteria) and not self.properties:
+            raise ValueError(
+                "Нужен хотя бы один критерий: ids, bbox, intersects, "
+                "within или properties"
+            )
+        return self
+
+
+class BulkDeleteResult(BaseModel):
+    ids: list[int]
+    missing: list[int] = []
+
+
+class FeatureChanges(BaseModel):
+    cursor: int
+    has_more: bool
+    deleted: list[int]
+    upserted: list[FeaturesResponse]
+
+
+class FeaturePage(BaseModel):
+    limit: int | None = Field(default=None, ge=1)
+    after_id: int | None = None
+    order: Literal["asc", "desc"] = "asc"
+
+
+class GeometryOptions(BaseModel):
+    # Масштаб карты: геометрия упрощается до размера пикселя на нем
+    zoom: int | None = Field(default=None, ge=0, le=24)
+    # Явный допуск упрощения в градусах, важнее zoom
+    tolerance: float | None = Field(default=None, gt=0)
+    # Количество знаков после запятой в координатах
+    precision: int | None = Field(default=None, ge=0, le=15)
+
+
+class BulkError(BaseModel):
+    index: int | None = None
+    batch: int | None = None
+    detail: str
+
+
+class BulkInsertResult(BaseModel):
+    ids: list[int | None]
+    errors: list[BulkError]
+
+
+class SpatialJoinMatch(BaseModel):
+    index: int
+    ids: list[int]
+
+
+class SpatialJoinResult(BaseModel):
+    results: list[SpatialJoinMatch]
+    errors: list[BulkError]
@@ -0,0 +1,31 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class PoolStatus(BaseModel):
+    size: int
+    checked_out: int
+    idle: int
+    overflow: int
+    max_overflow: int
+    waiting: int
+    checkouts: int
+    timeouts: int
+    wait_avg_ms: float
+    wait_max_ms: float
+
+
+class ReplicaStatus(BaseModel):
+    name: str
+    available: bool
+    lag_seconds: float | None
+    pool: PoolStatus
+
+
+class DBHealth(BaseModel):
+    status: Literal["ok", "unavailable"]
+    latency_ms: float | None
+    pgbouncer: bool
+    pool: PoolStatus
+    replicas: list[ReplicaStatus] = []
@@ -0,0 +1,61 @@
+"""
+Точка входа сервера: python -m src.server
+
+В MODE=PROD запускается WORKERS процессов uvicorn с uvloop и httptools
+(если установлены), без отслеживания файлов; при остановке (SIGTERM)
+сервер перестает принимать соединения и до GRACEFUL_SHUTDOWN_TIMEOUT
+секунд дожидается запросов в обработке. В остальных режимах - один
+процесс с перезапуском при изменении кода.
+
+У каждого воркера свой реестр метрик: при нескольких воркерах они
+складываются через каталог METRICS_DIR (временный, если не задан).
+"""
+
+import os
+import tempfile
+
+from importlib.util import find_spec
+
+import uvicorn
+
+from src.config import settings
+from src.metrics.multiprocess import clear_states
+
+
+def main() -> None:
+    if settings.MODE != "PROD":
+        uvicorn.run(
+            "src.main:app",
+            host=settings.SERVER_HOST,
+            port=settings.SERVER_PORT,
+            reload=True,
+        )
+        return
+
+    if settings.workers > 1 or settings.METRICS_DIR:
+        if not settings.METRICS_DIR:
+            # Воркеры читают настройки заново и получат каталог из окружения
+            settings.METRICS_DIR = tempfile.mkdtemp(prefix="metrics-")
+            os.environ["METRICS_DIR"] = settings.METRICS_DIR
+        clear_states(settings.METRICS_DIR)
+
+    loop = "uvloop" if find_spec("uvloop") else "asyncio"
+    http = "httptools" if find_spec("httptools") else "h11"
+    uvicorn.run(
+        "src.main:app",
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=settings.workers,
+        loop=loop,
+        http=http,
+        timeout_keep_alive=settings.KEEP_ALIVE_TIMEOUT,
+        timeout_graceful_shutdown=settings.GRACEFUL_SHUTDOWN_TIMEOUT,
+        # За nginx: адрес клиента и схема из X-Forwarded-*
+        proxy_headers=True,
+        forwarded_allow_ips="*",
+        access_log=False,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,11 @@ import pytest
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy import text
 
-from src.api.dependencies import get_db
+from src.api.dependencies import (
+    get_db,
+    get_primary_db,
+    get_session_factory,
+)
 from src.config import settings
 from src.connectors.database_init import (
     BaseORM,
@@ -21,10 +25,10 @@ from src.schemas.feature import FeatureRequest
 
 
 class DataDB:
-    point_data: None
-    line_data: None
-    polygon_data: None
-    example_collection_data: None
+    point_data: dict
+    line_data: dict
+    polygon_data: dict
+    example_collection_data: dict
 
 
 data = DataDB()
@@ -75,6 +79,10 @@ async def ac() -> AsyncGenerator[AsyncClient, None]:
 
 
 app.dependency_overrides[get_db] = get_db_null_pool
+app.dependency_overrides[get_primary_db] = get_db_null_pool
+app.dependency_overrides[get_session_factory] = (
+    lambda: async_session_maker_null_pool
+)
 
 
 @pytest.fixture(scope="session", autouse=True)
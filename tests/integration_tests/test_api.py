@@ -1,5 +1,19 @@
+import io
+import json
+import os
+import struct
+
 import pytest
 
+from shapely import wkb
+from sqlalchemy import NullPool, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.api.dependencies import get_db
+from src.config import settings
+from src.connectors.database_init import async_session_maker_null_pool
+from src.main import app
+from src.managers.db_manager import DBManager
 from tests.conftest import data
 
 
@@ -10,6 +24,79 @@ async def test_get_feature_collection(ac) -> None:
     assert response_data == data.example_collection_data
 
 
+async def test_get_feature_collection_stream(ac) -> None:
+    response = await ac.get(url="/features", params={"stream": True})
+    assert response.status_code == 200
+    assert response.json() == data.example_collection_data
+
+
+async def test_get_feature_collection_ndjson(ac) -> None:
+    response = await ac.get(url="/features", params={"format": "ndjson"})
+    assert response.status_code == 200
+    features = [json.loads(line) for line in response.text.splitlines()]
+    assert features == data.example_collection_data["features"]
+
+
+@pytest.mark.parametrize(
+    "params, ids",
+    [
+        ({"bbox": "38.97,45.03,38.98,45.04"}, [1, 2, 3]),
+        ({"bbox": "38.9755,45.0345,38.9765,45.0355"}, [1, 2, 3]),
+        ({"bbox": "0,0,1,1"}, []),
+        (
+            {
+                "intersects": '{"type": "Point", '
+                '"coordinates": [38.98, 45.038]}'
+            },
+            [2],
+        ),
+        (
+            {
+                "within": '{"type": "Polygon", "coordinates": '
+                "[[[38.97, 45.03], [38.99, 45.03], [38.99, 45.04], "
+                "[38.97, 45.04], [38.97, 45.03]]]}"
+            },
+            [1, 2, 3],
+        ),
+    ],
+)
+async def test_get_feature_collection_filter(ac, params, ids) -> None:
+    response = await ac.get(url="/features", params=params)
+    assert response.status_code == 200
+    features = response.json()["features"]
+    assert [feature["properties"]["id"] for feature in features] == ids
+
+
+@pytest.mark.parametrize(
+    "params, pages",
+    [
+        ({"limit": 2}, [[1, 2], [3]]),
+        ({"limit": 3}, [[1, 2, 3], []]),
+        ({"limit": 2, "order": "desc"}, [[3, 2], [1]]),
+        ({"limit": 1, "after_id": 1}, [[2], [3], []]),
+    ],
+)
+async def test_get_feature_collection_pages(ac, params, pages) -> None:
+    response = await ac.get(url="/features", params=params)
+    links, page = [], None
+    for page in pages:
+        assert response.status_code == 200
+        response_data = response.json()
+        features = response_data["features"]
+        assert [feature["properties"]["id"] for feature in features] == page
+        links = response_data.get("links", [])
+        if not links:
+            break
+        response = await ac.get(url=links[0]["href"])
+    assert not links and page == pages[-1]
+
+
+@pytest.mark.parametrize("bbox", ["1,2,3", "3,0,1,1", "a,b,c,d"])
+async def test_get_feature_collection_bad_bbox(ac, bbox) -> None:
+    response = await ac.get(url="/features", params={"bbox": bbox})
+    assert response.status_code == 422
+
+
 @pytest.mark.parametrize(
     "json_data, status_code, _id",
     [
@@ -47,3 +134,708 @@ async def test_get_stats(ac) -> None:
     assert response.status_code == 200
     response_data = response.json()
     assert response_data == stats
+
+
+async def test_get_tile(ac) -> None:
+    response = await ac.get(url="/tiles/0/0/0.mvt")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == (
+        "application/vnd.mapbox-vector-tile"
+    )
+    tile = response.content
+    assert tile
+
+    response = await ac.get(url="/tiles/10/0/0.mvt")
+    assert response.status_code == 200
+    assert response.content == b""
+
+    response = await ac.get(url="/tiles/1/2/0.mvt")
+    assert response.status_code == 404
+
+    response = await ac.post(url="/features", json=data.point_data)
+    feature_id = response.json()["id"]
+    response = await ac.get(url="/tiles/0/0/0.mvt")
+    assert response.content != tile
+
+    await ac.delete(url=f"/features/{feature_id}")
+    response = await ac.get(url="/tiles/0/0/0.mvt")
+    assert response.content == tile
+
+
+@pytest.mark.parametrize("content_type", ["application/x-ndjson", None])
+async def test_post_features_bulk(ac, content_type) -> None:
+    features = [data.point_data, {"geometry": {}}, data.polygon_data]
+    if content_type:
+        body = "\n".join(json.dumps(feature) for feature in features)
+        headers = {"content-type": content_type}
+    else:
+        body = json.dumps({"type": "FeatureCollection", "features": features})
+        headers = {"content-type": "application/geo+json"}
+    response = await ac.post(
+        url="/features/bulk",
+        content=body.encode(),
+        headers=headers,
+        params={"batch_size": 1},
+    )
+    assert response.status_code == 200
+    response_data = response.json()
+    ids = response_data["ids"]
+    assert len(ids) == 3 and ids[1] is None
+    assert ids[0] < ids[2]
+    assert [error["index"] for error in response_data["errors"]] == [1]
+
+    for feature_id in (ids[0], ids[2]):
+        response = await ac.delete(url=f"/features/{feature_id}")
+        assert response.status_code == 204
+
+
+async def test_post_features_bulk_rejected_row(ac) -> None:
+    # Проходит валидацию схемы, но jsonb не допускает символ \u0000
+    rejected = {
+        **data.point_data,
+        "properties": {"name": "Нулевой\u0000символ", "type": "Point"},
+    }
+    features = [data.point_data, rejected, data.line_data]
+    response = await ac.get(url="/features/changes")
+    cursor = response.json()["cursor"]
+    response = await ac.post(
+        url="/features/bulk",
+        content="\n".join(json.dumps(feature) for feature in features),
+        headers={"content-type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    response_data = response.json()
+    ids = response_data["ids"]
+    assert ids[0] is not None and ids[1] is None and ids[2] is not None
+    assert [error["index"] for error in response_data["errors"]] == [1]
+
+    # Счетчики и журнал учитывают только принятые объекты
+    response = await ac.get(url="/stats")
+    assert response.json() == {"polygons": 1, "lines": 2, "points": 2}
+    response = await ac.get(url="/features/changes", params={"since": cursor})
+    assert [
+        feature["properties"]["id"] for feature in response.json()["upserted"]
+    ] == [ids[0], ids[2]]
+
+    response = await ac.post(
+        url="/features/delete", json={"ids": [ids[0], ids[2]]}
+    )
+    assert response.json()["missing"] == []
+
+
+async def test_post_features_bulk_non_objects(ac) -> None:
+    collection = {
+        "type": "FeatureCollection",
+        "features": [data.point_data, None, 1, "x", data.line_data],
+    }
+    response = await ac.post(url="/features/bulk", json=collection)
+    assert response.status_code == 200
+    response_data = response.json()
+    ids = response_data["ids"]
+    assert len(ids) == 5 and ids[1:4] == [None, None, None]
+    assert [error["index"] for error in response_data["errors"]] == [1, 2, 3]
+
+    response = await ac.post(
+        url="/features/delete", json={"ids": [ids[0], ids[4]]}
+    )
+    assert response.json()["missing"] == []
+
+
+async def test_delete_features_bulk(ac) -> None:
+    far_point = {
+        "geometry": {"type": "Point", "coordinates": [10.0, 10.0]},
+        "properties": {"name": "Удаляемая точка", "type": "Point"},
+    }
+    body = "\n".join(
+        json.dumps(feature)
+        for feature in (data.point_data, data.line_data, far_point)
+    )
+    response = await ac.post(
+        url="/features/bulk",
+        content=body.encode(),
+        headers={"content-type": "application/x-ndjson"},
+    )
+    point_id, line_id, far_id = response.json()["ids"]
+
+    response = await ac.post(url="/features/delete", json={})
+    assert response.status_code == 422
+
+    response = await ac.post(
+        url="/features/delete", json={"bbox": [9.0, 9.0, 11.0, 11.0]}
+    )
+    assert response.status_code == 200
+    assert response.json() == {"ids": [far_id], "missing": []}
+
+    response = await ac.post(
+        url="/features/delete",
+        json={"ids": [point_id, line_id, far_id]},
+    )
+    assert response.status_code == 200
+    assert response.json() == {"ids": [point_id, line_id], "missing": [far_id]}
+
+
+async def test_get_feature_changes(ac) -> None:
+    response = await ac.get(url="/features/changes")
+    assert response.status_code == 200
+    response_data = response.json()
+    assert not response_data["has_more"]
+    cursor = response_data["cursor"]
+    upserted = response_data["upserted"]
+    assert [feature["properties"]["id"] for feature in upserted] == [1, 2, 3]
+
+    response = await ac.post(url="/features", json=data.point_data)
+    feature_id = response.json()["id"]
+    response = await ac.get(url="/features/changes", params={"since": cursor})
+    response_data = response.json()
+    assert response_data["deleted"] == []
+    assert [
+        feature["properties"]["id"] for feature in response_data["upserted"]
+    ] == [feature_id]
+
+    await ac.delete(url=f"/features/{feature_id}")
+    response = await ac.get(
+        url="/features/changes", params={"since": cursor, "limit": 1}
+    )
+    response_data = response.json()
+    assert response_data["has_more"]
+    assert response_data["upserted"] == []
+
+    response = await ac.get(url="/features/changes", params={"since": cursor})
+    response_data = response.json()
+    assert response_data == {
+        "cursor": response_data["cursor"],
+        "has_more": False,
+        "deleted": [feature_id],
+        "upserted": [],
+    }
+    assert response_data["cursor"] > cursor
+
+
+async def test_stats_follow_writes(ac) -> None:
+    stats = {"polygons": 1, "lines": 1, "points": 1}
+    body = "\n".join(
+        json.dumps(feature) for feature in (data.point_data, data.point_data)
+    )
+    response = await ac.post(
+        url="/features/bulk",
+        content=body.encode(),
+        headers={"content-type": "application/x-ndjson"},
+    )
+    ids = response.json()["ids"]
+    response = await ac.get(url="/stats")
+    assert response.json() == {**stats, "points": 3}
+
+    response = await ac.post(url="/features/delete", json={"ids": ids})
+    assert response.status_code == 200
+    response = await ac.get(url="/stats")
+    assert response.json() == stats
+
+
+async def test_stats_etag_follows_rebuild(ac) -> None:
+    response = await ac.get(url="/stats")
+    etag = response.headers["etag"]
+    # Счетчики разошлись с данными, затем пересчитаны командой
+    # reconcile_type_counts: журнал изменений при этом не меняется
+    async with async_session_maker_null_pool() as session:
+        await session.execute(
+            text("UPDATE feature_type_counts SET count = count + 1")
+        )
+        await session.commit()
+    response = await ac.get(url="/stats", headers={"if-none-match": etag})
+    assert response.status_code == 200
+    drifted_etag = response.headers["etag"]
+    assert drifted_etag != etag
+
+    async with DBManager(
+        session_factories=async_session_maker_null_pool
+    ) as db:
+        await db.feature.type_counts.rebuild()
+        await db.commit()
+    response = await ac.get(
+        url="/stats", headers={"if-none-match": drifted_etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] == etag
+
+
+@pytest.mark.parametrize("url", ["/features", "/features?limit=1", "/stats"])
+async def test_etag(ac, url) -> None:
+    response = await ac.get(url=url)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    response = await ac.get(url=url, headers={"if-none-match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+    response = await ac.get(url=url, headers={"if-none-match": f"W/{etag}"})
+    assert response.status_code == 304
+
+    response = await ac.post(url="/features", json=data.point_data)
+    feature_id = response.json()["id"]
+    response = await ac.get(url=url, headers={"if-none-match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    await ac.delete(url=f"/features/{feature_id}")
+
+
+async def test_get_features_compressed(ac) -> None:
+    body = "\n".join(json.dumps(data.polygon_data) for _ in range(50))
+    response = await ac.post(
+        url="/features/bulk",
+        content=body.encode(),
+        headers={"content-type": "application/x-ndjson"},
+    )
+    ids = response.json()["ids"]
+
+    for params in ({}, {"format": "ndjson"}):
+        response = await ac.get(
+            url="/features",
+            params=params,
+            headers={"accept-encoding": "gzip"},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "accept-encoding" in response.headers["vary"].lower()
+        assert response.headers["etag"].endswith('-gzip"')
+        assert response.text
+
+    response = await ac.get(
+        url="/features", headers={"accept-encoding": "identity"}
+    )
+    assert "content-encoding" not in response.headers
+    assert len(response.json()["features"]) == 53
+
+    await ac.post(url="/features/delete", json={"ids": ids})
+
+
+async def test_get_features_wkb(ac) -> None:
+    response = await ac.get(url="/features", params={"format": "wkb"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-wkb-stream"
+    content = response.content
+    features = []
+    offset = 0
+    while offset < len(content):
+        feature_id, geometry_size = struct.unpack_from(">qi", content, offset)
+        offset += 12
+        geometry = wkb.loads(content[offset : offset + geometry_size])
+        offset += geometry_size
+        (properties_size,) = struct.unpack_from(">i", content, offset)
+        offset += 4
+        properties = json.loads(content[offset : offset + properties_size])
+        offset += properties_size
+        features.append((feature_id, geometry.geom_type, properties))
+    expected = data.example_collection_data["features"]
+    assert [feature[0] for feature in features] == [
+        feature["properties"]["id"] for feature in expected
+    ]
+    assert [feature[1] for feature in features] == [
+        feature["geometry"]["type"] for feature in expected
+    ]
+
+
+@pytest.mark.parametrize(
+    "params, headers",
+    [({"format": "fgb"}, {}), ({}, {"accept": "application/flatgeobuf"})],
+)
+async def test_get_features_flatgeobuf(ac, params, headers) -> None:
+    response = await ac.get(url="/features", params=params, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/flatgeobuf"
+    assert response.content[:3] == b"fgb"
+
+
+async def test_get_features_geoparquet(ac) -> None:
+    parquet = pytest.importorskip("pyarrow.parquet")
+    response = await ac.get(url="/features", params={"format": "parquet"})
+    assert response.status_code == 200
+    table = parquet.read_table(io.BytesIO(response.content))
+    assert table.column_names == ["id", "name", "type", "geometry"]
+    assert table.num_rows == len(data.example_collection_data["features"])
+    assert b"geo" in table.schema.metadata
+
+
+async def test_get_features_simplified(ac) -> None:
+    response = await ac.get(url="/features", params={"precision": 2})
+    assert response.status_code == 200
+    for feature in response.json()["features"]:
+        coordinates = json.dumps(feature["geometry"]["coordinates"])
+        assert all(
+            len(number.split(".")[-1]) <= 2
+            for number in coordinates.replace("[", "")
+            .replace("]", "")
+            .split(", ")
+            if "." in number
+        )
+
+    full = await ac.get(url="/features")
+    for zoom in (0, 10, 16):
+        response = await ac.get(url="/features", params={"zoom": zoom})
+        assert response.status_code == 200
+        for simplified, original in zip(
+            response.json()["features"], full.json()["features"]
+        ):
+            assert simplified["properties"] == original["properties"]
+            assert len(json.dumps(simplified["geometry"])) <= len(
+                json.dumps(original["geometry"])
+            )
+
+    response = await ac.get(url="/features", params={"tolerance": 0})
+    assert response.status_code == 422
+
+
+async def test_get_db_health(ac) -> None:
+    response = await ac.get("/health/db")
+    assert response.status_code == 200
+    health = response.json()
+    assert health["status"] == "ok"
+    assert health["latency_ms"] >= 0
+    pool = health["pool"]
+    assert pool["checkouts"] >= 1
+    assert pool["checked_out"] + pool["idle"] >= 1
+
+
+async def test_get_metrics(ac) -> None:
+    await ac.get("/features", params={"limit": 1})
+    response = await ac.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert (
+        'http_requests_total{method="GET",route="/features",status="200"}'
+        in body
+    )
+    assert 'db_query_duration_seconds_count{route="/features"}' in body
+    assert 'feature_conversions_total{format="json"}' in body
+
+
+async def test_get_metrics_workers(ac, tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "METRICS_DIR", str(tmp_path))
+    # Состояние другого воркера
+    other = {"http_requests_total": [[["GET", "/stats", "200"], 1000]]}
+    (tmp_path / "1.json").write_text(json.dumps(other))
+    await ac.get("/stats")
+    response = await ac.get("/metrics")
+    assert response.status_code == 200
+    series = 'http_requests_total{method="GET",route="/stats",status="200"}'
+    (line,) = [
+        line for line in response.text.splitlines() if line.startswith(series)
+    ]
+    assert float(line.split()[-1]) > 1000
+    assert (tmp_path / f"{os.getpid()}.json").exists()
+
+
+async def test_consistency_token(ac) -> None:
+    response = await ac.post("/features", json=data.point_data)
+    assert response.status_code == 201
+    feature_id = response.json()["id"]
+    token = int(response.headers["x-consistency-token"])
+
+    response = await ac.get(
+        "/features/changes",
+        params={"since": token - 1},
+        headers={"X-Consistency-Token": str(token)},
+    )
+    assert response.status_code == 200
+    assert response.json()["cursor"] == token
+
+    response = await ac.get(
+        "/features", headers={"X-Consistency-Token": "не число"}
+    )
+    assert response.status_code == 422
+
+    response = await ac.delete(f"/features/{feature_id}")
+    assert int(response.headers["x-consistency-token"]) > token
+
+
+@pytest.mark.parametrize(
+    "params, ids",
+    [
+        ({"max_distance": 1000}, [2, 3]),
+        ({"type": "Point", "k": 1}, [1]),
+        ({"type": "Point", "max_distance": 1000}, []),
+    ],
+)
+async def test_get_nearest_features(ac, params, ids) -> None:
+    # В 0.01° к северу от точки: линия ~840 м, полигон ~890 м, точка ~1112 м
+    response = await ac.get(
+        "/features/nearest",
+        params={"lon": 38.976, "lat": 45.045, "distance": True, **params},
+    )
+    assert response.status_code == 200
+    features = response.json()["features"]
+    assert [feature["properties"]["id"] for feature in features] == ids
+    distances = [feature["properties"]["distance"] for feature in features]
+    assert distances == sorted(distances)
+    if ids == [1]:
+        assert distances[0] == pytest.approx(1112, abs=1)
+
+
+async def test_get_nearest_features_high_latitude(ac) -> None:
+    # На 80° с.ш. градус долготы короче градуса широты почти в 6 раз:
+    # точки к северу ближе в градусах, точка к востоку - в метрах.
+    # Северных точек больше, чем кандидатов с запасом по <-> в градусах
+    north = [
+        {
+            "geometry": {"type": "Point", "coordinates": [0, 80.5 + i / 10]},
+            "properties": {"name": "Север", "type": "Point"},
+        }
+        for i in range(5)
+    ]
+    east = {
+        "geometry": {"type": "Point", "coordinates": [2, 80]},
+        "properties": {"name": "Восток", "type": "Point"},
+    }
+    response = await ac.post(url="/features/bulk", json=[*north, east])
+    ids = response.json()["ids"]
+
+    response = await ac.get(
+        "/features/nearest",
+        params={"lon": 0, "lat": 80, "k": 1, "distance": True},
+    )
+    assert response.status_code == 200
+    (feature,) = response.json()["features"]
+    assert feature["properties"]["id"] == ids[-1]
+    assert feature["properties"]["distance"] == pytest.approx(38_616, abs=1)
+
+    await ac.post(url="/features/delete", json={"ids": ids})
+
+
+async def test_get_nearest_features_antimeridian(ac) -> None:
+    # Объект по другую сторону антимеридиана: 0.02° по экватору, ~2224 м
+    feature = {
+        "geometry": {"type": "Point", "coordinates": [-179.99, 0]},
+        "properties": {"name": "Антимеридиан", "type": "Point"},
+    }
+    response = await ac.post(url="/features", json=feature)
+    feature_id = response.json()["id"]
+
+    response = await ac.get(
+        "/features/nearest",
+        params={
+            "lon": 179.99,
+            "lat": 0,
+            "max_distance": 5000,
+            "distance": True,
+        },
+    )
+    assert response.status_code == 200
+    (nearest,) = response.json()["features"]
+    assert nearest["properties"]["id"] == feature_id
+    assert nearest["properties"]["distance"] == pytest.approx(2224, abs=1)
+
+    await ac.delete(url=f"/features/{feature_id}")
+
+
+@pytest.mark.parametrize(
+    "predicate, ids",
+    [
+        ("intersects", [[1, 2, 3], [3], [], [1, 2, 3]]),
+        ("contains", [[1, 2, 3], [3], [], [3]]),
+    ],
+)
+async def test_join_features(ac, predicate, ids) -> None:
+    polygon = data.polygon_data["geometry"]
+    body = [
+        {"type": "Point", "coordinates": [38.976, 45.035]},
+        {"type": "Point", "coordinates": [38.978, 45.034]},
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [0, 0]},
+        },
+        {"type": "Bad"},
+        polygon,
+    ]
+    response = await ac.post(
+        "/features/join",
+        params={"predicate": predicate, "batch_size": 2},
+        json=body,
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert [match["index"] for match in result["results"]] == [0, 1, 2, 4]
+    assert [match["ids"] for match in result["results"]] == ids
+    assert [error["index"] for error in result["errors"]] == [3]
+
+
+async def test_join_features_rejected_batch(ac) -> None:
+    # Чтение без таблицы features в search_path: БД отклоняет каждую
+    # пачку, ошибка записывается для каждой геометрии пачки
+    broken_engine = create_async_engine(
+        settings.db_url,
+        poolclass=NullPool,
+        connect_args={"server_settings": {"search_path": "missing"}},
+    )
+
+    async def get_db_broken_replica():
+        async with DBManager(
+            session_factories=async_session_maker_null_pool,
+            read_session_factories=async_sessionmaker(broken_engine),
+        ) as db:
+            yield db
+
+    point = {"type": "Point", "coordinates": [38.976, 45.035]}
+    get_db_override = app.dependency_overrides[get_db]
+    app.dependency_overrides[get_db] = get_db_broken_replica
+    try:
+        response = await ac.post(
+            "/features/join",
+            params={"batch_size": 2},
+            json=[point, {"type": "Bad"}, point, point],
+        )
+    finally:
+        app.dependency_overrides[get_db] = get_db_override
+        await broken_engine.dispose()
+    assert response.status_code == 200
+    result = response.json()
+    assert result["results"] == []
+    assert [
+        (error["index"], error["batch"]) for error in result["errors"]
+    ] == [(1, None), (0, 0), (2, 0), (3, 1)]
+
+
+async def test_get_tile_clusters(ac) -> None:
+    response = await ac.get(url="/tiles/0/0/0/clusters")
+    assert response.status_code == 200
+    (cluster,) = response.json()["features"]
+    assert cluster["properties"] == {"count": 1}
+    assert cluster["geometry"]["coordinates"] == [38.976, 45.035]
+
+    # Запись сбрасывает закэшированные кластеры в своем охвате
+    response = await ac.post("/features", json=data.point_data)
+    feature_id = response.json()["id"]
+    response = await ac.get(url="/tiles/0/0/0/clusters")
+    (cluster,) = response.json()["features"]
+    assert cluster["properties"] == {"count": 2}
+    assert cluster["bbox"] == [38.976, 45.035, 38.976, 45.035]
+    await ac.delete(url=f"/features/{feature_id}")
+
+    response = await ac.get(url="/tiles/10/0/0/clusters")
+    assert response.json()["features"] == []
+
+    response = await ac.get(url="/tiles/1/2/0/clusters")
+    assert response.status_code == 404
+
+
+async def test_get_tile_lagging_replica(ac) -> None:
+    # Реплика, отстающая от основной БД: снимок таблицы features в
+    # отдельной схеме, которая стоит первой в search_path
+    async with async_session_maker_null_pool() as session:
+        await session.execute(text("CREATE SCHEMA lagging"))
+        await session.execute(
+            text("CREATE TABLE lagging.features AS SELECT * FROM features")
+        )
+        await session.commit()
+    replica_engine = create_async_engine(
+        settings.db_url,
+        poolclass=NullPool,
+        connect_args={"server_settings": {"search_path": "lagging,public"}},
+    )
+    replica_session_maker = async_sessionmaker(replica_engine)
+
+    async def get_db_lagging_replica():
+        async with DBManager(
+            session_factories=async_session_maker_null_pool,
+            read_session_factories=replica_session_maker,
+        ) as db:
+            yield db
+
+    get_db_override = app.dependency_overrides[get_db]
+    app.dependency_overrides[get_db] = get_db_lagging_replica
+    try:
+        response = await ac.get(url="/tiles/0/0/0.mvt")
+        tile = response.content
+        response = await ac.get(url="/tiles/0/0/0/clusters")
+        assert response.json()["features"][0]["properties"] == {"count": 1}
+
+        # Запись сбрасывает кэш, а реплика ее еще не получила: тайлы
+        # должны собираться по основной БД
+        response = await ac.post("/features", json=data.point_data)
+        feature_id = response.json()["id"]
+        response = await ac.get(url="/tiles/0/0/0.mvt")
+        assert response.content != tile
+        response = await ac.get(url="/tiles/0/0/0/clusters")
+        assert response.json()["features"][0]["properties"] == {"count": 2}
+        await ac.delete(url=f"/features/{feature_id}")
+    finally:
+        app.dependency_overrides[get_db] = get_db_override
+        await replica_engine.dispose()
+        async with async_session_maker_null_pool() as session:
+            await session.execute(text("DROP SCHEMA lagging CASCADE"))
+            await session.commit()
+
+
+@pytest.mark.parametrize(
+    "geometry",
+    [
+        {"type": "LineString", "coordinates": []},
+        {"type": "Polygon", "coordinates": [[]]},
+        {"type": "Polygon", "coordinates": []},
+        {"type": "Point", "coordinates": [[38.976, 45.035]]},
+    ],
+)
+async def test_post_features_empty_geometry(ac, geometry) -> None:
+    feature = {**data.point_data, "geometry": geometry}
+    response = await ac.post(url="/features", json=feature)
+    assert response.status_code == 422
+
+    response = await ac.post(
+        url="/features/bulk",
+        content=json.dumps(feature) + "\n",
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert result["ids"] == [None]
+    assert [error["index"] for error in result["errors"]] == [0]
+
+
+async def test_post_features_open_ring(ac) -> None:
+    # Незамкнутое кольцо отклоняет PostGIS: ошибка до запроса к БД
+    open_ring = {
+        "type": "Polygon",
+        "coordinates": [[[0, 0], [1, 0], [1, 1], [0, 1]]],
+    }
+    feature = {**data.polygon_data, "geometry": open_ring}
+    response = await ac.post(url="/features", json=feature)
+    assert response.status_code == 422
+
+    for param in ("intersects", "within"):
+        response = await ac.get(
+            url="/features", params={param: json.dumps(open_ring)}
+        )
+        assert response.status_code == 422
+
+
+async def test_post_feature_rejected_by_database(ac) -> None:
+    # Проходит валидацию схемы, но jsonb не допускает символ \u0000
+    feature = {
+        **data.point_data,
+        "properties": {"name": "Нулевой\u0000символ", "type": "Point"},
+    }
+    response = await ac.post(url="/features", json=feature)
+    assert response.status_code == 422
+    assert response.json()["detail"].startswith("Объект не добавлен")
+
+
+async def test_delete_empty_geometry(ac) -> None:
+    # Пустая геометрия могла попасть в таблицу в обход API: охват NULL
+    async with async_session_maker_null_pool() as session:
+        result = await session.execute(
+            text(
+                "INSERT INTO features (geometry, properties) VALUES "
+                "('SRID=4326;LINESTRING EMPTY', "
+                """'{"name": "Пустая", "type": "LineString"}'), """
+                "('SRID=4326;POINT EMPTY', "
+                """'{"name": "Пустая", "type": "Point"}') RETURNING id"""
+            )
+        )
+        first_id, second_id = result.scalars().all()
+        await session.commit()
+
+    response = await ac.delete(url=f"/features/{first_id}")
+    assert response.status_code == 204
+    response = await ac.post(url="/features/delete", json={"ids": [second_id]})
+    assert response.json() == {"ids": [second_id], "missing": []}